@@ -12,10 +12,12 @@ from .gget_setup import setup
 from .gget_pdb import pdb
 from .gget_gpt import gpt
 from .gget_cellxgene import cellxgene
-from .gget_elm import elm
+from .gget_elm import elm, elm_batch
 from .gget_diamond import diamond
 from .gget_cosmic import cosmic
 from .gget_mutate import mutate
+from .gget_cache import cache
+from . import aio
 
 import logging
 # Mute numexpr threads info
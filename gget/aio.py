@@ -0,0 +1,113 @@
+"""
+Asyncio wrappers around the network-bound gget modules.
+
+Each coroutine takes the same arguments and returns the same results as its
+synchronous counterpart, e.g.:
+
+    results = await gget.aio.info(["ENSG00000034713", "ENSG00000104853"])
+
+This is not an asynchronous HTTP client: each call runs the unchanged synchronous
+function on a shared thread pool (using the process-wide pooled HTTP session), so
+that it does not block the event loop. Each running query occupies one worker thread
+for its full duration, including blocking waits (e.g. gget.blast sleeping between
+polls for results), so at most 'max_workers' queries (default: 32, see configure)
+run at the same time and further calls wait for a free worker.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import set_up_logger, resize_session_pool
+
+logger = set_up_logger()
+
+from .gget_info import info as _info
+from .gget_seq import seq as _seq
+from .gget_blast import blast as _blast
+from .gget_blat import blat as _blat
+from .gget_pdb import pdb as _pdb
+from .gget_enrichr import enrichr as _enrichr
+from .gget_archs4 import archs4 as _archs4
+
+from .constants import AIO_MAX_WORKERS
+
+executor = None
+executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the thread pool shared by all gget.aio coroutines (created on first use).
+    """
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=AIO_MAX_WORKERS, thread_name_prefix="gget-aio"
+            )
+        return executor
+
+
+def configure(max_workers=AIO_MAX_WORKERS):
+    """
+    Set the maximum number of gget.aio queries running at the same time (the number of worker threads).
+    Also resizes the connection pool of the shared HTTP session accordingly.
+    Queries already running on the previous thread pool are allowed to finish.
+
+    Args:
+    - max_workers   Maximum number of concurrent queries. Default: 32.
+    """
+    global executor
+    if max_workers < 1:
+        raise ValueError(
+            f"'max_workers' argument specified as {max_workers}. Expected an integer >= 1."
+        )
+
+    with executor_lock:
+        old_executor = executor
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="gget-aio"
+        )
+
+    resize_session_pool(max_workers)
+
+    if old_executor is not None:
+        old_executor.shutdown(wait=False)
+
+
+async def run(func, *args, **kwargs):
+    """
+    Run a synchronous gget function on the shared thread pool and await its result.
+    The function occupies a worker thread until it returns (see module docstring).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def make_async(func):
+    """
+    Create a coroutine function with the signature and docstring of a synchronous gget function.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run(func, *args, **kwargs)
+
+    wrapper.__doc__ = (
+        f"Asyncio wrapper of gget.{func.__name__} (returns a coroutine). "
+        f"Runs gget.{func.__name__} on a worker thread of the gget.aio thread pool.\n{func.__doc__ or ''}"
+    )
+    return wrapper
+
+
+info = make_async(_info)
+seq = make_async(_seq)
+blast = make_async(_blast)
+blat = make_async(_blat)
+pdb = make_async(_pdb)
+enrichr = make_async(_enrichr)
+archs4 = make_async(_archs4)
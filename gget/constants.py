@@ -1,7 +1,10 @@
 import uuid
+import os
 
 # Ensembl REST API server for gget seq and info
 ENSEMBL_REST_API = "http://rest.ensembl.org/"
+# Maximum number of IDs accepted by the Ensembl REST API POST endpoints
+ENSEMBL_REST_MAX_POST_IDS = 1000
 ENSEMBL_FTP_URL = "http://ftp.ensembl.org/pub/"
 ENSEMBL_FTP_URL_GRCH37 = "http://ftp.ensembl.org/pub/grch37/"
 # Non-vertebrate server
@@ -10,9 +13,19 @@ ENSEMBL_FTP_URL_NV = "http://ftp.ensemblgenomes.org/pub/"
 # NCBI URL for gget info
 NCBI_URL = "https://www.ncbi.nlm.nih.gov"
 
+# Limits for concurrent requests sent by gget info: (max concurrent requests, max requests per second)
+# NCBI allows up to 3 requests per second without an API key
+NCBI_LIMITS = (3, 3)
+UNIPROT_LIMITS = (5, 10)
+PDBE_LIMITS = (5, 10)
+
 # UniProt REST API server for gget seq and info
 UNIPROT_REST_API = "https://rest.uniprot.org/uniprotkb/search?query="
 UNIPROT_IDMAPPING_API = "https://rest.uniprot.org/idmapping"
+# Maximum number of IDs per UniProt ID mapping job
+UNIPROT_IDMAPPING_MAX_IDS = 100000
+# Seconds between status requests for a running UniProt ID mapping job
+UNIPROT_IDMAPPING_POLLING_INTERVAL = 3
 
 # RCSB PDB API for gget pdb
 RCSB_PDB_API = "https://data.rcsb.org/rest/v1/core/"
@@ -38,6 +51,14 @@ GET_BACKGROUND_ENRICHR_URL = "https://maayanlab.cloud/speedrichr/api/backgrounde
 GENECORR_URL = "https://maayanlab.cloud/matrixapi/coltop"
 EXPRESSION_URL = "https://maayanlab.cloud/archs4/search/loadExpressionTissue.php?"
 
+# Read-only POST endpoints that are safe to resubmit when a request fails with a server error
+# (other POST requests, e.g. Enrichr list and BLAST job submissions, are never retried)
+RETRY_POST_URLS = [
+    ENSEMBL_REST_API + "lookup/id",
+    ENSEMBL_REST_API + "sequence/id",
+    GENECORR_URL,
+]
+
 # Download links for ELM database
 ELM_INSTANCES_FASTA_DOWNLOAD = (
     "http://elm.eu.org/instances.fasta?q=*&taxon=&instance_logic="
@@ -51,3 +72,63 @@ ELM_INTDOMAINS_TSV_DOWNLOAD = "http://elm.eu.org/interactiondomains.tsv"
 # COSMIC API endpoint
 COSMIC_GET_URL = "https://cancer.sanger.ac.uk/cosmic/search/"
 COSMIC_RELEASE_URL = "https://cancer.sanger.ac.uk/cosmic/release_notes"
+# Bytes read/written at a time when streaming COSMIC downloads
+COSMIC_DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+# Bytes of a COSMIC database TSV file converted to Parquet at a time
+COSMIC_PARQUET_BLOCK_SIZE = 16 * 1024 * 1024
+# Rows per Parquet row group (min/max statistics of each row group are used to skip row groups when querying)
+COSMIC_PARQUET_ROW_GROUP_SIZE = 100000
+# Columns containing the gene names and transcript IDs in the different COSMIC databases
+COSMIC_GENE_COLUMNS = ["GENE_NAME", "GENE_SYMBOL"]
+COSMIC_TRANSCRIPT_COLUMNS = ["ACCESSION_NUMBER", "TRANSCRIPT_ACCESSION"]
+# Columns of the local COSMIC databases included in the index used for offline searches
+# (index column -> names of the column in the different COSMIC databases)
+COSMIC_INDEX_COLUMNS = {
+    "gene": COSMIC_GENE_COLUMNS,
+    "transcript": COSMIC_TRANSCRIPT_COLUMNS,
+    "mutation_cds": ["Mutation CDS", "MUTATION_CDS"],
+    "mutation_aa": ["Mutation AA", "MUTATION_AA"],
+    "mutation_id": ["GENOMIC_MUTATION_ID"],
+    "sample": ["SAMPLE_NAME"],
+    "sample_id": ["COSMIC_SAMPLE_ID"],
+}
+# Rows of a local COSMIC database added to the index at a time
+COSMIC_INDEX_CHUNKSIZE = 100000
+
+# Default directory of the persistent response cache (gget cache)
+# Caching is opt-in: it is enabled using gget.cache("enable") or by setting the GGET_CACHE_DIR environment variable
+GGET_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "gget")
+# Default maximum size of the response cache in MB (least recently used responses are evicted first)
+GGET_CACHE_MAX_SIZE = 1024
+# Subfolder of the gget cache directory containing DIAMOND databases (gget diamond)
+# Databases are named by the SHA-256 hash of the reference FASTA file and the DIAMOND version
+DIAMOND_DB_CACHE_SUBDIR = "diamond_db"
+# Size of the blocks read when hashing reference FASTA files
+DIAMOND_HASH_BUFFER_SIZE = 1024 * 1024
+# Number of alignments per batch when streaming DIAMOND results (gget diamond)
+DIAMOND_BATCH_SIZE = 100000
+# Time-to-live (in seconds) of cached responses by URL pattern (first match applies)
+# URLs that do not match any pattern are never cached
+# TTL None = never expires (content of a specific Ensembl release does not change)
+GGET_CACHE_TTLS = [
+    (r"/VERSION$", 24 * 60 * 60),
+    (r"^https?://ftp\.ensembl(genomes)?\.org/pub/(grch37/)?release-\d+/", None),
+    (r"^https?://rest\.ensembl\.org/", 7 * 24 * 60 * 60),
+    (r"^https://rest\.uniprot\.org/uniprotkb/search", 7 * 24 * 60 * 60),
+    (r"^https://www\.ebi\.ac\.uk/pdbe/", 7 * 24 * 60 * 60),
+    (r"^https://www\.ncbi\.nlm\.nih\.gov/gene/", 7 * 24 * 60 * 60),
+]
+# Cached responses of URLs matching this pattern are keyed by the latest Ensembl release,
+# so responses of an older release are not served after a new release is published
+GGET_CACHE_ENSEMBL_RELEASE_URLS = r"^https?://rest\.ensembl\.org/"
+
+# Default maximum number of gget.aio queries running at the same time
+AIO_MAX_WORKERS = 32
+
+# Number of characters collected by utils.FastaWriter before they are written to the file
+FASTA_BUFFER_SIZE = 1024 * 1024
+
+# Maximum number of times an interrupted download is resumed (see utils.ResumableDownload)
+DOWNLOAD_MAX_RESUMES = 5
+# Timeout (in seconds) for connecting to the server and for each read of a streamed download
+DOWNLOAD_TIMEOUT = 60
@@ -31,7 +31,7 @@ from IPython import display
 from ipywidgets import GridspecLayout
 from ipywidgets import Output
 
-from .utils import set_up_logger
+from .utils import set_up_logger, read_fasta, write_fasta
 logger = set_up_logger()
 
 TQDM_BAR_FORMAT = (
@@ -375,27 +375,7 @@ def alphafold(
 
         elif ".fa" in sequence:
             # Read the FASTA
-            titles = []
-            seqs = []
-            with open(sequence) as fasta_file:
-                for i, line in enumerate(fasta_file):
-                    # Each second line will be a title line
-                    if i % 2 == 0:
-                        if line[0] != ">":
-                            raise ValueError(
-                                "Expected FASTA to start with a '>' character. "
-                            )
-                        else:
-                            # Append title line to titles list
-                            titles.append(line.strip())
-                    else:
-                        if line[0] == ">":
-                            raise ValueError(
-                                "FASTA contains two lines starting with '>' in a row -> missing sequence line. "
-                            )
-                        # Append sequences line to seqs list
-                        else:
-                            seqs.append(line.strip())
+            titles, seqs = read_fasta(sequence)
         else:
             raise ValueError(
                 "File format not recognized. gget alphafold only supports '.txt' or '.fa' files. "
@@ -535,8 +515,7 @@ def alphafold(
 
         # Save the target sequence in a fasta file
         fasta_path = os.path.join(abs_out_path, f"target_{sequence_index}.fasta")
-        with open(fasta_path, "wt") as f:
-            f.write(f">query\n{sequence}")
+        write_fasta(fasta_path, [("query", sequence)])
 
         # Don't do redundant work for multiple copies of the same chain in the multimer
         if sequence not in raw_msa_results_for_sequence:
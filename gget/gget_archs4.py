@@ -1,9 +1,8 @@
-import requests
 import pandas as pd
 import json as json_package
 import io
 
-from .utils import set_up_logger
+from .utils import set_up_logger, get_session
 logger = set_up_logger()
 
 # Custom functions
@@ -100,7 +99,7 @@ def archs4(
         # Dictionary with arguments
         json_dict = {"id": gene, "count": gene_count}
 
-        r = requests.post(url=GENECORR_URL, json=json_dict)
+        r = get_session().post(url=GENECORR_URL, json=json_dict)
 
         if not r.ok:
             raise RuntimeError(
@@ -163,7 +162,7 @@ def archs4(
         url = EXPRESSION_URL + query
 
         # Submit API query
-        r = requests.post(url=url, headers={"Content-Type": "application/json"})
+        r = get_session().post(url=url, headers={"Content-Type": "application/json"})
 
         if not r.ok:
             raise RuntimeError(
@@ -0,0 +1,91 @@
+import os
+import shutil
+
+from . import utils
+from .utils import set_up_logger, ResponseCache, enable_cache, disable_cache
+
+logger = set_up_logger()
+
+from .constants import GGET_CACHE_DIR, GGET_CACHE_MAX_SIZE, DIAMOND_DB_CACHE_SUBDIR
+
+
+def cache(
+    action,
+    cache_dir=None,
+    max_size=GGET_CACHE_MAX_SIZE,
+    expired_only=False,
+    verbose=True,
+):
+    """
+    Manage the persistent on-disk cache of server responses
+    (Ensembl REST API and FTP directory listings, UniProt, PDBe, NCBI).
+    Caching is opt-in: enable it using action='enable' or by setting the GGET_CACHE_DIR environment variable.
+
+    Args:
+    - action        One of:
+                    'enable': Enable caching of server responses for this Python session.
+                    'disable': Disable caching for this Python session (cached responses are kept on disk).
+                    'stats': Return cache statistics.
+                    'clear': Delete cached responses (and DIAMOND databases cached by gget.diamond, unless expired_only=True).
+    - cache_dir     Path to the cache directory.
+                    Default: GGET_CACHE_DIR environment variable if set, else ~/.cache/gget.
+    - max_size      Maximum size of the cache in MB. Least recently used responses are evicted first. Default: 1024.
+                    (Only applies to action='enable'.)
+    - expired_only  If True, only deletes expired responses. Default: False.
+                    (Only applies to action='clear'.)
+    - verbose       True/False whether to print progress information. Default True.
+
+    Returns dictionary with cache statistics (action='stats') or number of deleted responses (action='clear').
+    """
+    supported_actions = ["enable", "disable", "stats", "clear"]
+    if action not in supported_actions:
+        raise ValueError(
+            f"'action' argument specified as {action}. Expected one of: {', '.join(supported_actions)}"
+        )
+
+    if cache_dir is None:
+        cache_dir = os.environ.get("GGET_CACHE_DIR", GGET_CACHE_DIR)
+    cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+
+    if action == "enable":
+        enable_cache(cache_dir=cache_dir, max_size=max_size)
+        if verbose:
+            logger.info(f"Caching server responses in {cache_dir}.")
+        return
+
+    if action == "disable":
+        disable_cache()
+        if verbose:
+            logger.info("Caching of server responses disabled.")
+        return
+
+    # Use the active cache if it lives in the requested directory
+    active_cache = utils.response_cache
+    if active_cache is not None and active_cache.cache_dir == cache_dir:
+        response_cache = active_cache
+    else:
+        response_cache = ResponseCache(cache_dir=cache_dir)
+
+    try:
+        if action == "stats":
+            return response_cache.stats()
+
+        if action == "clear":
+            n_deleted = response_cache.clear(expired_only=expired_only)
+            if verbose:
+                logger.info(
+                    f"Deleted {n_deleted} {'expired ' if expired_only else ''}cached responses from {cache_dir}."
+                )
+
+            # Cached DIAMOND databases do not expire
+            diamond_db_dir = os.path.join(cache_dir, DIAMOND_DB_CACHE_SUBDIR)
+            if not expired_only and os.path.isdir(diamond_db_dir):
+                shutil.rmtree(diamond_db_dir)
+                if verbose:
+                    logger.info(f"Deleted cached DIAMOND databases from {diamond_db_dir}.")
+
+            return n_deleted
+
+    finally:
+        if response_cache is not active_cache:
+            response_cache.close()
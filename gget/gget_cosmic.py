@@ -1,6 +1,6 @@
-import requests
 import pandas as pd
-import subprocess
+import numpy as np
+import io
 import os
 import re
 import json as json_package
@@ -9,10 +9,22 @@ import shutil
 import tarfile
 import gzip
 import getpass
+import sqlite3
+import threading
+import uuid
 
 # Constants
-from .constants import COSMIC_GET_URL
-from .utils import set_up_logger, get_latest_cosmic
+from .constants import (
+    COSMIC_GET_URL,
+    COSMIC_DOWNLOAD_BUFFER_SIZE,
+    COSMIC_PARQUET_BLOCK_SIZE,
+    COSMIC_PARQUET_ROW_GROUP_SIZE,
+    COSMIC_TRANSCRIPT_COLUMNS,
+    COSMIC_INDEX_COLUMNS,
+    COSMIC_INDEX_CHUNKSIZE,
+)
+from .utils import set_up_logger, get_latest_cosmic, get_session, ResumableDownload
+from .gget_mutate import parse_mutations
 
 logger = set_up_logger()
 
@@ -26,7 +38,64 @@ def is_valid_email(email):
     return re.match(email_pattern, email) is not None
 
 
-def download_reference(download_link, tar_folder_path, file_path, verbose):
+def stream_tar_member(download_url, file_path, verbose=True):
+    """
+    Stream a tar archive from download_url and save the file it contains with the same name as file_path
+    (decompressed if it is gzip-compressed in the archive) at file_path.
+    Neither the archive nor the compressed file are saved to disk.
+    Interrupted downloads are resumed and the completeness and checksum of the download are verified.
+    """
+    file_name = os.path.basename(file_path)
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    tmp_path = f"{file_path}.part"
+
+    if verbose:
+        logger.info("Downloading data...")
+
+    found = False
+    try:
+        with ResumableDownload(download_url) as stream:
+            archive = io.BufferedReader(stream, buffer_size=COSMIC_DOWNLOAD_BUFFER_SIZE)
+            with tarfile.open(fileobj=archive, mode="r|*") as tar:
+                for member in tar:
+                    member_name = os.path.basename(member.name)
+                    if not member.isfile() or member_name not in [
+                        file_name,
+                        file_name + ".gz",
+                    ]:
+                        continue
+
+                    source = tar.extractfile(member)
+                    if member_name.endswith(".gz"):
+                        source = gzip.GzipFile(fileobj=source)
+
+                    with open(tmp_path, "wb") as f_out:
+                        shutil.copyfileobj(source, f_out, COSMIC_DOWNLOAD_BUFFER_SIZE)
+                    found = True
+
+            # Read the rest of the archive, so the complete download is verified
+            while stream.read(COSMIC_DOWNLOAD_BUFFER_SIZE):
+                pass
+            sha256 = stream.verify()
+
+        if not found:
+            raise RuntimeError(
+                f"The downloaded archive does not contain {file_name}. Please double-check arguments (especially cosmic_version) and try again."
+            )
+
+        os.replace(tmp_path, file_path)
+
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    if verbose:
+        logger.info(
+            f"Downloaded and extracted file to {file_path} (SHA-256 checksum of the downloaded archive: {sha256})"
+        )
+
+
+def download_reference(download_link, file_path, verbose):
     email = input("Please enter your COSMIC email: ")
     if not is_valid_email(email):
         raise ValueError("The email address is not valid.")
@@ -37,20 +106,14 @@ def download_reference(download_link, tar_folder_path, file_path, verbose):
 
     encoded_bytes = base64.b64encode(input_string.encode("utf-8"))
     encoded_string = encoded_bytes.decode("utf-8")
-    curl_command = [
-        "curl",
-        "-H",
-        f"Authorization: Basic {encoded_string}",
-        download_link,
-    ]
 
-    if verbose:
-        logger.info("Downloading data...")
-
-    result = subprocess.run(curl_command, capture_output=True, text=True)
+    # Get the download URL of the requested file
+    r = get_session().get(
+        download_link, headers={"Authorization": f"Basic {encoded_string}"}
+    )
 
     try:
-        response_data = json_package.loads(result.stdout)
+        response_data = r.json()
     except ValueError:
         raise RuntimeError(
             "Failed to download file. Please double-check arguments (especially cosmic_version) and try again."
@@ -60,24 +123,8 @@ def download_reference(download_link, tar_folder_path, file_path, verbose):
     except AttributeError:
         raise AttributeError("Invalid username or password.")
 
-    curl_command2 = ["curl", true_download_url, "--output", f"{tar_folder_path}.tar"]
-    result2 = subprocess.run(curl_command2, capture_output=True, text=True)
-
-    if result2.returncode != 0:
-        raise RuntimeError(
-            f"Failed to download file. Return code: {result.returncode}\n{result.stderr}"
-        )
-
-    with tarfile.open(f"{tar_folder_path}.tar", "r") as tar:
-        tar.extractall(path=tar_folder_path)
-        if verbose:
-            logger.info(f"Extracted tar file to {tar_folder_path}")
-
-    with gzip.open(f"{file_path}.gz", "rb") as f_in:
-        with open(file_path, "wb") as f_out:
-            shutil.copyfileobj(f_in, f_out)
-        if verbose:
-            logger.info(f"Unzipped file to {file_path}")
+    # Stream the archive and decompress the contained file directly into file_path
+    stream_tar_member(true_download_url, file_path, verbose=verbose)
 
 
 def select_reference(
@@ -155,19 +202,7 @@ def select_reference(
     if overwrite:
         # Only the example database can be downloaded directly (without an account)
         if mutation_class == "cancer_example":
-            curl_command = [
-                "curl",
-                "-L",
-                "--output",
-                f"{tar_folder_path}.tar",
-                download_link,
-            ]
-            result = subprocess.run(curl_command, capture_output=True, text=True)
-
-            with tarfile.open(f"{tar_folder_path}.tar", "r") as tar:
-                tar.extractall(path=tar_folder_path)
-                if verbose:
-                    logger.info(f"Extracted tar file to {tar_folder_path}")
+            stream_tar_member(download_link, file_path, verbose=verbose)
 
         # Download full databases
         else:
@@ -179,7 +214,7 @@ def select_reference(
                 .lower()
             )
             if proceed in ["yes", "y"]:
-                download_reference(download_link, tar_folder_path, file_path, verbose)
+                download_reference(download_link, file_path, verbose)
             else:
                 raise KeyboardInterrupt(
                     f"Database download canceled. Learn more about COSMIC at https://cancer.sanger.ac.uk/cosmic/download/cosmic."
@@ -188,6 +223,347 @@ def select_reference(
     return file_path, overwrite
 
 
+def convert_to_parquet(tsv_file, parquet_file, verbose=True):
+    """
+    Convert a COSMIC database TSV file into a zstd-compressed Parquet file (requires pyarrow).
+    The TSV file is converted block by block, so it is never loaded into memory entirely.
+
+    Column types are inferred from the first block. String columns with few distinct values
+    (e.g. GENE_NAME) are dictionary-encoded. A dictionary-encoded 'seq_ID' column containing the
+    transcript IDs without version numbers is added.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    if verbose:
+        logger.info(f"Converting {tsv_file} to Parquet...")
+
+    read_options = pa_csv.ReadOptions(block_size=COSMIC_PARQUET_BLOCK_SIZE)
+    parse_options = pa_csv.ParseOptions(delimiter="\t")
+    # Empty and 'NA' fields are missing values (as with pandas.read_csv)
+    convert_options = pa_csv.ConvertOptions(strings_can_be_null=True)
+
+    # Infer column types from the first block
+    reader = pa_csv.open_csv(
+        tsv_file,
+        read_options=read_options,
+        parse_options=parse_options,
+        convert_options=convert_options,
+    )
+    first_batch = reader.read_next_batch()
+    reader.close()
+
+    column_types = {}
+    for name, column in zip(first_batch.schema.names, first_batch.columns):
+        if pa.types.is_null(column.type):
+            column_types[name] = pa.string()
+        elif pa.types.is_string(column.type) and len(pc.unique(column)) < 0.5 * len(
+            column
+        ):
+            column_types[name] = pa.dictionary(pa.int32(), pa.string())
+        else:
+            column_types[name] = column.type
+
+    transcript_column = next(
+        (column for column in COSMIC_TRANSCRIPT_COLUMNS if column in column_types),
+        None,
+    )
+
+    while True:
+        reader = pa_csv.open_csv(
+            tsv_file,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=pa_csv.ConvertOptions(
+                column_types=column_types, strings_can_be_null=True
+            ),
+        )
+
+        schema = reader.schema
+        if transcript_column:
+            schema = schema.append(
+                pa.field("seq_ID", pa.dictionary(pa.int32(), pa.string()))
+            )
+
+        try:
+            with pq.ParquetWriter(parquet_file, schema, compression="zstd") as writer:
+                for batch in reader:
+                    table = pa.Table.from_batches([batch])
+
+                    if transcript_column:
+                        # Remove version numbers from Ensembl IDs
+                        seq_ids = pc.replace_substring_regex(
+                            table[transcript_column].cast(pa.string()),
+                            pattern=r"\..*$",
+                            replacement="",
+                        )
+                        table = table.append_column(
+                            "seq_ID", pc.dictionary_encode(seq_ids)
+                        )
+
+                    writer.write_table(
+                        table, row_group_size=COSMIC_PARQUET_ROW_GROUP_SIZE
+                    )
+            break
+
+        except pa.ArrowInvalid as e:
+            # A value in a later block does not match the type inferred from the first block
+            # -> store this column as strings and start over
+            match = re.search(r"column #(\d+)", str(e))
+            if not match:
+                raise
+            name = first_batch.schema.names[int(match.group(1))]
+            if column_types[name] == pa.string():
+                raise
+            column_types[name] = pa.string()
+
+        finally:
+            reader.close()
+
+    if verbose:
+        logger.info(f"Parquet file created at {parquet_file}")
+
+
+class CosmicIndex:
+    """
+    SQLite index of the gene name, transcript, mutation (CDS, AA and genomic mutation ID) and sample
+    columns of a local COSMIC database (TSV file or Parquet file created by gget cosmic) used for offline searches.
+
+    The index is built once and saved next to the database (e.g. 'CancerMutationCensus_AllData_v99_GRCh37.tsv_index.sqlite').
+    It is rebuilt when the database is newer than the index.
+    """
+
+    def __init__(self, local_db, verbose=False):
+        self.local_db = local_db
+        self.index_path = local_db + "_index.sqlite"
+        self.db_mtime = os.path.getmtime(local_db)
+
+        if (
+            not os.path.exists(self.index_path)
+            or os.path.getmtime(self.index_path) < self.db_mtime
+        ):
+            if verbose:
+                logger.info(f"Indexing {local_db}...")
+            self.build()
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.index_path, check_same_thread=False)
+        # Index column -> column name in the database
+        self.columns = dict(
+            self.connection.execute("SELECT field, source_column FROM columns")
+        )
+
+    def read_chunks(self, columns):
+        """
+        Yield data frames with the requested columns of the database in chunks of COSMIC_INDEX_CHUNKSIZE rows.
+        """
+        if self.local_db.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(self.local_db)
+            for batch in parquet_file.iter_batches(
+                batch_size=COSMIC_INDEX_CHUNKSIZE, columns=columns
+            ):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(
+                self.local_db,
+                sep="\t",
+                usecols=columns,
+                dtype=str,
+                chunksize=COSMIC_INDEX_CHUNKSIZE,
+            )
+
+    def build(self):
+        if self.local_db.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            db_columns = pq.read_schema(self.local_db).names
+        else:
+            db_columns = pd.read_csv(self.local_db, sep="\t", nrows=0).columns
+
+        columns = {}
+        for field, names in COSMIC_INDEX_COLUMNS.items():
+            for name in names:
+                if name in db_columns:
+                    columns[field] = name
+                    break
+
+        if "gene" not in columns:
+            raise ValueError(
+                f"{self.local_db} does not contain a gene name column. Please provide a COSMIC database downloaded using gget cosmic."
+            )
+
+        fields = list(columns)
+        has_seq_ids = "transcript" in columns
+
+        # Write to a temporary file first so a partially built index is never used
+        tmp_path = f"{self.index_path}.{uuid.uuid4()}.tmp"
+        try:
+            connection = sqlite3.connect(tmp_path)
+            with connection:
+                connection.execute(
+                    "CREATE TABLE columns (field TEXT PRIMARY KEY, source_column TEXT)"
+                )
+                connection.executemany(
+                    "INSERT INTO columns VALUES (?, ?)", list(columns.items())
+                )
+
+                table_columns = [f"{field} TEXT COLLATE NOCASE" for field in fields]
+                if has_seq_ids:
+                    table_columns.append("seq_ID TEXT COLLATE NOCASE")
+                connection.execute(f"CREATE TABLE rows ({', '.join(table_columns)})")
+
+                insert = f"INSERT INTO rows VALUES ({', '.join(['?'] * len(table_columns))})"
+                for chunk in self.read_chunks([columns[field] for field in fields]):
+                    chunk = chunk[[columns[field] for field in fields]]
+                    if has_seq_ids:
+                        # Remove version numbers from Ensembl IDs
+                        chunk = chunk.assign(
+                            seq_ID=chunk[columns["transcript"]]
+                            .astype(object)
+                            .str.split(".")
+                            .str[0]
+                        )
+                    # Store missing values as NULL
+                    chunk = chunk.astype(object).where(chunk.notna(), None)
+                    connection.executemany(
+                        insert, chunk.itertuples(index=False, name=None)
+                    )
+
+                for field in fields + (["seq_ID"] if has_seq_ids else []):
+                    if field != "transcript":
+                        connection.execute(
+                            f"CREATE INDEX idx_{field} ON rows ({field})"
+                        )
+            connection.close()
+            os.replace(tmp_path, self.index_path)
+
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def search(self, searchterm, entity="mutations", limit=100):
+        """
+        Find rows of the database matching the search term (case-insensitive).
+
+        Args:
+        - searchterm    Gene name, transcript ID (Ensembl ID with or without version number),
+                        mutation (CDS, e.g. 'c.1799T>A', or AA, e.g. 'V600E' or 'p.V600E'),
+                        genomic mutation ID (e.g. 'COSV56056643'), or sample (name or COSMIC sample ID).
+        - entity        'mutations' (search genes, transcripts and mutations) or 'samples' (search samples).
+        - limit         Maximum number of rows to return. Default: 100.
+
+        Returns a data frame with the indexed columns (using the column names of the database).
+        """
+        if entity == "mutations":
+            conditions = [
+                (field, searchterm)
+                for field in ["gene", "mutation_cds", "mutation_aa", "mutation_id"]
+                if field in self.columns
+            ]
+            if "transcript" in self.columns:
+                conditions.append(("seq_ID", searchterm.split(".")[0]))
+            if "mutation_aa" in self.columns and not searchterm.lower().startswith(
+                "p."
+            ):
+                conditions.append(("mutation_aa", "p." + searchterm))
+
+        elif entity == "samples":
+            conditions = [
+                (field, searchterm)
+                for field in ["sample", "sample_id"]
+                if field in self.columns
+            ]
+            if not conditions:
+                raise ValueError(
+                    f"{self.local_db} does not contain sample information. Please choose entity='mutations'."
+                )
+
+        else:
+            raise ValueError(
+                f"'entity' argument specified as {entity}. Only entity='mutations' or entity='samples' is supported when querying a local database."
+            )
+
+        fields = list(self.columns)
+        query = (
+            f"SELECT {', '.join(fields)} FROM rows WHERE "
+            + " OR ".join(f"{field} = ?" for field, _ in conditions)
+            + " LIMIT ?"
+        )
+        params = [value for _, value in conditions] + [limit]
+
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+
+        return pd.DataFrame(rows, columns=[self.columns[field] for field in fields])
+
+    def close(self):
+        self.connection.close()
+
+
+# Indexes of local COSMIC databases used in this process (path -> CosmicIndex)
+cosmic_indexes = {}
+cosmic_indexes_lock = threading.Lock()
+
+
+def get_cosmic_index(local_db, verbose=False):
+    """
+    Return the (cached) CosmicIndex of a local COSMIC database.
+    """
+    local_db = os.path.abspath(local_db)
+    with cosmic_indexes_lock:
+        cosmic_index = cosmic_indexes.get(local_db)
+
+        # Rebuild the index if the database changed
+        if cosmic_index is not None and cosmic_index.db_mtime != os.path.getmtime(
+            local_db
+        ):
+            cosmic_index.close()
+            cosmic_index = None
+
+        if cosmic_index is None:
+            cosmic_index = CosmicIndex(local_db, verbose=verbose)
+            cosmic_indexes[local_db] = cosmic_index
+
+    return cosmic_index
+
+
+def save_results(corr_df, entity, searchterm, json=False, out=None):
+    """
+    Save query results in the 'out' folder or return them (as data frame or json).
+    """
+    if json:
+        results_dict = json_package.loads(corr_df.to_json(orient="records"))
+        if out:
+            # Create saving directory
+            directory = "/".join(out.split("/")[:-1])
+            if directory != "":
+                os.makedirs(directory, exist_ok=True)
+
+            json_out = os.path.join(out, f"gget_cosmic_{entity}_{searchterm}.json")
+            with open(json_out, "w", encoding="utf-8") as f:
+                json_package.dump(results_dict, f, ensure_ascii=False, indent=4)
+
+        else:
+            return results_dict
+
+    else:
+        if out:
+            # Create saving directory
+            directory = "/".join(out.split("/")[:-1])
+            if directory != "":
+                os.makedirs(directory, exist_ok=True)
+
+            df_out = os.path.join(out, f"gget_cosmic_{entity}_{searchterm}.csv")
+            corr_df.to_csv(df_out, index=False)
+
+        else:
+            return corr_df
+
+
 def cosmic(
     searchterm,
     entity="mutations",
@@ -198,6 +574,8 @@ def cosmic(
     cosmic_version=None,
     grch_version=37,
     gget_mutate=True,
+    parquet=False,
+    local_db=None,
     out=None,
     verbose=True,
 ):
@@ -229,6 +607,12 @@ def cosmic(
                       'mutations' (default), 'genes', 'cancer', 'tumour_site', 'studies', 'pubmed', or 'samples'.
     - limit           (int) Number of hits to return. Default: 100
     - json            (True/False) If True, returns results in json format instead of data frame. Default: False
+    - local_db        (str) Path to a COSMIC database downloaded using download_cosmic=True (TSV file or Parquet file,
+                      see 'parquet' below), e.g. 'CancerMutationCensus_AllData_v99_GRCh37.tsv'. Default: None -> Query the COSMIC server.
+                      If provided, 'searchterm' is looked up in the local database instead (without network access):
+                      entity='mutations': gene name, transcript (Ensembl ID), mutation CDS/AA (e.g. 'c.1799T>A' or 'V600E') or genomic mutation ID
+                      entity='samples': sample name or COSMIC sample ID (not available for the 'cancer' database)
+                      An index of these columns is built on the first search and saved next to the database (e.g. 'CancerMutationCensus_AllData_v99_GRCh37.tsv_index.sqlite').
 
     Returns a data frame with the requested results.
 
@@ -240,6 +624,9 @@ def cosmic(
     - cosmic_version  (int) Version of the COSMIC database. Default: None -> Defaults to latest version.
     - grch_version    (int) Version of the human GRCh reference genome the COSMIC database was based on (37 or 38). Default: 37
     - gget_mutate     (True/False) whether to create a modified version of the database for use with gget mutate. Default: True
+    - parquet         (True/False) whether to also convert the database into a compressed Parquet file with typed
+                      (dictionary-encoded) columns, which can be queried locally using 'local_db'. Default: False
+                      Requires pyarrow (https://pypi.org/project/pyarrow).
 
     General args:
     - out             (str) Path to the file (or folder when downloading databases with the download_cosmic flag) the results will be saved in, e.g. 'path/to/results.json'.
@@ -275,6 +662,14 @@ def cosmic(
                 f"Parameter 'grch_version' must be one of the following: {', '.join(grch_allowed)}.\n"
             )
 
+        if parquet:
+            try:
+                import pyarrow
+            except ImportError:
+                raise ImportError(
+                    "Converting COSMIC databases to Parquet requires the pyarrow package. Install it using pip (https://pypi.org/project/pyarrow)."
+                )
+
         if not out:
             out = os.getcwd()
 
@@ -293,6 +688,10 @@ def cosmic(
             mutation_class, out, grch_version, cosmic_version, verbose
         )
 
+        parquet_file = mutation_tsv_file.replace(".tsv", ".parquet")
+        if parquet and overwrite:
+            convert_to_parquet(mutation_tsv_file, parquet_file, verbose=verbose)
+
         if gget_mutate and overwrite:
             ## Create copy of results formatted for further use by gget mutate
             if verbose:
@@ -317,7 +716,19 @@ def cosmic(
                     "MUTATION_CDS",
                 ]
 
-            df = pd.read_csv(mutation_tsv_file, usecols=relevant_cols, sep="\t")
+            if parquet:
+                df = pd.read_parquet(parquet_file, columns=relevant_cols)
+                # Dictionary-encoded columns are read as categoricals and missing strings as None
+                # (convert to the same types as returned by pandas.read_csv)
+                for column in relevant_cols:
+                    if df[column].dtype == object or isinstance(
+                        df[column].dtype, pd.CategoricalDtype
+                    ):
+                        df[column] = (
+                            df[column].astype(object).where(df[column].notna(), np.nan)
+                        )
+            else:
+                df = pd.read_csv(mutation_tsv_file, usecols=relevant_cols, sep="\t")
 
             # Get seq_ID and mutation columns
             if mutation_class == "cancer" or mutation_class == "cancer_example":
@@ -365,6 +776,37 @@ def cosmic(
                     f"Modified mutations file for use with gget mutate created at {mutate_csv_out}"
                 )
 
+            # Store the parsed mutations (type, start, end, inserted bases) in a Parquet file,
+            # so gget mutate does not need to parse them again on every run
+            try:
+                import pyarrow
+            except ImportError:
+                logger.warning(
+                    "Install the pyarrow package (https://pypi.org/project/pyarrow) to also create a "
+                    "Parquet file containing the parsed mutations for faster use with gget mutate."
+                )
+            else:
+                df = pd.concat([df, parse_mutations(df["mutation"])], axis=1)
+                df = df.astype(
+                    {
+                        "seq_ID": "category",
+                        "mutation_type": "category",
+                        "mutation_status": "category",
+                        "start": np.int32,
+                        "end": np.int32,
+                    }
+                )
+
+                mutate_parquet_out = mutation_tsv_file.replace(
+                    ".tsv", "_gget_mutate.parquet"
+                )
+                df.to_parquet(mutate_parquet_out, index=False)
+
+                if verbose:
+                    logger.info(
+                        f"Parquet file containing the parsed mutations for use with gget mutate created at {mutate_parquet_out}"
+                    )
+
     else:
         # Check if 'entity' argument is valid
         sps = [
@@ -381,6 +823,29 @@ def cosmic(
                 f"'entity' argument specified as {entity}. Expected one of: {', '.join(sps)}"
             )
 
+        ## Search local database (without network access)
+        if local_db:
+            if local_db.endswith(".parquet"):
+                try:
+                    import pyarrow
+                except ImportError:
+                    raise ImportError(
+                        "Searching COSMIC databases in Parquet format requires the pyarrow package. Install it using pip (https://pypi.org/project/pyarrow)."
+                    )
+
+            corr_df = get_cosmic_index(local_db, verbose=verbose).search(
+                searchterm, entity=entity, limit=limit
+            )
+
+            if len(corr_df) == 0:
+                logger.warning(
+                    f"searchterm = '{searchterm}' did not return any results in {local_db}. "
+                    "Please double-check the arguments and try again.\n"
+                )
+                return None
+
+            return save_results(corr_df, entity, searchterm, json=json, out=out)
+
         # Translate categories to match COSMIC data table IDs
         if entity == "cancer":
             entity = "disease"
@@ -388,7 +853,7 @@ def cosmic(
         if entity == "tumour_site":
             entity = "tumour"
 
-        r = requests.get(
+        r = get_session().get(
             url=COSMIC_GET_URL + entity + "?q=" + searchterm + "&export=json"
         )
 
@@ -553,30 +1018,4 @@ def cosmic(
 
         corr_df = pd.DataFrame(dicts)
 
-        if json:
-            results_dict = json_package.loads(corr_df.to_json(orient="records"))
-            if out:
-                # Create saving directory
-                directory = "/".join(out.split("/")[:-1])
-                if directory != "":
-                    os.makedirs(directory, exist_ok=True)
-
-                json_out = os.path.join(out, f"gget_cosmic_{entity}_{searchterm}.json")
-                with open(json_out, "w", encoding="utf-8") as f:
-                    json_package.dump(results_dict, f, ensure_ascii=False, indent=4)
-
-            else:
-                return results_dict
-
-        else:
-            if out:
-                # Create saving directory
-                directory = "/".join(out.split("/")[:-1])
-                if directory != "":
-                    os.makedirs(directory, exist_ok=True)
-
-                df_out = os.path.join(out, f"gget_cosmic_{entity}_{searchterm}.csv")
-                corr_df.to_csv(df_out, index=False)
-
-            else:
-                return corr_df
+        return save_results(corr_df, entity, searchterm, json=json, out=out)
@@ -4,12 +4,23 @@ import platform
 import os
 import pandas as pd
 import uuid
+import hashlib
+import functools
+import threading
+import numpy as np
 import json as json_package
 
 from .compile import PACKAGE_PATH
 from .utils import tsv_to_df, create_tmp_fasta, remove_temp_files, set_up_logger
 logger = set_up_logger()
 
+from .constants import (
+    GGET_CACHE_DIR,
+    DIAMOND_DB_CACHE_SUBDIR,
+    DIAMOND_HASH_BUFFER_SIZE,
+    DIAMOND_BATCH_SIZE,
+)
+
 # Path to precompiled diamond binary
 if platform.system() == "Windows":
     PRECOMPILED_DIAMOND_PATH = os.path.join(
@@ -20,6 +31,423 @@ else:
         PACKAGE_PATH, f"bins/{platform.system()}/diamond"
     )
 
+# Columns of the DIAMOND output (--outfmt 6 qseqid sseqid pident qlen slen length mismatch gapopen qstart qend sstart send evalue bitscore)
+DIAMOND_OUTFMT = "6 qseqid sseqid pident qlen slen length mismatch gapopen qstart qend sstart send evalue bitscore"
+DIAMOND_COLUMNS = [
+    "query_accession",
+    "subject_accession",
+    "identity_percentage",
+    "query_seq_length",
+    "subject_seq_length",
+    "length",
+    "mismatches",
+    "gap_openings",
+    "query_start",
+    "query_end",
+    "subject_start",
+    "subject_end",
+    "e-value",
+    "bit_score",
+]
+# Compact data types used when streaming DIAMOND results
+# (e-values are kept as float64 since they are often smaller than the smallest float32)
+DIAMOND_DTYPES = {
+    "query_accession": "category",
+    "subject_accession": "category",
+    "identity_percentage": np.float32,
+    "query_seq_length": np.int32,
+    "subject_seq_length": np.int32,
+    "length": np.int32,
+    "mismatches": np.int32,
+    "gap_openings": np.int32,
+    "query_start": np.int32,
+    "query_end": np.int32,
+    "subject_start": np.int32,
+    "subject_end": np.int32,
+    "e-value": np.float64,
+    "bit_score": np.float32,
+}
+
+
+def shell_path(path):
+    """
+    Quote a path for use in a shell command.
+    The quotation marks allow white spaces in the path, but this does not work for Windows.
+    """
+    if platform.system() == "Windows":
+        return path.replace("/", "\\")
+    return f"'{path}'"
+
+
+def run_diamond_command(command, error_message):
+    """
+    Run a DIAMOND shell command and raise a RuntimeError if it fails.
+    """
+    with subprocess.Popen(command, shell=True, stderr=subprocess.PIPE) as process:
+        stderr = process.stderr.read().decode("utf-8")
+        # Log the standard error if it is not empty
+        if stderr:
+            sys.stderr.write(stderr)
+
+    if process.wait() != 0:
+        raise RuntimeError(error_message)
+
+
+@functools.lru_cache(maxsize=None)
+def get_diamond_version(diamond_binary):
+    """
+    Returns the version of a DIAMOND binary, e.g. '2.1.8'.
+    The result is memoized for each binary within a process (reset using get_diamond_version.cache_clear()).
+    """
+    process = subprocess.run(
+        f"{shell_path(diamond_binary)} version",
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if process.returncode != 0:
+        sys.stderr.write(process.stderr.decode("utf-8"))
+        raise RuntimeError("Could not determine DIAMOND version.")
+
+    # Output format: 'diamond version 2.1.8'
+    return process.stdout.decode("utf-8").strip().split()[-1]
+
+
+@functools.lru_cache(maxsize=None)
+def hash_file_content(path, size, mtime_ns):
+    """
+    Returns the SHA-256 hex digest of a file.
+    The result is memoized for each path, size and modification time within a process.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(DIAMOND_HASH_BUFFER_SIZE), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def make_diamond_db(diamond_binary, reference_file, diamond_db, threads=1):
+    """
+    Create a DIAMOND database from a reference FASTA file.
+    The database is built under a temporary name and then moved to 'diamond_db',
+    so that concurrent processes never use a partially written database.
+
+    Args:
+    - diamond_binary  Path to DIAMOND binary.
+    - reference_file  Path to FASTA file containing the reference sequences.
+    - diamond_db      Path to the DIAMOND database (ending in .dmnd).
+    - threads         Number of threads to use. Default: 1.
+    """
+    tmp_db = f"{diamond_db}.{str(uuid.uuid4())}.tmp"
+    try:
+        run_diamond_command(
+            f"{shell_path(diamond_binary)} makedb --quiet --in {shell_path(reference_file)} --db {shell_path(tmp_db)} --threads {threads}",
+            "Creating DIAMOND database failed.",
+        )
+        # DIAMOND adds the .dmnd extension to the database name
+        os.replace(f"{tmp_db}.dmnd", diamond_db)
+    finally:
+        remove_temp_files([f"{tmp_db}.dmnd"])
+
+
+def get_cached_diamond_db(
+    diamond_binary, reference_file, threads=1, cache_dir=None, verbose=True
+):
+    """
+    Returns the path to a DIAMOND database of the reference FASTA file in the gget cache directory.
+    Databases are identified by the content of the reference file and the DIAMOND version,
+    and are only created if they do not exist yet.
+
+    Args:
+    - diamond_binary  Path to DIAMOND binary.
+    - reference_file  Path to FASTA file containing the reference sequences.
+    - threads         Number of threads used to create the database. Default: 1.
+    - cache_dir       Path to the cache directory.
+                      Default: GGET_CACHE_DIR environment variable if set, else ~/.cache/gget.
+    - verbose         True/False whether to print progress information. Default True.
+
+    Returns path to the DIAMOND database (.dmnd).
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get("GGET_CACHE_DIR", GGET_CACHE_DIR)
+    db_dir = os.path.join(
+        os.path.abspath(os.path.expanduser(cache_dir)), DIAMOND_DB_CACHE_SUBDIR
+    )
+    os.makedirs(db_dir, exist_ok=True)
+
+    stat = os.stat(reference_file)
+    content_hash = hash_file_content(
+        os.path.abspath(reference_file), stat.st_size, stat.st_mtime_ns
+    )
+    version = get_diamond_version(diamond_binary)
+    diamond_db = os.path.join(db_dir, f"{content_hash}_diamond-{version}.dmnd")
+
+    if os.path.exists(diamond_db):
+        if verbose:
+            logger.info(f"Using cached DIAMOND database {diamond_db}.")
+    else:
+        if verbose:
+            logger.info(f"Creating DIAMOND database {diamond_db}...")
+        make_diamond_db(diamond_binary, reference_file, diamond_db, threads=threads)
+
+    return diamond_db
+
+
+def write_diamond_db_info(diamond_binary, reference_file, diamond_db):
+    """
+    Record the DIAMOND version and the hash of the reference sequences a DIAMOND database was created with
+    (saved next to the database as <diamond_db>.json).
+    """
+    stat = os.stat(reference_file)
+    info = {
+        "diamond_version": get_diamond_version(diamond_binary),
+        "reference_sha256": hash_file_content(
+            os.path.abspath(reference_file), stat.st_size, stat.st_mtime_ns
+        ),
+    }
+    with open(f"{diamond_db}.json", "w") as f:
+        json_package.dump(info, f, indent=4)
+
+
+def is_current_diamond_db(diamond_binary, reference_file, diamond_db):
+    """
+    Returns True if a DIAMOND database exists and was created from the current reference sequences
+    using the same DIAMOND version (according to the info saved by write_diamond_db_info).
+    """
+    if not os.path.exists(diamond_db) or not os.path.exists(f"{diamond_db}.json"):
+        return False
+
+    try:
+        with open(f"{diamond_db}.json") as f:
+            info = json_package.load(f)
+        stat = os.stat(reference_file)
+        return info == {
+            "diamond_version": get_diamond_version(diamond_binary),
+            "reference_sha256": hash_file_content(
+                os.path.abspath(reference_file), stat.st_size, stat.st_mtime_ns
+            ),
+        }
+    except (ValueError, OSError, RuntimeError):
+        return False
+
+
+def prepare_alignment(
+    query, reference, diamond_db, threads, diamond_binary, cache, out, verbose
+):
+    """
+    Write query/reference sequences to temporary FASTA files (if needed) and create the DIAMOND database
+    (unless a database created from the same reference sequences exists already). See gget.diamond for a description of the arguments.
+    The temporary files are deleted if the database cannot be created.
+
+    Returns path to DIAMOND binary, path to query FASTA file, path to DIAMOND database and list of temporary files.
+    """
+    # Handle command line passing path to FASTA as a list
+    if isinstance(query, list) and len(query) == 1:
+        query = query[0]
+    if isinstance(reference, list) and len(reference) == 1:
+        reference = reference[0]
+
+    # Define paths to query/reference/db files
+    files_to_delete = []
+    if "." in query:
+        input_file = os.path.abspath(query)
+    else:
+        input_file = create_tmp_fasta(query)
+        files_to_delete.append(input_file)
+
+    if "." in reference:
+        reference_file = os.path.abspath(reference)
+    else:
+        reference_file = create_tmp_fasta(reference)
+        files_to_delete.append(reference_file)
+
+    if diamond_binary:
+        DIAMOND = diamond_binary
+    else:
+        DIAMOND = PRECOMPILED_DIAMOND_PATH
+
+    try:
+        # Create the DIAMOND database (unless it was created from the same reference sequences already)
+        if diamond_db:
+            diamond_db = os.path.abspath(diamond_db)
+            if not diamond_db.endswith(".dmnd"):
+                diamond_db += ".dmnd"
+
+            if is_current_diamond_db(DIAMOND, reference_file, diamond_db):
+                if verbose:
+                    logger.info(f"Using DIAMOND database {diamond_db}.")
+            else:
+                if verbose:
+                    logger.info(f"Creating DIAMOND database {diamond_db}...")
+                make_diamond_db(DIAMOND, reference_file, diamond_db, threads=threads)
+                write_diamond_db_info(DIAMOND, reference_file, diamond_db)
+
+        elif cache:
+            diamond_db = get_cached_diamond_db(
+                DIAMOND, reference_file, threads=threads, verbose=verbose
+            )
+
+        else:
+            if out:
+                diamond_db = f"{out}/DIAMOND_db.dmnd"
+            else:
+                diamond_db = os.path.abspath(f"tmp_db_{str(uuid.uuid4())}.dmnd")
+                files_to_delete.append(diamond_db)
+
+            if verbose:
+                logger.info(f"Creating DIAMOND database...")
+            make_diamond_db(DIAMOND, reference_file, diamond_db, threads=threads)
+
+    except BaseException:
+        remove_temp_files(files_to_delete)
+        raise
+
+    return DIAMOND, input_file, diamond_db, files_to_delete
+
+
+def blastp_command(DIAMOND, input_file, diamond_db, sensitivity, threads, output=None):
+    """
+    Returns the DIAMOND blastp shell command. Results are written to standard out if output is None.
+    """
+    command = f"{shell_path(DIAMOND)} blastp --outfmt {DIAMOND_OUTFMT} \
+        --quiet --query {shell_path(input_file)} --db {shell_path(diamond_db)} --{sensitivity} --threads {threads} --ignore-warnings"
+    if output:
+        command += f" --out {shell_path(output)}"
+    return command
+
+
+def check_sensitivity(sensitivity):
+    supported_sens = [
+        "fast",
+        "mid-sensitive",
+        "sensitive",
+        "more-sensitive",
+        "very-sensitive",
+        "ultra-sensitive",
+    ]
+    if sensitivity not in supported_sens:
+        raise ValueError(
+            f"'sensitivity' argument specified as {sensitivity}. Expected one of: {', '.join(supported_sens)}"
+        )
+
+
+def iter_diamond(
+    query,
+    reference,
+    diamond_db=None,
+    sensitivity="very-sensitive",
+    threads=1,
+    diamond_binary=None,
+    cache=False,
+    batch_size=DIAMOND_BATCH_SIZE,
+    verbose=True,
+):
+    """
+    Align multiple protein or translated DNA sequences using DIAMOND and yield the results in batches while DIAMOND is running.
+    Results are read directly from the standard output of DIAMOND (no results file is written) using compact data types:
+    categorical accessions, int32 lengths and coordinates, float32 identity percentage and bit score, and float64 e-value.
+
+    Args:
+    - query          Sequences (str or list) or path to FASTA file containing sequences to be aligned against the reference.
+    - reference      Reference sequences (str or list) or path to FASTA file containing reference sequences.
+    - diamond_db     Path to DIAMOND database (.dmnd) of the reference (see gget.diamond). Default: None.
+    - sensitivity    Sensitivity of DIAMOND alignment.
+                     One of the following: fast, mid-sensitive, sensitive, more-sensitive, very-sensitive or ultra-sensitive.
+                     Default: "very-sensitive"
+    - threads        Number of threads to use for alignment. Default: 1.
+    - diamond_binary Path to DIAMOND binary, e.g. path/bins/Linux/diamond. Default: None -> Uses DIAMOND binary installed with gget.
+    - cache          If True and no 'diamond_db' is provided, the DIAMOND database is kept in the gget cache directory (see gget.diamond).
+                     Default: False.
+    - batch_size     Maximum number of alignments per batch. Default: 100000.
+    - verbose        True/False whether to print progress information. Default True.
+
+    Yields data frames with the DIAMOND alignment results (columns as returned by gget.diamond).
+    """
+    check_sensitivity(sensitivity)
+
+    DIAMOND, input_file, diamond_db, files_to_delete = prepare_alignment(
+        query, reference, diamond_db, threads, diamond_binary, cache, None, verbose
+    )
+
+    if verbose:
+        logger.info(f"Initiating alignment...")
+
+    process = subprocess.Popen(
+        blastp_command(DIAMOND, input_file, diamond_db, sensitivity, threads),
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    # Collect the standard error in the background so that DIAMOND never blocks on a full pipe
+    stderr = []
+    stderr_thread = threading.Thread(
+        target=lambda: stderr.append(process.stderr.read().decode("utf-8")),
+        daemon=True,
+    )
+    stderr_thread.start()
+
+    completed = False
+    try:
+        for batch in pd.read_csv(
+            process.stdout,
+            sep="\t",
+            names=DIAMOND_COLUMNS,
+            dtype=DIAMOND_DTYPES,
+            chunksize=batch_size,
+        ):
+            yield batch
+        completed = True
+
+    finally:
+        # Stop DIAMOND if the batches were not consumed entirely
+        if not completed:
+            process.kill()
+        process.stdout.close()
+        returncode = process.wait()
+        stderr_thread.join()
+        process.stderr.close()
+        remove_temp_files(files_to_delete)
+
+    # Log the standard error if it is not empty
+    if stderr and stderr[0]:
+        sys.stderr.write(stderr[0])
+
+    if returncode != 0:
+        raise RuntimeError("DIAMOND alignment failed.")
+
+    if verbose:
+        logger.info(f"DIAMOND alignment complete.")
+
+
+def write_diamond_parquet(batches, parquet_file):
+    """
+    Write batches of DIAMOND results (e.g. yielded by iter_diamond) to a Parquet file (requires pyarrow).
+    Each batch is written as it arrives, so the results are never held in memory entirely.
+
+    Returns the number of alignments written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Fixed schema (categorical accessions are dictionary-encoded)
+    fields = []
+    for col in DIAMOND_COLUMNS:
+        if DIAMOND_DTYPES[col] == "category":
+            fields.append(pa.field(col, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append(pa.field(col, pa.from_numpy_dtype(DIAMOND_DTYPES[col])))
+    schema = pa.schema(fields)
+
+    n_rows = 0
+    with pq.ParquetWriter(parquet_file, schema, compression="zstd") as writer:
+        for batch in batches:
+            writer.write_table(
+                pa.Table.from_pandas(batch, schema=schema, preserve_index=False)
+            )
+            n_rows += len(batch)
+
+    return n_rows
+
 
 def diamond(
     query,
@@ -28,6 +456,8 @@ def diamond(
     sensitivity="very-sensitive",
     threads=1,
     diamond_binary=None,
+    cache=False,
+    parquet=False,
     verbose=True,
     json=False,
     out=None,
@@ -38,134 +468,99 @@ def diamond(
     Args:
     - query          Sequences (str or list) or path to FASTA file containing sequences to be aligned against the reference.
     - reference      Reference sequences (str or list) or path to FASTA file containing reference sequences.
-    - diamond_db     Path to save DIAMOND database created from reference.
-                     Default: None -> Temporary db file will be deleted after alignment or saved in 'out' if 'out' is provided.
+    - diamond_db     Path to DIAMOND database (.dmnd) of the reference. If the database was created from the same reference sequences
+                     using the same DIAMOND version by a previous gget.diamond call, it is used for the alignment without creating it again.
+                     Otherwise, it is (re)created from the reference. Default: None -> Database is created for this alignment (see 'cache').
     - sensitivity    Sensitivity of DIAMOND alignment.
                      One of the following: fast, mid-sensitive, sensitive, more-sensitive, very-sensitive or ultra-sensitive.
                      Default: "very-sensitive"
     - threads        Number of threads to use for alignment. Default: 1.
     - diamond_binary Path to DIAMOND binary, e.g. path/bins/Linux/diamond. Default: None -> Uses DIAMOND binary installed with gget.
+    - cache          If True and no 'diamond_db' is provided, the DIAMOND database created from the reference is kept in
+                     the gget cache directory (GGET_CACHE_DIR environment variable if set, else ~/.cache/gget) and reused
+                     by later alignments against the same reference sequences using the same DIAMOND version
+                     (cached databases are deleted using gget.cache("clear")).
+                     If False, a temporary database is deleted after alignment or saved in 'out' if 'out' is provided. Default: False.
+    - parquet        If True, results are streamed from DIAMOND into 'out'/gget_diamond_results.parquet (requires pyarrow and 'out')
+                     using compact data types (see gget.gget_diamond.iter_diamond) instead of being returned. Default: False.
     - verbose        True/False whether to print progress information. Default True.
     - json           If True, returns results in json format instead of data frame. Default: False.
     - out            Path to folder to save DIAMOND results in. Default: Standard out, temporary files are deleted.
 
     Returns a data frame with the DIAMOND alignment results. (Or JSON formatted dictionary if json=True.)
+    Returns the path to the Parquet file if parquet=True.
     """
     # Check argument validity
-    supported_sens = [
-        "fast",
-        "mid-sensitive",
-        "sensitive",
-        "more-sensitive",
-        "very-sensitive",
-        "ultra-sensitive",
-    ]
-    if sensitivity not in supported_sens:
-        raise ValueError(
-            f"'sensitivity' argument specified as {sensitivity}. Expected one of: {', '.join(supported_sens)}"
-        )
-
-    # Handle command line passing path to FASTA as a list
-    if isinstance(query, list) and len(query) == 1:
-        query = query[0]
-    if isinstance(reference, list) and len(reference) == 1:
-        reference = reference[0]
-
-    # Define paths to query/reference/db/output files
-    files_to_delete = []
-    if "." in query:
-        input_file = os.path.abspath(query)
-    else:
-        input_file = create_tmp_fasta(query)
-        files_to_delete.append(input_file)
+    check_sensitivity(sensitivity)
 
-    if "." in reference:
-        reference_file = os.path.abspath(reference)
-    else:
-        reference_file = create_tmp_fasta(reference)
-        files_to_delete.append(reference_file)
+    if parquet:
+        if not out:
+            raise ValueError("Writing DIAMOND results to Parquet requires 'out'.")
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError(
+                "Writing DIAMOND results to Parquet requires the pyarrow package. Install it using pip (https://pypi.org/project/pyarrow)."
+            )
 
     # Create out folder if it does not exist
     if out:
         os.makedirs(out, exist_ok=True)
+        out = os.path.abspath(out)
 
+    if parquet:
+        parquet_file = f"{out}/gget_diamond_results.parquet"
+        n_rows = write_diamond_parquet(
+            iter_diamond(
+                query,
+                reference,
+                diamond_db=diamond_db,
+                sensitivity=sensitivity,
+                threads=threads,
+                diamond_binary=diamond_binary,
+                cache=cache,
+                verbose=verbose,
+            ),
+            parquet_file,
+        )
+        if verbose:
+            logger.info(f"Saved {n_rows} alignments in {parquet_file}.")
+        return parquet_file
+
+    DIAMOND, input_file, diamond_db, files_to_delete = prepare_alignment(
+        query, reference, diamond_db, threads, diamond_binary, cache, out, verbose
+    )
+
+    # Define path to output file
     if out:
-        out = os.path.abspath(out)
         output = f"{out}/DIAMOND_results.tsv"
     else:
         output = os.path.abspath(f"tmp_{str(uuid.uuid4())}_out.tsv")
         files_to_delete.append(output)
 
-    if not diamond_db and out:
-        diamond_db = f"{out}/DIAMOND_db"
-    elif not diamond_db:
-        diamond_db = os.path.abspath(f"tmp_db_{str(uuid.uuid4())}")
-        files_to_delete.append(diamond_db + ".dmnd")
-
-    if diamond_binary:
-        DIAMOND = diamond_binary
-    else:
-        DIAMOND = PRECOMPILED_DIAMOND_PATH
-
-    # Replace slashes in paths for Windows compatibility
-    if platform.system() == "Windows":
-        DIAMOND_w = DIAMOND.replace("/", "\\")
-        reference_file_w = reference_file.replace("/", "\\")
-        diamond_db_w = diamond_db.replace("/", "\\")
-        input_file_w = input_file.replace("/", "\\")
-        reference_file_w = reference_file.replace("/", "\\")
-        output_w = output.replace("/", "\\")
-
-    if platform.system() == "Windows":
-        command = f"{DIAMOND} version \
-        && {DIAMOND_w} makedb --quiet --in {reference_file_w} --db {diamond_db_w} --threads {threads} \
-        && {DIAMOND_w} blastp --outfmt 6 qseqid sseqid pident qlen slen length mismatch gapopen qstart qend sstart send evalue bitscore \
-            --quiet --query {input_file_w} --db {reference_file_w} --out {output_w} --{sensitivity} --threads {threads} --ignore-warnings"
-    else:
-        command = f"'{DIAMOND}' version \
-        && '{DIAMOND}' makedb --quiet --in '{reference_file}' --db '{diamond_db}' --threads {threads} \
-        && '{DIAMOND}' blastp --outfmt 6 qseqid sseqid pident qlen slen length mismatch gapopen qstart qend sstart send evalue bitscore \
-            --quiet --query '{input_file}' --db '{reference_file}' --out '{output}' --{sensitivity} --threads {threads} --ignore-warnings"
-
-    # Run DIAMOND
-    if verbose:
-        logger.info(f"Creating DIAMOND database and initiating alignment...")
-
-    with subprocess.Popen(command, shell=True, stderr=subprocess.PIPE) as process:
-        stderr = process.stderr.read().decode("utf-8")
-        # Log the standard error if it is not empty
-        if stderr:
-            sys.stderr.write(stderr)
+    try:
+        # Run DIAMOND
+        if verbose:
+            logger.info(f"Initiating alignment...")
 
-    # Exit system if the subprocess returned wstdout = sys.stdout
-    if process.wait() != 0:
-        raise RuntimeError("DIAMOND alignment failed.")
-    else:
+        run_diamond_command(
+            blastp_command(
+                DIAMOND, input_file, diamond_db, sensitivity, threads, output
+            ),
+            "DIAMOND alignment failed.",
+        )
         if verbose:
             logger.info(f"DIAMOND alignment complete.")
 
-    df_diamond = tsv_to_df(
-        output,
-        headers=[
-            "query_accession",
-            "subject_accession",
-            "identity_percentage",
-            "query_seq_length",
-            "subject_seq_length",
-            "length",
-            "mismatches",
-            "gap_openings",
-            "query_start",
-            "query_end",
-            "subject_start",
-            "subject_end",
-            "e-value",
-            "bit_score",
-        ],
-    )
+        # Accessions are read as strings, so numeric sequence IDs (e.g. '>1') match their FASTA headers
+        df_diamond = tsv_to_df(
+            output,
+            headers=DIAMOND_COLUMNS,
+            dtype={"query_accession": str, "subject_accession": str},
+        )
 
-    # Delete temporary files
-    if files_to_delete:
+    finally:
+        # Delete temporary files
         remove_temp_files(files_to_delete)
 
     if json:
@@ -3,35 +3,186 @@ import numpy as np
 import os
 import json as json_package
 import re
-
-from .utils import get_uniprot_seqs, tsv_to_df, set_up_logger
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from .utils import (
+    get_uniprot_seqs,
+    tsv_to_df,
+    set_up_logger,
+    iter_fasta,
+    write_fasta,
+    remove_temp_files,
+)
 logger = set_up_logger()
 
 from .constants import UNIPROT_REST_API
 from .gget_diamond import diamond
 from .gget_setup import (
     ELM_INSTANCES_FASTA,
+    ELM_INSTANCES_DMND,
     ELM_CLASSES_TSV,
     ELM_INSTANCES_TSV,
     ELM_INTDOMAINS_TSV,
 )
 
 
-def motif_in_query(row):
+# Column names of the ELM interaction domains tsv file
+ELM_INTDOMAIN_COLUMNS = {
+    "ELM identifier": "ELMIdentifier",
+    "Interaction Domain Id": "InteractionDomainId",
+    "Interaction Domain Description": "InteractionDomainDescription",
+    "Interaction Domain Name": "InteractionDomainName",
+}
+
+
+class ElmReference:
     """
-    Checks if motif is in the overlapping region with the query sequence
+    ELM classes, instances and interaction domains parsed once from the local ELM tsv files.
+    Instances are indexed on their UniProt Acc (Primary_Acc) and class information on the ELMIdentifier,
+    so that looking up the ELMs of a DIAMOND hit or regex match does not require reading or filtering the tables again.
 
     Args:
-    row     - row in dataframe
+    - classes_tsv      Path to the ELM classes tsv file.
+    - instances_tsv    Path to the ELM instances tsv file.
+    - intdomains_tsv   Path to the ELM interaction domains tsv file.
+    """
+
+    def __init__(self, classes_tsv, instances_tsv, intdomains_tsv):
+        self.files = (classes_tsv, instances_tsv, intdomains_tsv)
+        self.mtimes = self.file_mtimes(self.files)
+
+        # ELM classes and instances tsv files contain 5 lines before headers and data
+        self.classes = tsv_to_df(classes_tsv, skiprows=5)
+        self.instances = tsv_to_df(instances_tsv, skiprows=5)
+        self.intdomains = tsv_to_df(intdomains_tsv).rename(
+            columns=ELM_INTDOMAIN_COLUMNS
+        )
+
+        # Instances merged with their class description and interaction domains, indexed on Primary_Acc
+        self.ortho_instances = (
+            self.instances.rename(
+                columns={
+                    "Primary_Acc": "Ortholog_UniProt_Acc",
+                    "Start": "motif_start_in_subject",
+                    "End": "motif_end_in_subject",
+                }
+            )
+            .merge(
+                self.classes.rename(columns={"Accession": "class_accession"}),
+                how="left",
+                on="ELMIdentifier",
+            )
+            .merge(self.intdomains, how="left", on="ELMIdentifier")
+        )
+        self.ortho_index = self.ortho_instances.groupby(
+            "Ortholog_UniProt_Acc", sort=False
+        ).indices
+
+        # Classes merged with all their instances and interaction domains, indexed on ELMIdentifier
+        # (merged using the ELM Identifier, since some Accessions are missing from elm_instances.tsv)
+        self.class_instances = self.classes.merge(
+            self.instances, how="left", on="ELMIdentifier"
+        ).merge(self.intdomains, how="left", on="ELMIdentifier")
+        self.class_index = self.class_instances.groupby(
+            "ELMIdentifier", sort=False
+        ).indices
+
+        # ELM class regexes, compiled on first use
+        self.regex_patterns = None
+
+    @staticmethod
+    def file_mtimes(files):
+        return tuple(os.path.getmtime(file) for file in files)
+
+    def is_current(self, files):
+        """
+        Returns True if the reference was parsed from the given files and they did not change since.
+        """
+        return self.files == tuple(files) and self.mtimes == self.file_mtimes(files)
+
+    def get_instances(self, uniprot_id):
+        """
+        Returns data frame of the ELM instances (with class information) of a UniProt Acc.
+        """
+        positions = self.ortho_index.get(uniprot_id, [])
+        return self.ortho_instances.iloc[positions].reset_index(drop=True)
+
+    def compile_patterns(self):
+        """
+        Returns list of (ELMIdentifier, compiled regex) tuples of all ELM classes.
+        Each regex is wrapped in a lookahead to also find overlapping motifs.
+        """
+        if self.regex_patterns is None:
+            self.regex_patterns = [
+                (elm_identifier, re.compile(f"(?=({pattern}))"))
+                for elm_identifier, pattern in zip(
+                    self.classes["ELMIdentifier"], self.classes["Regex"]
+                )
+            ]
+        return self.regex_patterns
+
+    def scan(self, sequence):
+        """
+        Find all ELM class regex matches in an amino acid sequence.
+
+        Returns data frame with one row per match containing the ELMIdentifier, the matched sequence
+        and the motif start (1-based) and end in the query sequence.
+        """
+        elm_identifiers = []
+        matched_seqs = []
+        starts = []
+        ends = []
+        for elm_identifier, pattern in self.compile_patterns():
+            for match in pattern.finditer(sequence):
+                start, end = match.span(1)
+                elm_identifiers.append(elm_identifier)
+                matched_seqs.append(match.group(1))
+                starts.append(start + 1)
+                ends.append(end)
+
+        return pd.DataFrame(
+            {
+                "ELMIdentifier": elm_identifiers,
+                "Instances (Matched Sequence)": matched_seqs,
+                "motif_start_in_query": np.array(starts, dtype=int),
+                "motif_end_in_query": np.array(ends, dtype=int),
+            }
+        )
 
-    Returns: True if the motif is in between the subject start and end of sequence. False otherwise
+    def get_class_instances(self, elm_identifier):
+        """
+        Returns data frame of an ELM class merged with its instances and interaction domains.
+        """
+        positions = self.class_index.get(elm_identifier, [])
+        return self.class_instances.iloc[positions].reset_index(drop=True)
+
+
+elm_reference = None
+elm_reference_lock = threading.Lock()
+
+
+def get_elm_reference():
     """
-    return (
-        True
-        if (row["motif_start_in_subject"] >= row["subject_start"])
-        & (row["motif_end_in_subject"] <= row["subject_end"])
-        else False
-    )
+    Return the ELM reference tables shared by all gget.elm calls of this process.
+    The local ELM files are parsed on first use and again when they change (e.g. after 'gget setup elm').
+    """
+    global elm_reference
+    files = (ELM_CLASSES_TSV, ELM_INSTANCES_TSV, ELM_INTDOMAINS_TSV)
+    with elm_reference_lock:
+        if elm_reference is None or not elm_reference.is_current(files):
+            elm_reference = ElmReference(*files)
+        return elm_reference
+
+
+def clear_elm_reference():
+    """
+    Drop the cached ELM reference tables so that the local ELM files are parsed again on the next gget.elm call.
+    """
+    global elm_reference
+    with elm_reference_lock:
+        elm_reference = None
 
 
 def get_elm_instances(UniProtID):
@@ -43,41 +194,47 @@ def get_elm_instances(UniProtID):
 
     Returns: dataframe combining ELM instances and information (description, functional site...)
     """
-    # Get matching rows from elm_instances.tsv
-    # ELM Instances.tsv file contains 5 lines before headers and data
-    df_full_instances = tsv_to_df(ELM_INSTANCES_TSV, skiprows=5)
-    df_instances_matching = df_full_instances[
-        df_full_instances["Primary_Acc"] == UniProtID
-    ]
-    # Rename columns
-    df_instances_matching = df_instances_matching.rename(
-        columns={
-            "Primary_Acc": "Ortholog_UniProt_Acc",
-            "Start": "motif_start_in_subject",
-            "End": "motif_end_in_subject",
-        }
-    )
+    return get_elm_reference().get_instances(UniProtID)
 
-    # Get class descriptions
-    df_classes = tsv_to_df(ELM_CLASSES_TSV, skiprows=5)
-    df_classes = df_classes.rename(columns={"Accession": "class_accession"})
-
-    # Get interaction domains
-    df_intdomains = tsv_to_df(ELM_INTDOMAINS_TSV)
-    df_intdomains = df_intdomains.rename(
-        columns={
-            "ELM identifier": "ELMIdentifier",
-            "Interaction Domain Id": "InteractionDomainId",
-            "Interaction Domain Description": "InteractionDomainDescription",
-            "Interaction Domain Name": "InteractionDomainName",
-        }
-    )
 
-    # Merge data frames using ELM Identifier
-    df_final = df_instances_matching.merge(df_classes, how="left", on="ELMIdentifier")
-    df_final = df_final.merge(df_intdomains, how="left", on="ELMIdentifier")
+def get_ortholog_instances(df_diamond):
+    """
+    Get the ELM instances of all UniProt Accs returned by DIAMOND and add the alignment information of each hit,
+    including whether the motif lies inside the region of the subject sequence aligned to the query.
 
-    return df_final
+    Args:
+    df_diamond - data frame returned by gget.diamond for an alignment against the ELM instances FASTA file
+
+    Returns: data frame with one row per ELM instance and DIAMOND hit (the query_accession column identifies the query sequence)
+    """
+    elm_reference = get_elm_reference()
+
+    # Rows of the ELM instances of each hit
+    no_instances = np.zeros(0, dtype=np.intp)
+    positions = [
+        elm_reference.ortho_index.get(str(subject).split("|")[1], no_instances)
+        for subject in df_diamond["subject_accession"].values
+    ]
+    hit_rows = np.repeat(
+        np.arange(len(df_diamond)), [len(hit_positions) for hit_positions in positions]
+    )
+    positions = np.concatenate([no_instances] + positions)
+
+    df = elm_reference.ortho_instances.take(positions).reset_index(drop=True)
+    df_hits = df_diamond.iloc[hit_rows]
+
+    df["query_seq_length"] = df_hits["query_seq_length"].values
+    df["subject_seq_length"] = df_hits["subject_seq_length"].values
+    df["alignment_length"] = df_hits["length"].values
+    df["identity_percentage"] = df_hits["identity_percentage"].values
+    for col in ["query_start", "query_end", "subject_start", "subject_end"]:
+        df[col] = df_hits[col].values.astype(int)
+    df["motif_inside_subject_query_overlap"] = (
+        df["motif_start_in_subject"] >= df["subject_start"]
+    ) & (df["motif_end_in_subject"] <= df["subject_end"])
+    df["query_accession"] = df_hits["query_accession"].values
+
+    return df
 
 
 def seq_workflow(
@@ -88,10 +245,12 @@ def seq_workflow(
     threads,
     verbose,
     diamond_binary,
+    diamond_db=None,
 ):
     """
     Alignment of sequence using DIAMOND to get UniProt Acc. Use the UniProt Acc to construct an ortholog dataframe similar to the UniProt workflow
     except for additional columns for start, end and whether the motif overlaps the subject sequence.
+    All sequences are aligned in a single DIAMOND run.
 
     Args:
     sequences        - list of user input amino acid sequence
@@ -102,6 +261,7 @@ def seq_workflow(
     threads          - Number of threads used for DIAMOND alignment
     verbose          - If True, turns on logging for INFO_level messages
     diamond_binary   - Path to DIAMOND binary
+    diamond_db       - Path to prebuilt DIAMOND database of the reference (None -> created from reference)
 
     Returns: data frame consisting of ELM instances, class information, start, end in query, and if motif overlaps with subject sequence
     """
@@ -110,62 +270,73 @@ def seq_workflow(
             f"ORTHO Performing pairwise sequence alignment against ELM database using DIAMOND for {len(sequences)} sequence(s)..."
         )
 
-    df = pd.DataFrame()
-    seq_number = 1
-    # for sequence, seq_len in zip(sequences, sequence_lengths):
-    for sequence in sequences:
-        df_diamond = diamond(
-            query=sequence,
-            reference=reference,
-            sensitivity=sensitivity,
-            threads=threads,
-            verbose=verbose,
-            diamond_binary=diamond_binary,
-        )
+    # Sequences are named Seq0, Seq1, ... in the DIAMOND query
+    df_diamond = diamond(
+        query=list(sequences),
+        reference=reference,
+        diamond_db=diamond_db,
+        sensitivity=sensitivity,
+        threads=threads,
+        verbose=verbose,
+        diamond_binary=diamond_binary,
+    )
+
+    for seq_number in range(1, len(sequences) + 1):
+        subjects = df_diamond[df_diamond["query_accession"] == f"Seq{seq_number - 1}"][
+            "subject_accession"
+        ].values
 
-        if len(df_diamond) == 0:
+        if len(subjects) == 0:
             logger.warning(
                 f"ORTHO Sequence {seq_number}/{len(sequences)}: No orthologous proteins found in ELM database."
             )
 
-        else:
-            # Construct df with elm instances from UniProt Acc returned from diamond
-            # TODO double check that this gets info if more than one UniProt Acc matched
-            if verbose:
-                uniprot_ids = [
-                    str(id).split("|")[1]
-                    for id in df_diamond["subject_accession"].values
-                ]
-                logger.info(
-                    f"ORTHO Sequence {seq_number}/{len(sequences)}: DIAMOND found the following orthologous proteins: {', '.join(uniprot_ids)}. Retrieving ELMs for each UniProt Acc..."
-                )
+        elif verbose:
+            uniprot_ids = [str(id).split("|")[1] for id in subjects]
+            logger.info(
+                f"ORTHO Sequence {seq_number}/{len(sequences)}: DIAMOND found the following orthologous proteins: {', '.join(uniprot_ids)}. Retrieving ELMs for each UniProt Acc..."
+            )
 
-            for i, uniprot_id in enumerate(df_diamond["subject_accession"].values):
-                # print(f"UniProt Acc {uniprot_id}")
-                df_elm = get_elm_instances(str(uniprot_id).split("|")[1])
-                # missing motifs other than the first one
-                # df_elm["query_cover"] = df_diamond["length"].values[i] / seq_len * 100
-                df_elm["query_seq_length"] = df_diamond["query_seq_length"].values[i]
-                df_elm["subject_seq_length"] = df_diamond["subject_seq_length"].values[
-                    i
-                ]
-                df_elm["alignment_length"] = df_diamond["length"].values[i]
-                df_elm["identity_percentage"] = df_diamond[
-                    "identity_percentage"
-                ].values[i]
-                df_elm["query_start"] = int(df_diamond["query_start"].values[i])
-                df_elm["query_end"] = int(df_diamond["query_end"].values[i])
-                df_elm["subject_start"] = int(df_diamond["subject_start"].values[i])
-                df_elm["subject_end"] = int(df_diamond["subject_end"].values[i])
-                df_elm["motif_inside_subject_query_overlap"] = df_elm.apply(
-                    motif_in_query, axis=1
-                )
+    # Construct df with elm instances from UniProt Accs returned from diamond
+    return get_ortholog_instances(df_diamond)
 
-                df = pd.concat([df, df_elm])
 
-        seq_number += 1
+def annotate_regex_matches(df_matches):
+    """
+    Add ELM class, instance and interaction domain information to regex matches.
 
-    return df
+    Args:
+    df_matches - data frame of regex matches returned by ElmReference.scan
+                 (additional columns, e.g. a query ID, are kept as the first columns)
+
+    Returns:
+    df_final - dataframe containing regex matches
+    """
+    if len(df_matches) == 0:
+        return pd.DataFrame()
+
+    elm_reference = get_elm_reference()
+    match_cols = [
+        "Instances (Matched Sequence)",
+        "motif_start_in_query",
+        "motif_end_in_query",
+    ]
+
+    # Add information to all matches at once
+    # (merged using ELM Identifier, since some Accessions are missing from elm_instances.tsv)
+    df_final = df_matches.merge(
+        elm_reference.class_instances, how="left", on="ELMIdentifier"
+    )
+    columns = list(elm_reference.class_instances.columns)
+    columns[1:1] = match_cols
+    extra_cols = [
+        col for col in df_matches.columns if col not in match_cols + ["ELMIdentifier"]
+    ]
+    df_final = df_final[extra_cols + columns]
+
+    df_final.rename(columns={"Accession_x": "Instance_accession"}, inplace=True)
+
+    return df_final
 
 
 def regex_match(sequence):
@@ -177,95 +348,70 @@ def regex_match(sequence):
 
     Returns:
     df_final - dataframe containing regex matches
-    TODO: Make sure this returns empty dataframe if no matches were found
-    """
-    # Get all motif regex patterns from elm db local file
-    df_elm_classes = tsv_to_df(ELM_CLASSES_TSV, skiprows=5)
-    df_full_instances = tsv_to_df(ELM_INSTANCES_TSV, skiprows=5)
-    df_full_intdomains = tsv_to_df(ELM_INTDOMAINS_TSV)
-    df_full_intdomains = df_full_intdomains.rename(
-        columns={
-            "ELM identifier": "ELMIdentifier",
-            "Interaction Domain Id": "InteractionDomainId",
-            "Interaction Domain Description": "InteractionDomainDescription",
-            "Interaction Domain Name": "InteractionDomainName",
-        }
-    )
+    """
+    # Find all ELM regex matches in the input sequence
+    df_matches = get_elm_reference().scan(sequence)
 
-    elm_ids = df_elm_classes["Accession"]
-    regex_patterns = df_elm_classes["Regex"]
+    return annotate_regex_matches(df_matches)
 
-    df_final = pd.DataFrame()
 
-    # Compare ELM regex with input sequence and return all matching elms
-    for elm_id, pattern in zip(elm_ids, regex_patterns):
-        regex_matches = re.finditer(f"(?=({pattern}))", sequence)
+def scan_shard(records):
+    """
+    Find the ELM regex matches of a shard of sequences (run in a worker process).
 
-        for match_string in regex_matches:
-            elm_row = df_elm_classes[df_elm_classes["Accession"] == elm_id]
-            elm_row.insert(
-                loc=1,
-                column="Instances (Matched Sequence)",
-                value=match_string.group(1),
-            )
+    Args:
+    records - list of (query ID, amino acid sequence) tuples
 
-            (start, end) = match_string.span(1)
-            elm_row.insert(loc=2, column="motif_start_in_query", value=int(start + 1))
-            elm_row.insert(loc=3, column="motif_end_in_query", value=int(end))
+    Returns: data frame of regex matches with a query_id column
+    """
+    elm_reference = get_elm_reference()
+    dfs = []
+    for query_id, sequence in records:
+        df = elm_reference.scan(sequence)
+        df.insert(0, "query_id", query_id)
+        dfs.append(df)
 
-            elm_identifier = [str(x) for x in elm_row["ELMIdentifier"]][0]
+    return pd.concat(dfs, ignore_index=True)
 
-            # df_instances_matching = df_full_instances.loc[
-            #     df_full_instances["ELMIdentifier"] == elm_identifier
-            # ]
 
-            # merge two dataframes using ELM Identifier, since some Accessions are missing from elm_instances.tsv
-            elm_row = elm_row.merge(df_full_instances, how="left", on="ELMIdentifier")
-            elm_row = elm_row.merge(df_full_intdomains, how="left", on="ELMIdentifier")
+def scan_sequences(records, threads=1):
+    """
+    Find the ELM regex matches of many sequences, using a pool of worker processes if threads > 1.
+    Sequences are split into shards of similar total length (several shards per worker to balance the load).
 
-            df_final = pd.concat([df_final, elm_row])
+    Args:
+    records - list of (query ID, amino acid sequence) tuples
+    threads - number of worker processes
 
-    if len(df_final) > 0:
-        df_final.rename(columns={"Accession_x": "Instance_accession"}, inplace=True)
+    Returns: data frame of regex matches with a query_id column (in the order of the input sequences)
+    """
+    if threads <= 1 or len(records) < 2:
+        return scan_shard(records)
 
-    return df_final
+    # Load the reference before starting the workers so that forked workers do not parse the ELM files again
+    get_elm_reference()
 
+    n_shards = min(threads * 4, len(records))
+    seq_lengths = np.cumsum([len(sequence) for _, sequence in records])
+    shard_ids = np.minimum(
+        (seq_lengths - 1) * n_shards // seq_lengths[-1], n_shards - 1
+    )
+    bounds = np.searchsorted(shard_ids, np.arange(n_shards + 1))
 
-def elm(
-    sequence,
-    uniprot=False,
-    sensitivity="very-sensitive",
-    threads=1,
-    diamond_binary=None,
-    expand=False,
-    verbose=True,
-    json=False,
-    out=None,
-):
-    """
-    Locally predicts Eukaryotic Linear Motifs from an amino acid sequence or UniProt Acc using
-    data from the ELM database (http://elm.eu.org/).
+    with ProcessPoolExecutor(max_workers=threads) as executor:
+        futures = [
+            executor.submit(scan_shard, records[bounds[i] : bounds[i + 1]])
+            for i in range(n_shards)
+            if bounds[i] < bounds[i + 1]
+        ]
+        dfs = [future.result() for future in futures]
 
-    Args:
-    - sequence         Amino acid sequence or Uniprot Acc (str).
-                       If Uniprot Acc, set 'uniprot==True'.
-    - uniprot          Set to True if the input is a Uniprot Acc instead of an amino acid sequence. Default: False.
-    - sensitivity      Sensitivity of DIAMOND alignment.
-                       One of the following: fast, mid-sensitive, sensitive, more-sensitive, very-sensitive, or ultra-sensitive.
-                       Default: "very-sensitive"
-    - threads          Number of threads used in DIAMOND alignment. Default: 1.
-    - diamond_binary   Path to DIAMOND binary. Default: None -> Uses DIAMOND binary installed with gget.
-    - expand           Expand the information returned in the regex data frame to include the protein names, organisms
-                       and references that the motif was orignally validated on. Default: False.
-    - verbose          True/False whether to print progress information. Default: True.
-    - json             If True, returns results in json format instead of data frame. Default: False.
-    - out              Path to folder to save results in. Default: Standard out, temporary files are deleted.
+    return pd.concat(dfs, ignore_index=True)
 
-    Returns two data frames (or JSON formatted dictionaries if json=True):
-    The first contains information on motifs experimentally validated in orthologous proteins and
-    the second contains motifs found directly based on regex matches in the provided sequence.
 
-    ELM data can be downloaded & distributed for non-commercial use according to the ELM Software License Agreement (http://elm.eu.org/media/Elm_academic_license.pdf).
+def check_elm_files(verbose=True):
+    """
+    Raise an error if the local ELM files are missing and log when they were last updated.
     """
     # Check if ELM files were downloaded
     if (
@@ -289,72 +435,19 @@ def elm(
     if verbose:
         logger.info(", ".join(head).replace("#", "").replace("\n", ""))
 
-    # Check validity of amino acid seq
-    if not uniprot:
-        amino_acids = set("ARNDCQEGHILKMFPSTWYVBZXBJZ")
-        # Convert input sequence to upper case letters
-        sequence = sequence.upper()
-
-        # If sequence is not a valid amino sequence, raise error
-        if not set(sequence) <= amino_acids:
-            logger.warning(
-                f"Input amino acid sequence contains invalid characters. If the input is a UniProt Acc, please use flag --uniprot (Python: uniprot=True)."
-            )
 
-    # Build ortholog dataframe
-    if verbose:
-        logger.info(f"ORTHO Compiling ortholog information...")
-    ortho_df = pd.DataFrame()
-    if uniprot:
-        ortho_df = get_elm_instances(sequence)
-
-        if len(ortho_df) == 0:
-            logger.warning(
-                "ORTHO The provided UniProt Accession does not match UniProt Accessions in the ELM database. Fetching amino acid sequence from UniProt..."
-            )
-            df_uniprot = get_uniprot_seqs(server=UNIPROT_REST_API, ensembl_ids=sequence)
-
-            if len(df_uniprot) > 0:
-                # Only grab sequences where IDs match exactly
-                aa_seqs = df_uniprot[df_uniprot["uniprot_id"] == sequence][
-                    "sequence"
-                ].values
-
-                if len(aa_seqs) == 0:
-                    raise ValueError(
-                        f"No amino acid sequences found for UniProt Acc {sequence} from the UniProt server. Please double-check your UniProt Acc and try again."
-                    )
-
-                # seq_lens = [len(seq) for seq in aa_seqs]
-
-            else:
-                raise ValueError(
-                    f"No amino acid sequences found for UniProt Acc {sequence} from the UniProt server. Please double-check your UniProt Acc and try again."
-                )
-
-    if len(ortho_df) == 0:
-        # Add input aa sequence and its length to list
-        if not uniprot:
-            aa_seqs = [sequence]
-            # seq_lens = [len(sequence)]
-
-        ortho_df = seq_workflow(
-            sequences=aa_seqs,
-            # sequence_lengths=seq_lens,
-            reference=ELM_INSTANCES_FASTA,
-            sensitivity=sensitivity,
-            threads=threads,
-            verbose=verbose,
-            diamond_binary=diamond_binary,
-        )
+def format_ortho_results(ortho_df, id_cols=()):
+    """
+    Reorder the columns of the ortholog data frame, remove false positives and true negatives and drop duplicate rows.
 
-        if len(ortho_df) == 0:
-            logger.warning(
-                "ORTHO No ELM database orthologs found for input sequence or UniProt Acc."
-            )
+    Args:
+    ortho_df - ortholog data frame
+    id_cols  - columns to keep in front of the ortholog columns (e.g. query ID)
 
+    Returns: formatted ortholog data frame
+    """
     # Reorder columns of ortholog data frame
-    ortho_cols = [
+    ortho_cols = list(id_cols) + [
         "Ortholog_UniProt_Acc",
         "ProteinName",
         "class_accession",
@@ -398,47 +491,23 @@ def elm(
     # Drop duplicate rows and reset the index
     ortho_df = ortho_df.drop_duplicates().reset_index(drop=True)
 
-    # Build data frame containing regex motif matches
-    if verbose:
-        logger.info(f"REGEX Finding regex motif matches...")
-    fetch_aa_failed = False
-    if uniprot:
-        # use amino acid sequence associated with UniProt Acc to do regex match
+    return ortho_df
 
-        # do not fetch sequence again if already done above
-        if not "df_uniprot" in locals():
-            df_uniprot = get_uniprot_seqs(UNIPROT_REST_API, sequence)
-
-        if len(df_uniprot) > 0:
-            # Only grab sequences where IDs match exactly
-            sequences = df_uniprot[df_uniprot["uniprot_id"] == sequence][
-                "sequence"
-            ].values
 
-            if len(sequences) == 0:
-                logger.warning(
-                    f"REGEX No amino acid sequences found for UniProt Acc {sequence} from the UniProt server."
-                )
-                fetch_aa_failed = True
-            else:
-                if len(sequences) > 1:
-                    logger.warning(
-                        f"REGEX More than one amino acid sequence found for UniProt Acc {sequence}. Using best match to find regex motifs."
-                    )
-                sequence = sequences[0]
-
-    df_regex_matches = pd.DataFrame()
-    if not fetch_aa_failed:
-        df_regex_matches = regex_match(sequence)
+def format_regex_results(df_regex_matches, expand=False, id_cols=()):
+    """
+    Reorder the columns of the regex data frame, remove false positives and true negatives and drop duplicate rows.
 
-    if len(df_regex_matches) == 0:
-        logger.warning(
-            "REGEX No regex matches found for input sequence or UniProt Acc."
-        )
+    Args:
+    df_regex_matches - data frame of regex matches
+    expand           - if True, include the protein names, organisms and references of the ELM instances
+    id_cols          - columns to keep in front of the regex columns (e.g. query ID)
 
+    Returns: formatted regex data frame
+    """
     # Reorder regex columns
     if expand:
-        regex_cols = [
+        regex_cols = list(id_cols) + [
             "Instance_accession",
             "ELMIdentifier",
             "FunctionalSiteName",
@@ -461,7 +530,7 @@ def elm(
             "#Instances_in_PDB",
         ]
     else:
-        regex_cols = [
+        regex_cols = list(id_cols) + [
             "Instance_accession",
             "ELMIdentifier",
             "FunctionalSiteName",
@@ -497,6 +566,13 @@ def elm(
     # Drop duplicates and reset index
     df_regex_matches = df_regex_matches.drop_duplicates().reset_index(drop=True)
 
+    return df_regex_matches
+
+
+def save_results(ortho_df, df_regex_matches, json=False, out=None):
+    """
+    Save the ortholog and regex data frames in the 'out' folder and return them (as data frames or json).
+    """
     # Create out folder if it does not exist
     if out:
         os.makedirs(out, exist_ok=True)
@@ -519,3 +595,294 @@ def elm(
             df_regex_matches.to_csv(f"{out}/ELM_regex_results.csv", index=False)
 
     return ortho_df, df_regex_matches
+
+
+def elm(
+    sequence,
+    uniprot=False,
+    sensitivity="very-sensitive",
+    threads=1,
+    diamond_binary=None,
+    expand=False,
+    verbose=True,
+    json=False,
+    out=None,
+):
+    """
+    Locally predicts Eukaryotic Linear Motifs from an amino acid sequence or UniProt Acc using
+    data from the ELM database (http://elm.eu.org/).
+
+    Args:
+    - sequence         Amino acid sequence or Uniprot Acc (str).
+                       If Uniprot Acc, set 'uniprot==True'.
+    - uniprot          Set to True if the input is a Uniprot Acc instead of an amino acid sequence. Default: False.
+    - sensitivity      Sensitivity of DIAMOND alignment.
+                       One of the following: fast, mid-sensitive, sensitive, more-sensitive, very-sensitive, or ultra-sensitive.
+                       Default: "very-sensitive"
+    - threads          Number of threads used in DIAMOND alignment. Default: 1.
+    - diamond_binary   Path to DIAMOND binary. Default: None -> Uses DIAMOND binary installed with gget.
+    - expand           Expand the information returned in the regex data frame to include the protein names, organisms
+                       and references that the motif was orignally validated on. Default: False.
+    - verbose          True/False whether to print progress information. Default: True.
+    - json             If True, returns results in json format instead of data frame. Default: False.
+    - out              Path to folder to save results in. Default: Standard out, temporary files are deleted.
+
+    Returns two data frames (or JSON formatted dictionaries if json=True):
+    The first contains information on motifs experimentally validated in orthologous proteins and
+    the second contains motifs found directly based on regex matches in the provided sequence.
+
+    ELM data can be downloaded & distributed for non-commercial use according to the ELM Software License Agreement (http://elm.eu.org/media/Elm_academic_license.pdf).
+    """
+    check_elm_files(verbose=verbose)
+
+    # Check validity of amino acid seq
+    if not uniprot:
+        amino_acids = set("ARNDCQEGHILKMFPSTWYVBZXBJZ")
+        # Convert input sequence to upper case letters
+        sequence = sequence.upper()
+
+        # If sequence is not a valid amino sequence, raise error
+        if not set(sequence) <= amino_acids:
+            logger.warning(
+                f"Input amino acid sequence contains invalid characters. If the input is a UniProt Acc, please use flag --uniprot (Python: uniprot=True)."
+            )
+
+    # Build ortholog dataframe
+    if verbose:
+        logger.info(f"ORTHO Compiling ortholog information...")
+    ortho_df = pd.DataFrame()
+    if uniprot:
+        ortho_df = get_elm_instances(sequence)
+
+        if len(ortho_df) == 0:
+            logger.warning(
+                "ORTHO The provided UniProt Accession does not match UniProt Accessions in the ELM database. Fetching amino acid sequence from UniProt..."
+            )
+            df_uniprot = get_uniprot_seqs(server=UNIPROT_REST_API, ensembl_ids=sequence)
+
+            if len(df_uniprot) > 0:
+                # Only grab sequences where IDs match exactly
+                aa_seqs = df_uniprot[df_uniprot["uniprot_id"] == sequence][
+                    "sequence"
+                ].values
+
+                if len(aa_seqs) == 0:
+                    raise ValueError(
+                        f"No amino acid sequences found for UniProt Acc {sequence} from the UniProt server. Please double-check your UniProt Acc and try again."
+                    )
+
+                # seq_lens = [len(seq) for seq in aa_seqs]
+
+            else:
+                raise ValueError(
+                    f"No amino acid sequences found for UniProt Acc {sequence} from the UniProt server. Please double-check your UniProt Acc and try again."
+                )
+
+    if len(ortho_df) == 0:
+        # Add input aa sequence and its length to list
+        if not uniprot:
+            aa_seqs = [sequence]
+            # seq_lens = [len(sequence)]
+
+        ortho_df = seq_workflow(
+            sequences=aa_seqs,
+            # sequence_lengths=seq_lens,
+            reference=ELM_INSTANCES_FASTA,
+            sensitivity=sensitivity,
+            threads=threads,
+            verbose=verbose,
+            diamond_binary=diamond_binary,
+            # Database created by 'gget setup elm' (recreated in place if it is missing or outdated)
+            diamond_db=ELM_INSTANCES_DMND,
+        )
+
+        if len(ortho_df) == 0:
+            logger.warning(
+                "ORTHO No ELM database orthologs found for input sequence or UniProt Acc."
+            )
+
+    ortho_df = format_ortho_results(ortho_df)
+
+    # Build data frame containing regex motif matches
+    if verbose:
+        logger.info(f"REGEX Finding regex motif matches...")
+    fetch_aa_failed = False
+    if uniprot:
+        # use amino acid sequence associated with UniProt Acc to do regex match
+
+        # do not fetch sequence again if already done above
+        if not "df_uniprot" in locals():
+            df_uniprot = get_uniprot_seqs(UNIPROT_REST_API, sequence)
+
+        if len(df_uniprot) > 0:
+            # Only grab sequences where IDs match exactly
+            sequences = df_uniprot[df_uniprot["uniprot_id"] == sequence][
+                "sequence"
+            ].values
+
+            if len(sequences) == 0:
+                logger.warning(
+                    f"REGEX No amino acid sequences found for UniProt Acc {sequence} from the UniProt server."
+                )
+                fetch_aa_failed = True
+            else:
+                if len(sequences) > 1:
+                    logger.warning(
+                        f"REGEX More than one amino acid sequence found for UniProt Acc {sequence}. Using best match to find regex motifs."
+                    )
+                sequence = sequences[0]
+
+    df_regex_matches = pd.DataFrame()
+    if not fetch_aa_failed:
+        df_regex_matches = regex_match(sequence)
+
+    if len(df_regex_matches) == 0:
+        logger.warning(
+            "REGEX No regex matches found for input sequence or UniProt Acc."
+        )
+
+    df_regex_matches = format_regex_results(df_regex_matches, expand=expand)
+
+    return save_results(ortho_df, df_regex_matches, json=json, out=out)
+
+
+def elm_batch(
+    sequences,
+    sensitivity="very-sensitive",
+    threads=1,
+    diamond_binary=None,
+    expand=False,
+    verbose=True,
+    json=False,
+    out=None,
+):
+    """
+    Locally predicts Eukaryotic Linear Motifs for many amino acid sequences (e.g. a whole proteome) using
+    data from the ELM database (http://elm.eu.org/).
+    All sequences are aligned against the ELM instances in a single DIAMOND run and
+    the regex motif search is distributed over 'threads' processes.
+
+    Args:
+    - sequences        List of amino acid sequences or path to FASTA file containing amino acid sequences.
+                       Query IDs are the sequence IDs in the FASTA file (first word of the header)
+                       or 'Seq0', 'Seq1', ... if a list of sequences is provided.
+    - sensitivity      Sensitivity of DIAMOND alignment.
+                       One of the following: fast, mid-sensitive, sensitive, more-sensitive, very-sensitive, or ultra-sensitive.
+                       Default: "very-sensitive"
+    - threads          Number of threads used in DIAMOND alignment and number of processes used for the regex motif search. Default: 1.
+    - diamond_binary   Path to DIAMOND binary. Default: None -> Uses DIAMOND binary installed with gget.
+    - expand           Expand the information returned in the regex data frames to include the protein names, organisms
+                       and references that the motif was orignally validated on. Default: False.
+    - verbose          True/False whether to print progress information. Default: True.
+    - json             If True, returns results in json format instead of data frame. Default: False.
+    - out              Path to folder to save results in. Results of all queries are saved in the same
+                       files as for gget.elm with an additional 'query_id' column. Default: Standard out, temporary files are deleted.
+
+    Returns a dictionary mapping each query ID to a tuple of two data frames (or JSON formatted dictionaries if json=True):
+    The first contains information on motifs experimentally validated in orthologous proteins and
+    the second contains motifs found directly based on regex matches in the query sequence.
+
+    ELM data can be downloaded & distributed for non-commercial use according to the ELM Software License Agreement (http://elm.eu.org/media/Elm_academic_license.pdf).
+    """
+    check_elm_files(verbose=verbose)
+
+    # Read query sequences
+    if isinstance(sequences, str):
+        records = [
+            (title.split()[0], seq.upper()) for title, seq in iter_fasta(sequences)
+        ]
+    else:
+        records = [(f"Seq{idx}", seq.upper()) for idx, seq in enumerate(sequences)]
+
+    if len(records) == 0:
+        raise ValueError("No sequences provided.")
+
+    query_ids = [query_id for query_id, _ in records]
+    if len(set(query_ids)) != len(query_ids):
+        raise ValueError(
+            "Sequence IDs in the FASTA file are not unique. Please provide a unique ID (first word of the header) for each sequence."
+        )
+
+    # Check validity of amino acid seqs
+    amino_acids = set("ARNDCQEGHILKMFPSTWYVBZXBJZ")
+    n_invalid = sum(not set(seq) <= amino_acids for _, seq in records)
+    if n_invalid > 0:
+        logger.warning(
+            f"{n_invalid} input amino acid sequence(s) contain invalid characters."
+        )
+
+    # Align all sequences in a single DIAMOND run
+    if verbose:
+        logger.info(
+            f"ORTHO Performing pairwise sequence alignment against ELM database using DIAMOND for {len(records)} sequence(s)..."
+        )
+    query_fasta = os.path.abspath(f"tmp_{str(uuid.uuid4())}.fa")
+    try:
+        write_fasta(query_fasta, records)
+        df_diamond = diamond(
+            query=query_fasta,
+            reference=ELM_INSTANCES_FASTA,
+            # Database created by 'gget setup elm' (recreated in place if it is missing or outdated)
+            diamond_db=ELM_INSTANCES_DMND,
+            sensitivity=sensitivity,
+            threads=threads,
+            verbose=verbose,
+            diamond_binary=diamond_binary,
+        )
+    finally:
+        remove_temp_files([query_fasta])
+
+    ortho_df = get_ortholog_instances(df_diamond).rename(
+        columns={"query_accession": "query_id"}
+    )
+    ortho_df = format_ortho_results(ortho_df, id_cols=["query_id"])
+
+    if verbose:
+        logger.info(
+            f"ORTHO DIAMOND found orthologous proteins in the ELM database for {df_diamond['query_accession'].nunique()}/{len(records)} sequence(s)."
+        )
+
+    # Find regex motif matches of all sequences
+    if verbose:
+        logger.info(f"REGEX Finding regex motif matches...")
+    df_regex_matches = annotate_regex_matches(scan_sequences(records, threads=threads))
+    df_regex_matches = format_regex_results(
+        df_regex_matches, expand=expand, id_cols=["query_id"]
+    )
+
+    if verbose:
+        logger.info(
+            f"REGEX Found regex motif matches for {df_regex_matches['query_id'].nunique()}/{len(records)} sequence(s)."
+        )
+
+    # Save results of all queries
+    if out:
+        save_results(ortho_df, df_regex_matches, json=json, out=out)
+
+    # Split results by query
+    ortho_groups = ortho_df.groupby("query_id", sort=False).indices
+    regex_groups = df_regex_matches.groupby("query_id", sort=False).indices
+    no_rows = np.zeros(0, dtype=np.intp)
+
+    results = {}
+    for query_id in query_ids:
+        query_ortho_df = (
+            ortho_df.take(ortho_groups.get(query_id, no_rows))
+            .drop(columns="query_id")
+            .reset_index(drop=True)
+        )
+        query_regex_df = (
+            df_regex_matches.take(regex_groups.get(query_id, no_rows))
+            .drop(columns="query_id")
+            .reset_index(drop=True)
+        )
+
+        if json:
+            results[query_id] = (
+                json_package.loads(query_ortho_df.to_json(orient="records")),
+                json_package.loads(query_regex_df.to_json(orient="records")),
+            )
+        else:
+            results[query_id] = (query_ortho_df, query_regex_df)
+
+    return results
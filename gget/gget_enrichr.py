@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 import json as json_package
 import numpy as np
@@ -17,7 +16,7 @@ from .constants import (
 from .compile import PACKAGE_PATH
 from .gget_info import info
 
-from .utils import set_up_logger
+from .utils import set_up_logger, get_session
 logger = set_up_logger()
 
 def ensembl_to_gene_names(ensembl_ids):
@@ -228,7 +227,7 @@ def enrichr(
         "description": (None, "gget client gene list"),
     }
 
-    r1 = requests.post(POST_ENRICHR_URL, files=args_dict)
+    r1 = get_session().post(POST_ENRICHR_URL, files=args_dict)
 
     if not r1.ok:
         raise RuntimeError(
@@ -272,7 +271,7 @@ def enrichr(
             "background": (None, background_final),
         }
 
-        request_background_id = requests.post(
+        request_background_id = get_session().post(
             POST_BACKGROUND_ID_ENRICHR_URL, files=args_dict_background
         )
 
@@ -291,10 +290,10 @@ def enrichr(
     # Submit query to Enrich using gene list and background genes list
     if not background_final:
         query_string = f"?userListId={userListId}&backgroundType={database}"
-        r2 = requests.get(GET_ENRICHR_URL + query_string)
+        r2 = get_session().get(GET_ENRICHR_URL + query_string)
     else:
         query_string = f"?userListId={userListId}&backgroundid={background_list_id}&backgroundType={database}"
-        r2 = requests.post(GET_BACKGROUND_ENRICHR_URL + query_string)
+        r2 = get_session().post(GET_BACKGROUND_ENRICHR_URL + query_string)
 
     if not r2.ok:
         if background_final:
@@ -1,15 +1,128 @@
 import numpy as np
 import pandas as pd
 import json as json_package
-import requests
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 
 # Custom functions
-from .utils import rest_query, get_uniprot_info, wrap_cols_func, get_pdb_ids, set_up_logger
+from .utils import (
+    rest_query,
+    rest_query_batch,
+    get_uniprot_info,
+    wrap_cols_func,
+    get_pdb_ids,
+    get_session,
+    set_up_logger,
+    ServiceLimiter,
+)
 logger = set_up_logger()
 
 # Constants
-from .constants import ENSEMBL_REST_API, UNIPROT_REST_API, NCBI_URL
+from .constants import (
+    ENSEMBL_REST_API,
+    ENSEMBL_REST_MAX_POST_IDS,
+    UNIPROT_REST_API,
+    NCBI_URL,
+    NCBI_LIMITS,
+    UNIPROT_LIMITS,
+    PDBE_LIMITS,
+)
+
+# Limit the number of concurrent requests and the request rate per server
+# (shared by all gget info calls in this process, e.g. concurrent gget.aio.info calls)
+service_limiters = {
+    "uniprot": ServiceLimiter(*UNIPROT_LIMITS),
+    "ncbi": ServiceLimiter(*NCBI_LIMITS),
+    "pdb": ServiceLimiter(*PDBE_LIMITS),
+}
+
+
+def lookup_ensembl_id(server, ensembl_ID, expand=True):
+    """
+    Look up a single ID using the Ensembl REST API GET lookup/id endpoint.
+
+    Args:
+    - server        Link to Ensembl REST API server.
+    - ensembl_ID    Ensembl, WormBase or FlyBase ID (str).
+    - expand        True/False whether to first try to include transcripts, exons and translations
+                    (expand does not work for exons and translation IDs, which are then looked up without it).
+
+    Returns the lookup result (dictionary) or None if the ID was not found.
+    """
+    if expand:
+        try:
+            return rest_query(
+                server, "lookup/id/" + ensembl_ID + "?expand=1", "application/json"
+            )
+        except RuntimeError:
+            pass
+
+    try:
+        return rest_query(server, "lookup/id/" + ensembl_ID + "?", "application/json")
+    except RuntimeError:
+        return None
+
+
+def get_ncbi_info(ens_id):
+    """
+    Web scrape the NCBI gene website for the NCBI gene ID, description and synonyms linked to an Ensembl ID.
+
+    Args:
+    - ens_id    Ensembl, WormBase or FlyBase ID (str).
+
+    Returns NCBI gene ID, NCBI description and list of NCBI synonyms (None if not available).
+    Raises RuntimeError if the NCBI server returned an error message.
+    """
+    url = NCBI_URL + f"/gene/?term={ens_id}"
+
+    html = get_session().get(url)
+    # Raise error if status code not "OK" Response
+    if html.status_code != 200:
+        logger.error(
+            f"NCBI server request for {ens_id} returned error status code:\n{html.status_code}.\nPlease double-check arguments or try again later."
+        )
+
+    ## Web scrape NCBI website for gene ID, synonyms and description
+    soup = BeautifulSoup(html.text, "html.parser")
+
+    # Check for error message in NCBI return
+    if (
+        soup.find("li", class_="error icon") is not None
+        and "An error has occured" in soup.find("li", class_="error icon").text.strip()
+    ):
+        raise RuntimeError(soup.find("li", class_="error icon").text.strip())
+
+    # Check if NCBI gene ID is available
+    try:
+        ncbi_gene_id = soup.find("input", {"id": "gene-id-value"}).get("value")
+    except AttributeError:
+        ncbi_gene_id = np.nan
+
+    # Check if NCBI description is available
+    try:
+        ncbi_description = (
+            soup.find("div", class_="section", id="summaryDiv")
+            .find("dt", string="Summary")
+            .find_next_sibling("dd")
+            .text
+        )
+    except AttributeError:
+        ncbi_description = np.nan
+
+    # Check if NCBI synonyms are available
+    try:
+        ncbi_synonyms = (
+            soup.find("div", class_="section", id="summaryDiv")
+            .find("dt", string="Also known as")
+            .find_next_sibling("dd")
+            .text
+        )
+        # Split NCBI synonyms
+        ncbi_synonyms = ncbi_synonyms.split("; ")
+    except AttributeError:
+        ncbi_synonyms = None
+
+    return ncbi_gene_id, ncbi_description, ncbi_synonyms
 
 
 ## gget info
@@ -24,6 +137,7 @@ def info(
     save=False,
     expand=False,
     ensembl_only=False,
+    max_workers=5,
 ):
     """
     Fetch gene and transcript metadata using Ensembl IDs.
@@ -38,6 +152,7 @@ def info(
     - json          If True, returns results in json/dictionary format instead of data frame. Default: False.
     - verbose       True/False whether to print progress information. Default True.
     - save          True/False wether to save csv with query results in current working directory. Default: False.
+    - max_workers   Maximum number of concurrent requests to UniProt, NCBI and PDB. Default: 5.
 
     Returns a data frame containing the requested information.
 
@@ -57,11 +172,10 @@ def info(
                 "'ensembl_only' argument deprecated! Please use arguments 'ncbi=False' and 'uniprot=False'."
             )
 
-    # Set synonyms found by each database initially to none
-    ncbi_synonyms = None
-    df_uniprot = None
-    df_pdb = pd.DataFrame()
-    df_ncbi = pd.DataFrame()
+    if max_workers < 1:
+        raise ValueError(
+            f"'max_workers' argument specified as {max_workers}. Expected an integer >= 1."
+        )
 
     # Rename pdb, uniprot, ncbi arguments
     fetch_ncbi = ncbi
@@ -70,8 +184,6 @@ def info(
 
     # Define Ensembl REST API server
     server = ENSEMBL_REST_API
-    # Define type of returned content from REST
-    content_type = "application/json"
 
     ## Clean up Ensembl IDs
     # If single Ensembl ID passed as string, convert to list
@@ -105,52 +217,65 @@ def info(
     master_dict = {}
 
     # Query REST APIs from https://rest.ensembl.org/
-    for ensembl_ID in ens_ids_clean:
-        # Create dict to save query results
-        results_dict = {ensembl_ID: {}}
-
-        # Define the REST query
-        query = "lookup/id/" + ensembl_ID + "?" + "expand=1"
+    # IDs are submitted in batches using the POST lookup/id endpoint
+    lookup_results = {}
+    for i in range(0, len(ens_ids_clean), ENSEMBL_REST_MAX_POST_IDS):
+        chunk = ens_ids_clean[i : i + ENSEMBL_REST_MAX_POST_IDS]
 
         # Submit query
         try:
-            df_temp = rest_query(server, query, content_type)
+            lookup_results.update(
+                rest_query_batch(server, "lookup/id", chunk, data={"expand": 1})
+            )
 
-            try:
-                # Add Ensembl ID with latest version number to df_temp
-                ensembl_id_dict = {
-                    "ensembl_id": str(df_temp["id"]) + "." + str(df_temp["version"])
-                }
-                df_temp.update(ensembl_id_dict)
-
-            except KeyError:
-                # Just add Ensembl ID if no version found
-                ensembl_id_dict = {"ensembl_id": str(df_temp["id"])}
-                df_temp.update(ensembl_id_dict)
-
-        # If query returns in an error:
+        # If the server rejects the whole batch, the IDs in this batch are looked up one by one
         except RuntimeError:
-            # Try submitting query without expand (expand does not work for exons and translation IDs)
+            for ensembl_ID in chunk:
+                lookup_results[ensembl_ID] = lookup_ensembl_id(server, ensembl_ID)
+            continue
+
+        # Try submitting IDs that were not found without expand (expand does not work for exons and translation IDs)
+        missing_ids = [
+            ensembl_ID for ensembl_ID in chunk if not lookup_results.get(ensembl_ID)
+        ]
+        if len(missing_ids) > 0:
             try:
-                query = "lookup/id/" + ensembl_ID + "?"
-                df_temp = rest_query(server, query, content_type)
-                # Add Ensembl ID with latest version number to df_temp
-                ensembl_id_dict = {
-                    "ensembl_id": str(df_temp["id"]) + "." + str(df_temp["version"])
-                }
-                df_temp.update(ensembl_id_dict)
-
-            # Log error if this also did not work
+                lookup_results.update(rest_query_batch(server, "lookup/id", missing_ids))
             except RuntimeError:
-                if verbose:
-                    logger.warning(
-                        f"ID '{ensembl_ID}' not found. Please double-check spelling/arguments and try again."
+                for ensembl_ID in missing_ids:
+                    lookup_results[ensembl_ID] = lookup_ensembl_id(
+                        server, ensembl_ID, expand=False
                     )
 
-                # Remove IDs that were not found from ID list
-                ens_ids_clean_2.remove(ensembl_ID)
+    for ensembl_ID in ens_ids_clean:
+        # Create dict to save query results
+        results_dict = {ensembl_ID: {}}
+
+        df_temp = lookup_results.get(ensembl_ID)
+
+        # Log error if ID was not found
+        if not df_temp:
+            if verbose:
+                logger.warning(
+                    f"ID '{ensembl_ID}' not found. Please double-check spelling/arguments and try again."
+                )
+
+            # Remove IDs that were not found from ID list
+            ens_ids_clean_2.remove(ensembl_ID)
 
-                continue
+            continue
+
+        try:
+            # Add Ensembl ID with latest version number to df_temp
+            ensembl_id_dict = {
+                "ensembl_id": str(df_temp["id"]) + "." + str(df_temp["version"])
+            }
+            df_temp.update(ensembl_id_dict)
+
+        except KeyError:
+            # Just add Ensembl ID if no version found
+            ensembl_id_dict = {"ensembl_id": str(df_temp["id"])}
+            df_temp.update(ensembl_id_dict)
 
         # Add results to master dict
         results_dict[ensembl_ID].update(df_temp)
@@ -173,21 +298,60 @@ def info(
     )
 
     if ensembl_only is False:
+        ## Fetch information from UniProt, NCBI and PDB for all Ensembl IDs concurrently
+        services = []
+        if fetch_uniprot is True:
+            services.append("uniprot")
+        if fetch_ncbi is True:
+            services.append("ncbi")
+        if fetch_pdb:
+            services.append("pdb")
+
+        def fetch(service, ens_id):
+            """
+            Returns (True, result) or (False, error) for a request to the specified service.
+            """
+            with service_limiters[service]:
+                try:
+                    if service == "uniprot":
+                        # Get gene names and descriptions from UniProt
+                        return True, get_uniprot_info(
+                            UNIPROT_REST_API, ens_id, verbose=verbose
+                        )
+                    if service == "ncbi":
+                        # Get NCBI gene ID and description (for genes only)
+                        return True, get_ncbi_info(ens_id)
+                    if service == "pdb":
+                        # Get PDB IDs from Ensembl ID
+                        return True, get_pdb_ids(ens_id)
+                except Exception as e:
+                    return False, e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                (ens_id, service): executor.submit(fetch, service, ens_id)
+                for ens_id in ens_ids_clean_2
+                for service in services
+            }
+        results = {key: future.result() for key, future in futures.items()}
+
         # df_temp will hold information from NCBI, UniProt and PDB for each of the Ensembl IDs
         df_temp = pd.DataFrame()
 
+        # Assemble the results in the order of the Ensembl IDs
         for ens_id in ens_ids_clean_2:
+            ncbi_synonyms = None
+            df_uniprot = None
+            df_pdb = pd.DataFrame()
+            df_ncbi = pd.DataFrame()
+
             if fetch_uniprot is True:
-                try:
-                    # Get gene names and descriptions from UniProt
-                    df_uniprot = get_uniprot_info(
-                        UNIPROT_REST_API, ens_id, verbose=verbose
-                    )
+                success, df_uniprot = results[(ens_id, "uniprot")]
 
-                except Exception as e:
+                if not success:
                     if verbose:
                         logger.warning(
-                            f"UniProt server request for ID '{ens_id}' return following error:\n{e}"
+                            f"UniProt server request for ID '{ens_id}' return following error:\n{df_uniprot}"
                         )
                     continue
 
@@ -218,81 +382,16 @@ def info(
                         logger.warning(f"No UniProt entry was found for ID {ens_id}.")
 
             if fetch_ncbi is True:
-                ## Get NCBI gene ID and description (for genes only)
-                url = NCBI_URL + f"/gene/?term={ens_id}"
-
-                try:
-                    html = requests.get(url)
-                    # Raise error if status code not "OK" Response
-                    if html.status_code != 200:
-                        logger.error(
-                            f"NCBI server request for {ens_id} returned error status code:\n{html.status_code}.\nPlease double-check arguments or try again later."
-                        )
-
-                    ## Web scrape NCBI website for gene ID, synonyms and description
-                    soup = BeautifulSoup(html.text, "html.parser")
-
-                    # Check for error message in NCBI return
-                    if (
-                        soup.find("li", class_="error icon") is not None
-                        and "An error has occured"
-                        in soup.find("li", class_="error icon").text.strip()
-                    ):
-                        error_message = soup.find(
-                            "li", class_="error icon"
-                        ).text.strip()
-
-                        logger.error(
-                            f"The NCBI server request for Ensembl ID '{ens_id}' returned the following error:\n{error_message}"
-                        )
-
-                        ncbi_gene_id = np.nan
-                        ncbi_description = np.nan
-                        ncbi_synonyms = None
-                        continue
-
-                    # Check if NCBI gene ID is available
-                    try:
-                        ncbi_gene_id = soup.find("input", {"id": "gene-id-value"}).get(
-                            "value"
-                        )
-                    except AttributeError:
-                        ncbi_gene_id = np.nan
-
-                    # Check if NCBI description is available
-                    try:
-                        ncbi_description = (
-                            soup.find("div", class_="section", id="summaryDiv")
-                            .find("dt", string="Summary")
-                            .find_next_sibling("dd")
-                            .text
-                        )
-                    except AttributeError:
-                        ncbi_description = np.nan
+                success, ncbi_results = results[(ens_id, "ncbi")]
 
-                    # Check if NCBI synonyms are available
-                    try:
-                        ncbi_synonyms = (
-                            soup.find("div", class_="section", id="summaryDiv")
-                            .find("dt", string="Also known as")
-                            .find_next_sibling("dd")
-                            .text
-                        )
-                        # Split NCBI synonyms
-                        ncbi_synonyms = ncbi_synonyms.split("; ")
-                    except AttributeError:
-                        ncbi_synonyms = None
-
-                except Exception as e:
+                if not success:
                     logger.error(
-                        f"The NCBI server request for Ensembl ID '{ens_id}' returned the following error:\n{e}"
+                        f"The NCBI server request for Ensembl ID '{ens_id}' returned the following error:\n{ncbi_results}"
                     )
-
-                    ncbi_gene_id = np.nan
-                    ncbi_description = np.nan
-                    ncbi_synonyms = None
                     continue
 
+                ncbi_gene_id, ncbi_description, ncbi_synonyms = ncbi_results
+
                 # Save NCBI info to data frame
                 df_ncbi = pd.DataFrame(
                     {
@@ -306,14 +405,12 @@ def info(
                 df_ncbi.columns = [ens_id]
 
             if fetch_pdb:
-                ## Get PDB IDs from Ensembl ID
-                try:
-                    pdb_ids = get_pdb_ids(ens_id)
+                success, pdb_ids = results[(ens_id, "pdb")]
 
-                except Exception as e:
+                if not success:
                     if verbose:
                         logger.warning(
-                            f"The PDBe server request for Ensembl ID '{ens_id}' returned the following error:\n{e}"
+                            f"The PDBe server request for Ensembl ID '{ens_id}' returned the following error:\n{pdb_ids}"
                         )
                     continue
 
@@ -1,14 +1,14 @@
 import os
 import platform
 import subprocess
-import itertools
+import shutil
 import sys
 import time
 import uuid
 
 # Custom functions
 from .compile import compile_muscle, MUSCLE_PATH, PACKAGE_PATH
-from .utils import aa_colors, n_colors, create_tmp_fasta, set_up_logger
+from .utils import aa_colors, n_colors, create_tmp_fasta, iter_fasta, set_up_logger
 logger = set_up_logger()
 
 # Path to precompiled muscle binary
@@ -130,32 +130,24 @@ def muscle(fasta, super5=False, out=None, verbose=True):
         ## Print cleaned up muscle output
         # Get the titles and sequences from the generated .afa file
         titles = []
-        seqs_master = []
-        with open(abs_out_path) as aln_file:
-            for i, line in enumerate(aln_file):
-                # Recognize title lines by the '>' character
-                if line[0] == ">":
-                    # Record first listed identifier as title and remove the '>'
-                    titles.append(line.split(" ")[0].split(">")[1])
-
-                    # Append list containing seqs for the previous title to master list
-                    if i != 0:
-                        seqs_master.append(seqs)
-                    # Empty the seqs list to append the sequences for this new title
-                    seqs = []
-                else:
-                    seqs.append(line.strip())
-        # Append seqs of last title to master seq list
-        seqs_master.append(seqs)
+        seqs = []
+        for title, seq in iter_fasta(abs_out_path):
+            # Record first listed identifier as title
+            titles.append(title.split(" ")[0])
+            seqs.append(seq)
 
         # Set of all possible nucleotides
         nucleotides = set("ATGCN-")
 
-        # zip_longest pads to the longest length
-        for seq_pair in list(itertools.zip_longest(*seqs_master)):
-            # Add some space between lines
+        # Print the alignment in blocks that fit the width of the terminal
+        block_width = max(
+            shutil.get_terminal_size().columns - max(map(len, titles)) - 10, 10
+        )
+        for start in range(0, max(map(len, seqs)), block_width):
+            # Add some space between blocks
             print("\n")
-            for idx, seq in enumerate(seq_pair):
+            for title, seq in zip(titles, seqs):
+                seq = seq[start : start + block_width]
                 final_seq = []
                 # If sequence is a nucleotide sequence,
                 # assign nulceotide colors using the custom function n_colors
@@ -169,7 +161,7 @@ def muscle(fasta, super5=False, out=None, verbose=True):
                     for letter in seq:
                         final_seq.append(aa_colors(letter))
 
-                print(titles[idx], "\t", "".join(final_seq))
+                print(title, "\t", "".join(final_seq))
 
         # Remove temporary .afa file (and temp .fa file if not provided by user)
         os.remove(abs_out_path)
@@ -1,24 +1,115 @@
 import pandas as pd
+import numpy as np
 import re
+import os
+import shutil
+import tempfile
+import heapq
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tqdm import tqdm
 
 tqdm.pandas()
 
-from .utils import read_fasta, set_up_logger
+from .utils import read_fasta, set_up_logger, FastaIndex, FastaWriter
 
 logger = set_up_logger()
 
-# Define global variables to count occurences of weird mutations
-intronic_mutations = 0
-posttranslational_region_mutations = 0
-unknown_mutations = 0
-uncertain_mutations = 0
-ambiguous_position_mutations = 0
-cosmic_incorrect_wt_base = 0
-mut_idx_outside_seq = 0
+class MutationStats:
+    """
+    Counts of mutations that were ignored or could not be applied correctly during one gget mutate call.
+    Each call uses its own MutationStats object, so concurrent calls do not share counts.
+    """
+
+    counter_names = [
+        "intronic_mutations",
+        "posttranslational_region_mutations",
+        "unknown_mutations",
+        "uncertain_mutations",
+        "ambiguous_position_mutations",
+        "cosmic_incorrect_wt_base",
+        "mut_idx_outside_seq",
+    ]
+
+    def __init__(self):
+        self.total_mutations = 0
+        for name in self.counter_names:
+            setattr(self, name, 0)
+
+    @property
+    def good_mutations(self):
+        return self.total_mutations - sum(
+            getattr(self, name) for name in self.counter_names
+        )
+
+    def merge(self, other):
+        """
+        Add the counts of another MutationStats object (e.g. from a worker process).
+        """
+        self.total_mutations += other.total_mutations
+        for name in self.counter_names:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def to_dict(self):
+        stats = {"total_mutations": self.total_mutations}
+        stats["good_mutations"] = self.good_mutations
+        for name in self.counter_names:
+            stats[name] = getattr(self, name)
+        return stats
+
 
 mutation_pattern = r"c\.([0-9_\-\+\*]+)([a-zA-Z>]+)"  # more complex: r'c\.([0-9_\-\+\*\(\)\?]+)([a-zA-Z>\(\)0-9]+)'
 
+# Order in which mutation types are processed and returned
+mutation_types = [
+    "substitution",
+    "deletion",
+    "delins",
+    "insertion",
+    "duplication",
+    "inversion",
+    "unknown",
+]
+
+# Mutation type by the first lower case letter sequence following the nucleotide position
+mutation_type_letters = {
+    ">": "substitution",  # eg c.1252C>T
+    "del": "deletion",  # eg c.2126_2128del OR c.1627del
+    "delins": "delins",  # eg c.2239_2253delinsAAT OR c.646delins
+    "ins": "insertion",  # eg c.2239_2240insAAT
+    "dup": "duplication",  # eg c.2239_2253dup OR c.646dup
+    "inv": "inversion",  # eg c.2239_2253inv
+}
+
+# Nucleotide complements used for inversions
+complement = {
+    "A": "T",
+    "T": "A",
+    "U": "A",
+    "C": "G",
+    "G": "C",
+    "N": "N",
+    "a": "t",
+    "t": "a",
+    "u": "a",
+    "c": "g",
+    "g": "c",
+    "n": "n",
+    ".": ".",  # annotation for gaps
+    "-": "-",  # annotation for gaps
+}
+
+
+class ComplementTable(dict):
+    """
+    Translation table for str.translate that maps unknown characters to 'N'.
+    """
+
+    def __missing__(self, key):
+        return "N"
+
+
+complement_table = ComplementTable(str.maketrans(complement))
+
 
 def extract_mutation_type(mutation):
     match = re.match(mutation_pattern, mutation)
@@ -68,21 +159,23 @@ def create_mutant_sequence(
     kmer_flanking_length=30,
     mut_column="mutation",
     seq_id_column="seq_ID",
+    stats=None,
 ):
-    global intronic_mutations, posttranslational_region_mutations, unknown_mutations, uncertain_mutations, ambiguous_position_mutations
+    if stats is None:
+        stats = MutationStats()
 
     if "?" in row[mut_column]:
         logger.debug(
             f"Uncertain mutation found in mutation {row[mut_column]} - mutation is ignored"
         )
-        uncertain_mutations += 1
+        stats.uncertain_mutations += 1
         return ""
 
     if "(" in row[mut_column]:
         logger.debug(
             f"Ambiguous mutational position found in mutation {row[mut_column]} - mutation is ignored"
         )
-        ambiguous_position_mutations += 1
+        stats.ambiguous_position_mutations += 1
         return ""
 
     match = re.match(mutation_pattern, row[mut_column])
@@ -95,14 +188,14 @@ def create_mutant_sequence(
                 logger.debug(
                     f"Intronic nucleotide position found in mutation {row[mut_column]} - {nucleotide_position}{letters} - mutation is ignored"
                 )
-                intronic_mutations += 1
+                stats.intronic_mutations += 1
                 return ""
 
             elif "*" in nucleotide_position:
                 logger.debug(
                     f"Posttranslational region nucleotide position found in mutation {row[mut_column]} - {nucleotide_position}{letters} - mutation is ignored"
                 )
-                posttranslational_region_mutations += 1
+                stats.posttranslational_region_mutations += 1
                 return ""
 
             else:
@@ -120,7 +213,7 @@ def create_mutant_sequence(
                     )
         except:
             logger.debug(f"Error with mutation {row[mut_column]}]")
-            unknown_mutations += 1
+            stats.unknown_mutations += 1
             # raise_pytest_error()
             return ""
 
@@ -131,6 +224,7 @@ def create_mutant_sequence(
             ending_nucleotide_position_index_0,
             mut_column,
             seq_id_column,
+            stats=stats,
         )
 
         if not mutant_sequence:
@@ -143,7 +237,7 @@ def create_mutant_sequence(
         return str(mutant_sequence[kmer_start:kmer_end])
     else:
         logger.debug(f"Error with mutation {row[mut_column]}")
-        unknown_mutations += 1
+        stats.unknown_mutations += 1
         # raise_pytest_error()
         return ""
 
@@ -155,16 +249,17 @@ def substitution_mutation(
     ending_nucleotide_position_index_0,
     mut_column,
     seq_id_column,
+    stats=None,
 ):
     # assert letters[0] == row['full_sequence'][starting_nucleotide_position_index_0], f"Transcript has {row['full_sequence'][starting_nucleotide_position_index_0]} at position {starting_nucleotide_position_index_0} but mutation is {letters[-1]} at position {starting_nucleotide_position_index_0} in {row[mut_column]}"
-    global cosmic_incorrect_wt_base
-    global mut_idx_outside_seq
+    if stats is None:
+        stats = MutationStats()
     try:
         if letters[0] != row["full_sequence"][starting_nucleotide_position_index_0]:
             logger.debug(
                 f"Sequence {row[seq_id_column]} has nucleotide '{row['full_sequence'][starting_nucleotide_position_index_0]}' at position {starting_nucleotide_position_index_0}, but mutation {row[mut_column]} expected '{letters[0]}'."
             )
-            cosmic_incorrect_wt_base += 1
+            stats.cosmic_incorrect_wt_base += 1
         mutant_sequence = (
             row["full_sequence"][:starting_nucleotide_position_index_0]
             + letters[-1]
@@ -176,7 +271,7 @@ def substitution_mutation(
 
     # Mutation index is outside sequence length
     except IndexError:
-        mut_idx_outside_seq += 1
+        stats.mut_idx_outside_seq += 1
         return "", ""
 
 
@@ -187,8 +282,10 @@ def deletion_mutation(
     ending_nucleotide_position_index_0,
     mut_column,
     seq_id_column,
+    stats=None,
 ):
-    global mut_idx_outside_seq
+    if stats is None:
+        stats = MutationStats()
     try:
         # Accessing the sequence to trigger IndexError if out of bounds
         _ = row["full_sequence"][starting_nucleotide_position_index_0]
@@ -202,7 +299,7 @@ def deletion_mutation(
 
     # Mutation index is outside sequence length
     except IndexError:
-        mut_idx_outside_seq += 1
+        stats.mut_idx_outside_seq += 1
         return "", ""
 
 
@@ -213,8 +310,10 @@ def delins_mutation(
     ending_nucleotide_position_index_0,
     mut_column,
     seq_id_column,
+    stats=None,
 ):
-    global mut_idx_outside_seq
+    if stats is None:
+        stats = MutationStats()
     try:
         # Accessing the sequence to trigger IndexError if out of bounds
         _ = row["full_sequence"][starting_nucleotide_position_index_0]
@@ -233,7 +332,7 @@ def delins_mutation(
 
     # Mutation index is outside sequence length
     except IndexError:
-        mut_idx_outside_seq += 1
+        stats.mut_idx_outside_seq += 1
         return "", ""
 
 
@@ -244,8 +343,10 @@ def insertion_mutation(
     ending_nucleotide_position_index_0,
     mut_column,
     seq_id_column,
+    stats=None,
 ):
-    global mut_idx_outside_seq
+    if stats is None:
+        stats = MutationStats()
     try:
         # Accessing the sequence to trigger IndexError if out of bounds
         _ = row["full_sequence"][starting_nucleotide_position_index_0]
@@ -264,7 +365,7 @@ def insertion_mutation(
 
     # Mutation index is outside sequence length
     except IndexError:
-        mut_idx_outside_seq += 1
+        stats.mut_idx_outside_seq += 1
         return "", ""
 
 
@@ -275,8 +376,10 @@ def duplication_mutation(
     ending_nucleotide_position_index_0,
     mut_column,
     seq_id_column,
+    stats=None,
 ):
-    global mut_idx_outside_seq
+    if stats is None:
+        stats = MutationStats()
     try:
         # Accessing the sequence to trigger IndexError if out of bounds
         _ = row["full_sequence"][starting_nucleotide_position_index_0]
@@ -296,7 +399,7 @@ def duplication_mutation(
 
     # Mutation index is outside sequence length
     except IndexError:
-        mut_idx_outside_seq += 1
+        stats.mut_idx_outside_seq += 1
         return "", ""
 
 
@@ -307,8 +410,10 @@ def inversion_mutation(
     ending_nucleotide_position_index_0,
     mut_column,
     seq_id_column,
+    stats=None,
 ):
-    global mut_idx_outside_seq
+    if stats is None:
+        stats = MutationStats()
     try:
         # Accessing the sequence to trigger IndexError if out of bounds
         _ = row["full_sequence"][starting_nucleotide_position_index_0]
@@ -321,22 +426,6 @@ def inversion_mutation(
         reverse_insertion_string = insertion_string[::-1]
 
         # Get complement
-        complement = {
-            "A": "T",
-            "T": "A",
-            "U": "A",
-            "C": "G",
-            "G": "C",
-            "N": "N",
-            "a": "t",
-            "t": "a",
-            "u": "a",
-            "c": "g",
-            "g": "c",
-            "n": "n",
-            ".": ".",  # annotation for gaps
-            "-": "-",  # annotation for gaps
-        }
         mutated_string = "".join(
             complement.get(nucleotide, "N") for nucleotide in reverse_insertion_string
         )
@@ -352,7 +441,7 @@ def inversion_mutation(
 
     # Mutation index is outside sequence length
     except IndexError:
-        mut_idx_outside_seq += 1
+        stats.mut_idx_outside_seq += 1
         return "", ""
 
 
@@ -363,10 +452,532 @@ def unknown_mutation(
     ending_nucleotide_position_index_0,
     mut_column,
     seq_id_column,
+    stats=None,
 ):
     return "", ""
 
 
+# Columns returned by parse_mutations (mutation files can contain them precomputed, see gget cosmic)
+parsed_mutation_columns = [
+    "mutation_type",
+    "mutation_status",
+    "start",
+    "end",
+    "wt_base",
+    "inserted_bases",
+]
+
+
+def parse_mutations(mutations):
+    """
+    Parse mutations in standard mutation annotation (e.g. 'c.2C>T') for all rows at once.
+
+    Args:
+    - mutations     pandas Series containing the mutations.
+
+    Returns data frame (same index as 'mutations') with columns:
+    - mutation_type     'substitution', 'deletion', 'delins', 'insertion', 'duplication', 'inversion' or 'unknown'.
+    - mutation_status   'ok' or the reason why the mutation will be ignored
+                        ('uncertain', 'ambiguous', 'intronic', 'posttranslational' or 'unknown').
+    - start             0-based position of the first mutated nucleotide (-1 if the mutation is ignored).
+    - end               0-based position of the last mutated nucleotide (-1 if the mutation is ignored).
+    - wt_base           Wildtype nucleotide expected by substitutions ('' for all other mutation types).
+    - inserted_bases    Nucleotides introduced by substitutions, delins and insertions ('' for all other mutation types).
+    """
+    index = mutations.index
+
+    # Parse each distinct mutation only once (mutations are often repeated across samples)
+    codes, unique_mutations = pd.factorize(mutations.fillna(""))
+    mutations = pd.Series(unique_mutations, dtype=object)
+
+    # Mutation type is defined by the first lower case letter sequence (or '>') following the position
+    match = mutations.str.extract(
+        r"^c\.([0-9_\-\+\*]+)(?=[a-zA-Z>])([A-Z]*([a-z>]*)[a-zA-Z>]*)"
+    )
+    positions = match[0]
+    letters = match[1]
+    mutation_type = match[2].map(mutation_type_letters).fillna("unknown")
+
+    # Positions can be a single position or an interval (only the first two numbers are used)
+    coordinates = positions.str.extract(r"^(\d+)(?:_(\d+)(?:_.*)?)?$")
+    start = pd.to_numeric(coordinates[0]) - 1
+    end = pd.to_numeric(coordinates[1].fillna(coordinates[0])) - 1
+
+    # Reasons for ignoring a mutation in increasing order of priority
+    mutation_status = pd.Series("ok", index=mutations.index)
+    mutation_status[start.isna()] = "unknown"
+    mutation_status[positions.str.contains("*", regex=False, na=False)] = (
+        "posttranslational"
+    )
+    mutation_status[positions.str.contains(r"[\-\+]", na=False)] = "intronic"
+    mutation_status[positions.isna()] = "unknown"
+    mutation_status[mutations.str.contains("(", regex=False)] = "ambiguous"
+    mutation_status[mutations.str.contains("?", regex=False)] = "uncertain"
+
+    ok = (mutation_status == "ok").values
+    substitution = (mutation_type == "substitution").values
+    insertion = mutation_type.isin(["delins", "insertion"]).values
+
+    wt_base = pd.Series("", index=mutations.index)
+    wt_base[ok & substitution] = letters[ok & substitution].str[0]
+    inserted_bases = pd.Series("", index=mutations.index)
+    inserted_bases[ok & substitution] = letters[ok & substitution].str[-1]
+    inserted_bases[ok & insertion] = (
+        letters[ok & insertion].str.findall(r"[A-Z]+").str.join("")
+    )
+
+    parsed_mutations = pd.DataFrame(
+        {
+            "mutation_type": mutation_type,
+            "mutation_status": mutation_status,
+            "start": start.where(ok, 0).fillna(0).astype(np.int64).where(ok, -1),
+            "end": end.where(ok, 0).fillna(0).astype(np.int64).where(ok, -1),
+            "wt_base": wt_base,
+            "inserted_bases": inserted_bases,
+        }
+    )
+
+    # Expand distinct mutations back to all rows
+    parsed_mutations = parsed_mutations.take(codes)
+    parsed_mutations.index = index
+
+    return parsed_mutations
+
+
+def create_mutant_kmers(
+    parsed_mutations,
+    seq_dict,
+    seq_ids,
+    kmer_flanking_length=30,
+    mutations=None,
+    stats=None,
+    verbose=False,
+):
+    """
+    Create the mutant k-mers (mutation + flanking sequences) of all mutations at once.
+    Sequences are looked up by their ID and only the k-mer windows are sliced out of them
+    (neither the wildtype nor the full-length mutant sequences are copied per mutation).
+    Returns the same k-mers as create_mutant_sequence.
+
+    Args:
+    - parsed_mutations      Data frame returned by parse_mutations.
+    - seq_dict              Dictionary of the sequences to be mutated (sequence ID -> sequence).
+    - seq_ids               List/array of the IDs of the sequences to be mutated (one per mutation).
+    - kmer_flanking_length  Length of the sequences flanking the mutation. Default: 30.
+    - mutations             List/array of the mutations (only used for logging).
+    - stats                 MutationStats object the counts of ignored mutations are added to.
+    - verbose               True/False whether to show a progress bar. Default: False.
+
+    Returns a list of mutant k-mers ('' if the mutation was ignored).
+    """
+    if stats is None:
+        stats = MutationStats()
+
+    n_mutations = len(parsed_mutations)
+    if mutations is None:
+        mutations = [""] * n_mutations
+
+    # Count ignored mutations
+    status_counts = parsed_mutations["mutation_status"].value_counts()
+    stats.uncertain_mutations += int(status_counts.get("uncertain", 0))
+    stats.ambiguous_position_mutations += int(status_counts.get("ambiguous", 0))
+    stats.intronic_mutations += int(status_counts.get("intronic", 0))
+    stats.posttranslational_region_mutations += int(
+        status_counts.get("posttranslational", 0)
+    )
+    stats.unknown_mutations += int(status_counts.get("unknown", 0))
+
+    mutation_type = parsed_mutations["mutation_type"].values
+    start = parsed_mutations["start"].values
+    end = parsed_mutations["end"].values
+    wt_base = parsed_mutations["wt_base"].values
+    inserted_bases = parsed_mutations["inserted_bases"].values
+    # Sequence lengths are looked up once per sequence
+    seq_codes, unique_seq_ids = pd.factorize(np.asarray(seq_ids, dtype=object))
+    seq_lengths = np.array(
+        [len(seq_dict[seq_id]) for seq_id in unique_seq_ids], dtype=np.int64
+    )[seq_codes]
+
+    ok = (parsed_mutations["mutation_status"].values == "ok") & (
+        mutation_type != "unknown"
+    )
+    # Mutation index is outside sequence length
+    outside_seq = ok & (start >= seq_lengths)
+    stats.mut_idx_outside_seq += int(outside_seq.sum())
+    # Negative positions (c.0) rely on negative indexing and are passed to the row-wise functions
+    row_wise = ok & (start < 0)
+    ok = ok & ~outside_seq & ~row_wise
+
+    ## Compute k-mer window coordinates
+    # The mutant sequence is sequence[:prefix_end] + inserted sequence + sequence[suffix_start:]
+    is_insertion = mutation_type == "insertion"
+    is_deletion = mutation_type == "deletion"
+    is_delins = mutation_type == "delins"
+    is_duplication = mutation_type == "duplication"
+    is_inversion = mutation_type == "inversion"
+
+    inserted_lengths = np.fromiter(
+        (len(bases) for bases in inserted_bases), dtype=np.int64, count=n_mutations
+    )
+    # Length of the wildtype sequence affected by duplications/inversions
+    affected_lengths = np.maximum(0, np.minimum(end + 1, seq_lengths) - start)
+    inserted_lengths = np.select(
+        [is_deletion, is_duplication, is_inversion],
+        [0, 2 * affected_lengths, affected_lengths],
+        inserted_lengths,
+    )
+    prefix_end = np.where(is_insertion, start + 1, start)
+    suffix_start = np.where(is_insertion, start + 1, end + 1)
+    adjusted_end = np.select(
+        [is_deletion, is_delins, is_insertion, is_duplication],
+        [
+            start - 1,
+            start + inserted_lengths - 1,
+            end + inserted_lengths - 1,
+            end + affected_lengths,
+        ],
+        end,
+    )
+    mutant_lengths = (
+        prefix_end + inserted_lengths + np.maximum(0, seq_lengths - suffix_start)
+    )
+
+    kmer_start = np.maximum(0, start - kmer_flanking_length)
+    kmer_end = np.minimum(mutant_lengths, adjusted_end + kmer_flanking_length + 1)
+    kmer_lengths = np.maximum(0, kmer_end - kmer_start)
+    # Number of k-mer nucleotides taken from before the mutation, from the inserted sequence and from after the mutation
+    prefix_lengths = np.minimum(kmer_lengths, prefix_end - kmer_start)
+    needed_lengths = np.minimum(kmer_lengths - prefix_lengths, inserted_lengths)
+    suffix_lengths = kmer_lengths - prefix_lengths - needed_lengths
+
+    ## Build the k-mers
+    kmers = [""] * n_mutations
+    for i in tqdm(
+        np.flatnonzero(ok | row_wise),
+        desc="Mutating sequences",
+        disable=not verbose,
+    ):
+        seq = seq_dict[seq_ids[i]]
+
+        if row_wise[i]:
+            kmers[i] = create_mutant_sequence(
+                {
+                    "mutation": mutations[i],
+                    "full_sequence": seq,
+                    "seq_ID": seq_ids[i],
+                },
+                mutation_functions[mutation_type[i]],
+                kmer_flanking_length=kmer_flanking_length,
+                stats=stats,
+            )
+            continue
+
+        # Only build the part of the inserted sequence that falls into the k-mer
+        s = start[i]
+        needed = needed_lengths[i]
+        if is_duplication[i]:
+            inserted = seq[s : s + min(needed, affected_lengths[i])] + seq[
+                s : s + max(0, needed - affected_lengths[i])
+            ]
+        elif is_inversion[i]:
+            inserted = seq[
+                s + affected_lengths[i] - needed : s + affected_lengths[i]
+            ][::-1].translate(complement_table)
+        else:
+            inserted = inserted_bases[i][:needed]
+
+        if mutation_type[i] == "substitution" and wt_base[i] != seq[s]:
+            logger.debug(
+                f"Sequence {seq_ids[i]} has nucleotide '{seq[s]}' at position {s}, but mutation {mutations[i]} expected '{wt_base[i]}'."
+            )
+            stats.cosmic_incorrect_wt_base += 1
+
+        kmers[i] = (
+            seq[kmer_start[i] : kmer_start[i] + prefix_lengths[i]]
+            + inserted
+            + seq[suffix_start[i] : suffix_start[i] + suffix_lengths[i]]
+        )
+
+    return kmers
+
+
+def mutate_shard(
+    parsed_mutations, seq_dict, seq_ids, mutations, kmer_flanking_length=30
+):
+    """
+    Create the mutant k-mers of one shard of mutations (run in a worker process).
+
+    Args:
+    - parsed_mutations      Data frame returned by parse_mutations (rows of this shard only).
+    - seq_dict              Dictionary of the sequences referenced by this shard (sequence ID -> sequence).
+    - seq_ids               Array of the sequence IDs of this shard.
+    - mutations             Array of the mutations of this shard.
+    - kmer_flanking_length  Length of the sequences flanking the mutation. Default: 30.
+
+    Returns a list of mutant k-mers and a MutationStats object with the counts of this shard.
+    """
+    stats = MutationStats()
+    kmers = create_mutant_kmers(
+        parsed_mutations,
+        seq_dict,
+        seq_ids,
+        kmer_flanking_length=kmer_flanking_length,
+        mutations=mutations,
+        stats=stats,
+    )
+
+    return kmers, stats
+
+
+def create_mutant_kmers_parallel(
+    parsed_mutations,
+    seq_dict,
+    seq_ids,
+    mutations,
+    kmer_flanking_length=30,
+    threads=2,
+    stats=None,
+    verbose=False,
+):
+    """
+    Create the mutant k-mers of all mutations using a pool of worker processes.
+    Mutations are sharded by sequence ID (all mutations of a sequence are processed by the same worker)
+    and each worker only receives the sequences of its shard.
+
+    Args:
+    - parsed_mutations      Data frame returned by parse_mutations.
+    - seq_dict              Dictionary of the sequences to be mutated (sequence ID -> sequence).
+    - seq_ids               Array of the sequence IDs (one per mutation).
+    - mutations             Array of the mutations.
+    - kmer_flanking_length  Length of the sequences flanking the mutation. Default: 30.
+    - threads               Number of worker processes. Default: 2.
+    - stats                 MutationStats object the counts of all workers are added to.
+    - verbose               True/False whether to show a progress bar. Default: False.
+
+    Returns a list of mutant k-mers ('' if the mutation was ignored) in the order of the input mutations.
+    """
+    if stats is None:
+        stats = MutationStats()
+
+    # Several shards per worker to balance the load
+    n_shards = min(threads * 4, len(mutations))
+    codes, unique_seq_ids = pd.factorize(seq_ids)
+    mutations_per_seq = np.bincount(codes, minlength=len(unique_seq_ids))
+
+    # Assign sequences to shards (largest first, to the shard with the fewest mutations)
+    shard_sizes = [(0, shard) for shard in range(n_shards)]
+    seq_shards = np.zeros(len(unique_seq_ids), dtype=np.int64)
+    for code in np.argsort(-mutations_per_seq, kind="stable"):
+        size, shard = heapq.heappop(shard_sizes)
+        seq_shards[code] = shard
+        heapq.heappush(shard_sizes, (size + mutations_per_seq[code], shard))
+    row_shards = seq_shards[codes]
+
+    kmers = [""] * len(mutations)
+    with ProcessPoolExecutor(max_workers=threads) as executor:
+        futures = {}
+        for shard in range(n_shards):
+            rows = np.flatnonzero(row_shards == shard)
+            if len(rows) == 0:
+                continue
+            shard_seq_ids = seq_ids[rows]
+            futures[
+                executor.submit(
+                    mutate_shard,
+                    parsed_mutations.iloc[rows],
+                    {seq_id: seq_dict[seq_id] for seq_id in set(shard_seq_ids)},
+                    shard_seq_ids,
+                    mutations[rows],
+                    kmer_flanking_length,
+                )
+            ] = rows
+
+        for future in tqdm(
+            as_completed(futures),
+            total=len(futures),
+            desc="Mutating sequences",
+            disable=not verbose,
+        ):
+            shard_kmers, shard_stats = future.result()
+            for row, kmer in zip(futures[future], shard_kmers):
+                kmers[row] = kmer
+
+            # Merge counts of weird mutations found by the worker
+            stats.merge(shard_stats)
+
+    return kmers
+
+
+mutation_functions = {
+    "substitution": substitution_mutation,
+    "deletion": deletion_mutation,
+    "delins": delins_mutation,
+    "insertion": insertion_mutation,
+    "duplication": duplication_mutation,
+    "inversion": inversion_mutation,
+    "unknown": unknown_mutation,
+}
+
+
+def report_stats(stats, verbose=True):
+    """
+    Log the number of mutations that were ignored or could not be applied correctly.
+    Logged as a warning if any mutations were affected, else as info (only if verbose=True).
+    """
+    total_mutations = stats.total_mutations
+    good_mutations = stats.good_mutations
+
+    report = f"""
+            {good_mutations} mutations correctly recorded ({good_mutations/total_mutations*100:.2f}%)
+            {stats.intronic_mutations} intronic mutations found ({stats.intronic_mutations/total_mutations*100:.2f}%)
+            {stats.posttranslational_region_mutations} posttranslational region mutations found ({stats.posttranslational_region_mutations/total_mutations*100:.2f}%)
+            {stats.unknown_mutations} unknown mutations found ({stats.unknown_mutations/total_mutations*100:.2f}%)
+            {stats.uncertain_mutations} mutations with uncertain mutation found ({stats.uncertain_mutations/total_mutations*100:.2f}%)
+            {stats.ambiguous_position_mutations} mutations with ambiguous position found ({stats.ambiguous_position_mutations/total_mutations*100:.2f}%)
+            {stats.cosmic_incorrect_wt_base} mutations with incorrect wildtype base found ({stats.cosmic_incorrect_wt_base/total_mutations*100:.2f}%)
+            {stats.mut_idx_outside_seq} mutations with indeces outside of the sequence length found ({stats.mut_idx_outside_seq/total_mutations*100:.2f}%)
+            """
+
+    if good_mutations != total_mutations:
+        logger.warning(report)
+    elif verbose:
+        logger.info(report)
+
+
+def mutate_chunk(
+    mutations,
+    seq_dict,
+    k=30,
+    mut_column="mutation",
+    mut_id_column="mut_ID",
+    seq_id_column="seq_ID",
+    threads=1,
+    stats=None,
+    verbose=False,
+):
+    """
+    Apply the mutations in one data frame (or chunk of a mutations file) to the sequences in seq_dict.
+
+    Args:
+    - mutations     Data frame containing the mutations (see mutate).
+    - seq_dict      Dictionary of the sequences to be mutated (sequence ID -> sequence).
+    - k             Length of sequences flanking the mutation. Default: 30.
+    - mut_column    Name of the column containing the mutations. Default: 'mutation'.
+    - mut_id_column Name of the column containing the IDs of each mutation. Default: 'mut_ID'.
+    - seq_id_column Name of the column containing the IDs of the sequences to be mutated. Default: 'seq_ID'.
+    - threads       Number of processes used to mutate sequences. Default: 1.
+    - stats         MutationStats object the counts of this chunk are added to.
+    - verbose       True/False whether to show a progress bar. Default: False.
+
+    Returns the mutation type codes (index in mutation_types), FASTA titles ([seq_ID]_[mut_ID]) and mutated sequences
+    of all mutations that yielded a mutated sequence (in input order) and the sequence IDs of the
+    rows whose sequence was not found.
+    """
+    if stats is None:
+        stats = MutationStats()
+
+    # Columns read from columnar files can be dictionary-encoded (categorical)
+    categorical_columns = [
+        column
+        for column in mutations.columns
+        if isinstance(mutations[column].dtype, pd.CategoricalDtype)
+    ]
+    if categorical_columns:
+        mutations = mutations.astype({column: object for column in categorical_columns})
+
+    # Use precomputed parsed mutations if available, else parse all mutations at once
+    if set(parsed_mutation_columns) <= set(mutations.columns):
+        parsed_mutations = mutations[parsed_mutation_columns].astype(
+            {"start": np.int64, "end": np.int64}
+        )
+        mutations = mutations.drop(columns=parsed_mutation_columns)
+    else:
+        parsed_mutations = parse_mutations(mutations[mut_column])
+
+    # Link sequences to their mutations using the sequence identifiers
+    # (sequences are looked up by ID when the mutations are applied instead of being copied to each row)
+    seq_found = mutations[seq_id_column].isin(seq_dict.keys()).values
+    seqs_not_found = list(mutations[seq_id_column].values[~seq_found])
+
+    # Drop inputs for sequences that were not found
+    keep = seq_found & mutations.notna().all(axis=1).values
+    mutations = mutations[keep]
+    parsed_mutations = parsed_mutations[keep]
+
+    # Create mutated sequences
+    if threads > 1 and len(mutations) > 0:
+        mutant_kmers = create_mutant_kmers_parallel(
+            parsed_mutations,
+            seq_dict,
+            mutations[seq_id_column].values,
+            mutations[mut_column].values,
+            kmer_flanking_length=k,
+            threads=threads,
+            stats=stats,
+            verbose=verbose,
+        )
+    else:
+        mutant_kmers = create_mutant_kmers(
+            parsed_mutations,
+            seq_dict,
+            mutations[seq_id_column].values,
+            kmer_flanking_length=k,
+            mutations=mutations[mut_column].values,
+            stats=stats,
+            verbose=verbose,
+        )
+    stats.total_mutations += len(mutations)
+
+    # Define header for mutated sequences in output fasta
+    headers = (mutations[seq_id_column] + "_" + mutations[mut_id_column]).values
+    type_codes = pd.Categorical(
+        parsed_mutations["mutation_type"], categories=mutation_types
+    ).codes
+
+    # Do not include an empty string as a mutated sequence
+    # (these are introduced when unknown mutations are encountered)
+    rows = [i for i, kmer in enumerate(mutant_kmers) if kmer != ""]
+
+    return (
+        type_codes[rows],
+        headers[rows],
+        [mutant_kmers[i] for i in rows],
+        seqs_not_found,
+    )
+
+
+def read_parquet_mutations(parquet_file, chunksize=None):
+    """
+    Read a mutations Parquet file (requires pyarrow).
+
+    Returns a data frame, or a generator of data frames with 'chunksize' rows if chunksize is specified.
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(
+            "Reading Parquet files requires the pyarrow package. Install it using pip (https://pypi.org/project/pyarrow)."
+        )
+
+    if not chunksize:
+        return pq.read_table(parquet_file).to_pandas()
+
+    return (
+        batch.to_pandas()
+        for batch in pq.ParquetFile(parquet_file).iter_batches(batch_size=chunksize)
+    )
+
+
+def report_non_nucleotide_seqs(non_nuc_seqs):
+    if non_nuc_seqs > 0:
+        logger.warning(
+            f"""
+            Non-nucleotide characters detected in {non_nuc_seqs} input sequences. gget mutate is currently only optimized for mutating nucleotide sequences.
+            Specifically inversion mutations might not be performed correctly. 
+            """
+        )
+
+
 def mutate(
     sequences,
     mutations,
@@ -375,6 +986,10 @@ def mutate(
     mut_id_column="mut_ID",
     seq_id_column="seq_ID",
     out=None,
+    threads=1,
+    chunksize=None,
+    fasta_index=False,
+    return_stats=False,
     verbose=True,
 ):
     """
@@ -412,6 +1027,9 @@ def mutate(
 
                     Alternatively: Input mutation(s) as a string or list, e.g., 'c.2C>T' or ['c.2C>T', 'c.1A>C'].
                     If a list is provided, the number of mutations must equal the number of input sequences.
+
+                    Parquet files (e.g. 'mutations.parquet', requires pyarrow) are also supported. If the file contains the
+                    columns returned by parse_mutations (as created by gget cosmic), the mutations are not parsed again.
     - k             (int) Length of sequences flanking the mutation. Default: 30.
                     If k > total length of the sequence, the entire sequence will be kept.
     - mut_column    (str) Name of the column containing the mutations to be performed in 'mutations'. Default: 'mutation'.
@@ -420,18 +1038,48 @@ def mutate(
     - out           (str) Path to output fasta file containing the mutated sequences, e.g., 'path/to/output_fasta.fa'.
                     Default: None -> returns a list of the mutated sequences to standard out.
                     The identifiers (following the '>') of the mutated sequences in the output fasta will be '>[seq_ID]_[mut_ID]'.
+    - threads       (int) Number of processes used to mutate sequences. Default: 1.
+                    Mutations are distributed across processes by sequence ID.
+    - chunksize     (int) Number of mutations read and mutated at a time. Default: None -> all mutations at once.
+                    Use to keep memory bounded for very large mutation tables. When 'out' is specified,
+                    mutated sequences are written to temporary files next to 'out' as they are created.
+    - fasta_index   (True/False) whether to read only the sequences referenced in 'mutations' from the 'sequences'
+                    fasta file using a faidx-style index instead of loading the entire file. Default: False.
+                    The index is built once and saved next to the fasta file ('[sequences].fai'). The fasta file must be
+                    uncompressed and all sequence lines (except the last line of each sequence) must be of equal length.
+    - return_stats  (True/False) whether to also return a dictionary with the number of mutations that were
+                    ignored or could not be applied correctly (by reason). Default: False.
     - verbose       (True/False) whether to print progress information. Default: True
 
     For more information on the standard mutation annotation, see https://www.ncbi.nlm.nih.gov/pmc/articles/PMC1867422/.
 
     Saves mutated sequences in fasta format (or returns a list containing the mutated sequences if out=None).
+    If return_stats=True, returns a tuple of (list of mutated sequences or None, dictionary of mutation statistics).
     """
 
-    global intronic_mutations, posttranslational_region_mutations, unknown_mutations, uncertain_mutations, ambiguous_position_mutations, cosmic_incorrect_wt_base, mut_idx_outside_seq
+    if threads < 1:
+        raise ValueError(
+            f"'threads' argument specified as {threads}. Expected an integer >= 1."
+        )
+    if chunksize is not None and chunksize < 1:
+        raise ValueError(
+            f"'chunksize' argument specified as {chunksize}. Expected an integer >= 1."
+        )
+
+    fasta_idx = None
 
     # Load input sequences and their identifiers from fasta file
     if "." in sequences:
-        titles, seqs = read_fasta(sequences)
+        if fasta_index:
+            try:
+                fasta_idx = FastaIndex(sequences, verbose=verbose)
+            except ValueError as e:
+                logger.warning(
+                    f"FASTA file could not be indexed ({e}). Loading the entire FASTA file instead."
+                )
+
+        if fasta_idx is None:
+            titles, seqs = read_fasta(sequences)
 
     # Handle input sequences passed as a list
     elif isinstance(sequences, list):
@@ -454,17 +1102,40 @@ def mutate(
             """
         )
 
+    n_seqs = len(fasta_idx) if fasta_idx is not None else len(seqs)
+
     # Read in 'mutations' if passed as filepath to comma-separated csv
+    # (in chunks of 'chunksize' rows if specified)
     if isinstance(mutations, str) and ".csv" in mutations:
-        mutations = pd.read_csv(mutations)
+        if chunksize:
+            mutations = pd.read_csv(
+                mutations,
+                chunksize=chunksize,
+                dtype={mut_column: str, mut_id_column: str, seq_id_column: str},
+            )
+        else:
+            mutations = pd.read_csv(mutations)
 
     elif isinstance(mutations, str) and ".tsv" in mutations:
-        mutations = pd.read_csv(mutations, sep="\t")
+        if chunksize:
+            mutations = pd.read_csv(
+                mutations,
+                sep="\t",
+                chunksize=chunksize,
+                dtype={mut_column: str, mut_id_column: str, seq_id_column: str},
+            )
+        else:
+            mutations = pd.read_csv(mutations, sep="\t")
+
+    # Read in 'mutations' if passed as filepath to a Parquet file
+    # (e.g. created by gget cosmic, which also stores the parsed mutations)
+    elif isinstance(mutations, str) and ".parquet" in mutations:
+        mutations = read_parquet_mutations(mutations, chunksize=chunksize)
 
     # Handle mutations passed as a list
     elif isinstance(mutations, list):
         if len(mutations) > 1:
-            if len(mutations) != len(seqs):
+            if len(mutations) != n_seqs:
                 raise ValueError(
                     "If a list is passed, the number of mutations must equal the number of input sequences."
                 )
@@ -476,21 +1147,21 @@ def mutate(
             mutations = temp
         else:
             temp = pd.DataFrame()
-            temp["mutation"] = [mutations[0]] * len(seqs)
-            temp["mut_ID"] = [f"mut{i+1}" for i in range(len(seqs))]
-            temp["seq_ID"] = [f"seq{i+1}" for i in range(len(seqs))]
+            temp["mutation"] = [mutations[0]] * n_seqs
+            temp["mut_ID"] = [f"mut{i+1}" for i in range(n_seqs)]
+            temp["seq_ID"] = [f"seq{i+1}" for i in range(n_seqs)]
             mutations = temp
 
     # Handle single mutation passed as a string
     elif isinstance(mutations, str):
         # This will work for one mutation for one sequence as well as one mutation for multiple sequences
         temp = pd.DataFrame()
-        temp["mutation"] = [mutations] * len(seqs)
-        temp["mut_ID"] = [f"mut{i+1}" for i in range(len(seqs))]
-        temp["seq_ID"] = [f"seq{i+1}" for i in range(len(seqs))]
+        temp["mutation"] = [mutations] * n_seqs
+        temp["mut_ID"] = [f"mut{i+1}" for i in range(n_seqs)]
+        temp["seq_ID"] = [f"seq{i+1}" for i in range(n_seqs)]
         mutations = temp
 
-    elif isinstance(mutations, pd.DataFrame):
+    elif isinstance(mutations, (pd.DataFrame, pd.io.parsers.TextFileReader)):
         pass
 
     else:
@@ -510,294 +1181,148 @@ def mutate(
 
     seq_dict = {}
     non_nuc_seqs = 0
-    for title, seq in zip(titles, seqs):
-        # Check that sequences are nucleotide sequences
-        if not set(seq) <= nucleotides:
-            non_nuc_seqs += 1
-
-        # Keep text following the > until the first space/dot as the sequence identifier
-        # Dots are removed so Ensembl version numbers are removed
-        seq_dict[title.split(" ")[0].split(".")[0]] = seq
-
-    if non_nuc_seqs > 0:
-        logger.warning(
-            f"""
-            Non-nucleotide characters detected in {non_nuc_seqs} input sequences. gget mutate is currently only optimized for mutating nucleotide sequences.
-            Specifically inversion mutations might not be performed correctly. 
-            """
-        )
+    if fasta_idx is not None:
+        # Sequences are read from the indexed fasta file when they are first referenced in 'mutations'
+        # (index names without version numbers -> index names)
+        index_names = {name.split(".")[0]: name for name in fasta_idx.names}
+    else:
+        for title, seq in zip(titles, seqs):
+            # Check that sequences are nucleotide sequences
+            if not set(seq) <= nucleotides:
+                non_nuc_seqs += 1
+
+            # Keep text following the > until the first space/dot as the sequence identifier
+            # Dots are removed so Ensembl version numbers are removed
+            seq_dict[title.split(" ")[0].split(".")[0]] = seq
+
+        report_non_nucleotide_seqs(non_nuc_seqs)
+
+    # Process mutations in chunks of 'chunksize' rows (or all at once)
+    if isinstance(mutations, pd.DataFrame):
+        if chunksize:
+            mutation_chunks = (
+                mutations.iloc[i : i + chunksize]
+                for i in range(0, len(mutations), chunksize)
+            )
+        else:
+            mutation_chunks = [mutations]
+    else:
+        mutation_chunks = mutations
 
-    # Get all mutation types
     if verbose:
-        tqdm.pandas(desc="Extracting mutation types")
-        mutations["mutation_type"] = mutations[mut_column].progress_apply(
-            extract_mutation_type
-        )
-    else:
-        mutations["mutation_type"] = mutations[mut_column].apply(extract_mutation_type)
+        logger.info("Mutating sequences...")
 
-    # Link sequences to their mutations using the sequence identifiers
-    mutations["full_sequence"] = mutations[seq_id_column].map(seq_dict)
+    # Statistics are collected per call so concurrent calls do not interfere
+    stats = MutationStats()
+    seqs_not_found = []
+    # Mutated sequences are collected per mutation type so they can be returned sorted by mutation type
+    # (in temporary files next to 'out' when streaming, to keep memory bounded)
+    streaming = bool(chunksize) and bool(out)
+    if streaming:
+        out_dir = os.path.dirname(os.path.abspath(out))
+        type_files = [
+            tempfile.TemporaryFile("w+", dir=out_dir) for _ in mutation_types
+        ]
+        type_writers = [FastaWriter(type_file) for type_file in type_files]
+    else:
+        type_records = [[] for _ in mutation_types]
 
-    # Handle sequences that were not found based on their sequence IDs
-    seqs_not_found = mutations[mutations["full_sequence"].isnull()]
-    if 0 < len(seqs_not_found) < 20:
-        logger.warning(
-            f"""
-            The sequences with the following {len(seqs_not_found)} sequence ID(s) were not found: {", ".join(seqs_not_found["seq_ID"].values)}  
-            These sequences and their corresponding mutations will not be included in the output.  
-            Ensure that the sequence IDs correspond to the string following the > character in the 'sequences' fasta file (do NOT include spaces or dots).
-            """
-        )
-    elif len(seqs_not_found) > 0:
-        logger.warning(
-            f"""
-            The sequences corresponding to {len(seqs_not_found)} sequence IDs were not found.  
-            These sequences and their corresponding mutations will not be included in the output.  
-            Ensure that the sequence IDs correspond to the string following the > character in the 'sequences' fasta file (do NOT include spaces or dots).
-            """
-        )
+    try:
+        for mutations_chunk in mutation_chunks:
+            if fasta_idx is not None:
+                # Read the sequences referenced in this chunk that were not read yet
+                for seq_id in pd.unique(mutations_chunk[seq_id_column].dropna()):
+                    if seq_id not in seq_dict and seq_id in index_names:
+                        seq = fasta_idx.fetch(index_names[seq_id])
+                        if not set(seq) <= nucleotides:
+                            non_nuc_seqs += 1
+                        seq_dict[seq_id] = seq
+
+            type_codes, headers, mutant_kmers, chunk_seqs_not_found = mutate_chunk(
+                mutations_chunk,
+                seq_dict,
+                k=k,
+                mut_column=mut_column,
+                mut_id_column=mut_id_column,
+                seq_id_column=seq_id_column,
+                threads=threads,
+                stats=stats,
+                verbose=verbose,
+            )
+            seqs_not_found.extend(chunk_seqs_not_found)
 
-    # Drop inputs for sequences that were not found
-    mutations = mutations.dropna()
-    if len(mutations) < 1:
-        raise ValueError(
-            """
-            None of the input sequences match the sequence IDs provided in 'mutations'. 
-            Ensure that the sequence IDs correspond to the string following the > character in the 'sequences' fasta file (do NOT include spaces or dots).
-            """
-        )
+            for type_code, header, kmer in zip(type_codes, headers, mutant_kmers):
+                if streaming:
+                    type_writers[type_code].write(header, kmer)
+                else:
+                    type_records[type_code].append((header, kmer))
 
-    # Split data frame by mutation type
-    mutation_types = [
-        "substitution",
-        "deletion",
-        "delins",
-        "insertion",
-        "duplication",
-        "inversion",
-        "unknown",
-    ]
-    mutation_dict = {mutation_type: [] for mutation_type in mutation_types}
-    for mutation_type in mutation_types:
-        df_mutation_type = mutations[mutations["mutation_type"] == mutation_type].copy()
-        df_mutation_type["mutant_sequence_kmer"] = ""
-        # Define header for mutated sequences in output fasta
-        df_mutation_type["header"] = (
-            ">"
-            + df_mutation_type[seq_id_column]
-            + "_"
-            + df_mutation_type[mut_id_column]
-        )
-        mutation_dict[mutation_type] = df_mutation_type
+        if fasta_idx is not None:
+            report_non_nucleotide_seqs(non_nuc_seqs)
 
-    # Create mutated sequences
-    if verbose:
-        logger.info("Mutating sequences...")
-    if not mutation_dict["substitution"].empty:
-        if verbose:
-            tqdm.pandas(desc="Performing substitutions")
-            mutation_dict["substitution"]["mutant_sequence_kmer"] = mutation_dict[
-                "substitution"
-            ].progress_apply(
-                create_mutant_sequence,
-                args=(substitution_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-        else:
-            mutation_dict["substitution"]["mutant_sequence_kmer"] = mutation_dict[
-                "substitution"
-            ].apply(
-                create_mutant_sequence,
-                args=(substitution_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-    if not mutation_dict["deletion"].empty:
-        if verbose:
-            tqdm.pandas(desc="Performing deletions")
-            mutation_dict["deletion"]["mutant_sequence_kmer"] = mutation_dict[
-                "deletion"
-            ].progress_apply(
-                create_mutant_sequence,
-                args=(deletion_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-        else:
-            mutation_dict["deletion"]["mutant_sequence_kmer"] = mutation_dict[
-                "deletion"
-            ].apply(
-                create_mutant_sequence,
-                args=(deletion_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-    if not mutation_dict["delins"].empty:
-        if verbose:
-            tqdm.pandas(desc="Performing delins")
-            mutation_dict["delins"]["mutant_sequence_kmer"] = mutation_dict[
-                "delins"
-            ].progress_apply(
-                create_mutant_sequence,
-                args=(delins_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-        else:
-            mutation_dict["delins"]["mutant_sequence_kmer"] = mutation_dict[
-                "delins"
-            ].apply(
-                create_mutant_sequence,
-                args=(delins_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-    if not mutation_dict["insertion"].empty:
-        if verbose:
-            tqdm.pandas(desc="Performing insertions")
-            mutation_dict["insertion"]["mutant_sequence_kmer"] = mutation_dict[
-                "insertion"
-            ].progress_apply(
-                create_mutant_sequence,
-                args=(insertion_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-        else:
-            mutation_dict["insertion"]["mutant_sequence_kmer"] = mutation_dict[
-                "insertion"
-            ].apply(
-                create_mutant_sequence,
-                args=(insertion_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-    if not mutation_dict["duplication"].empty:
-        if verbose:
-            tqdm.pandas(desc="Performing duplications")
-            mutation_dict["duplication"]["mutant_sequence_kmer"] = mutation_dict[
-                "duplication"
-            ].progress_apply(
-                create_mutant_sequence,
-                args=(duplication_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-        else:
-            mutation_dict["duplication"]["mutant_sequence_kmer"] = mutation_dict[
-                "duplication"
-            ].apply(
-                create_mutant_sequence,
-                args=(duplication_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-    if not mutation_dict["inversion"].empty:
-        if verbose:
-            tqdm.pandas(desc="Performing inversions")
-            mutation_dict["inversion"]["mutant_sequence_kmer"] = mutation_dict[
-                "inversion"
-            ].progress_apply(
-                create_mutant_sequence,
-                args=(inversion_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-        else:
-            mutation_dict["inversion"]["mutant_sequence_kmer"] = mutation_dict[
-                "inversion"
-            ].apply(
-                create_mutant_sequence,
-                args=(inversion_mutation, k, mut_column, seq_id_column),
-                axis=1,
-            )
-    if not mutation_dict["unknown"].empty:
-        if verbose:
-            tqdm.pandas(desc="Unknown mutations")
-            mutation_dict["unknown"]["mutant_sequence_kmer"] = mutation_dict[
-                "unknown"
-            ].progress_apply(
-                create_mutant_sequence,
-                args=(unknown_mutation, k, mut_column, seq_id_column),
-                axis=1,
+        # Handle sequences that were not found based on their sequence IDs
+        if 0 < len(seqs_not_found) < 20:
+            logger.warning(
+                f"""
+                The sequences with the following {len(seqs_not_found)} sequence ID(s) were not found: {", ".join(seqs_not_found)}  
+                These sequences and their corresponding mutations will not be included in the output.  
+                Ensure that the sequence IDs correspond to the string following the > character in the 'sequences' fasta file (do NOT include spaces or dots).
+                """
             )
-        else:
-            mutation_dict["unknown"]["mutant_sequence_kmer"] = mutation_dict[
-                "unknown"
-            ].apply(
-                create_mutant_sequence,
-                args=(unknown_mutation, k, mut_column, seq_id_column),
-                axis=1,
+        elif len(seqs_not_found) > 0:
+            logger.warning(
+                f"""
+                The sequences corresponding to {len(seqs_not_found)} sequence IDs were not found.  
+                These sequences and their corresponding mutations will not be included in the output.  
+                Ensure that the sequence IDs correspond to the string following the > character in the 'sequences' fasta file (do NOT include spaces or dots).
+                """
             )
 
-    # Report status of mutations back to user
-    total_mutations = mutations.shape[0]
-    good_mutations = (
-        total_mutations
-        - intronic_mutations
-        - posttranslational_region_mutations
-        - unknown_mutations
-        - uncertain_mutations
-        - ambiguous_position_mutations
-        - cosmic_incorrect_wt_base
-        - mut_idx_outside_seq
-    )
-
-    if good_mutations != total_mutations:
-        logger.warning(
-            f"""
-            {good_mutations} mutations correctly recorded ({good_mutations/total_mutations*100:.2f}%)
-            {intronic_mutations} intronic mutations found ({intronic_mutations/total_mutations*100:.2f}%)
-            {posttranslational_region_mutations} posttranslational region mutations found ({posttranslational_region_mutations/total_mutations*100:.2f}%)
-            {unknown_mutations} unknown mutations found ({unknown_mutations/total_mutations*100:.2f}%)
-            {uncertain_mutations} mutations with uncertain mutation found ({uncertain_mutations/total_mutations*100:.2f}%)
-            {ambiguous_position_mutations} mutations with ambiguous position found ({ambiguous_position_mutations/total_mutations*100:.2f}%)
-            {cosmic_incorrect_wt_base} mutations with incorrect wildtype base found ({cosmic_incorrect_wt_base/total_mutations*100:.2f}%)
-            {mut_idx_outside_seq} mutations with indeces outside of the sequence length found ({mut_idx_outside_seq/total_mutations*100:.2f}%)
-            """
-        )
-    else:
-        if verbose:
-            logger.info(
-                f"""
-                {good_mutations} mutations correctly recorded ({good_mutations/total_mutations*100:.2f}%)
-                {intronic_mutations} intronic mutations found ({intronic_mutations/total_mutations*100:.2f}%)
-                {posttranslational_region_mutations} posttranslational region mutations found ({posttranslational_region_mutations/total_mutations*100:.2f}%)
-                {unknown_mutations} unknown mutations found ({unknown_mutations/total_mutations*100:.2f}%)
-                {uncertain_mutations} mutations with uncertain mutation found ({uncertain_mutations/total_mutations*100:.2f}%)
-                {ambiguous_position_mutations} mutations with ambiguous position found ({ambiguous_position_mutations/total_mutations*100:.2f}%)
-                {cosmic_incorrect_wt_base} mutations with incorrect wildtype base found ({cosmic_incorrect_wt_base/total_mutations*100:.2f}%)
-                {mut_idx_outside_seq} mutations with indeces outside of the sequence length found ({mut_idx_outside_seq/total_mutations*100:.2f}%)
+        if stats.total_mutations < 1:
+            raise ValueError(
+                """
+                None of the input sequences match the sequence IDs provided in 'mutations'. 
+                Ensure that the sequence IDs correspond to the string following the > character in the 'sequences' fasta file (do NOT include spaces or dots).
                 """
             )
 
-    if out:
-        # Save mutated sequences in new fasta file
-        with open(out, "w") as fasta_file:
-            for mutation in mutation_dict:
-                if not mutation_dict[mutation].empty:
-                    df = mutation_dict[mutation]
-                    df["fasta_format"] = (
-                        df["header"] + "\n" + df["mutant_sequence_kmer"] + "\n"
-                    )
+        # Report status of mutations back to user
+        report_stats(stats, verbose=verbose)
+
+        if out:
+            # Save mutated sequences in new fasta file (sorted by mutation type)
+            if streaming:
+                with open(out, "w") as fasta_file:
+                    for type_writer, type_file in zip(type_writers, type_files):
+                        type_writer.close()
+                        type_file.seek(0)
+                        shutil.copyfileobj(type_file, fasta_file)
+            else:
+                with FastaWriter(out) as writer:
+                    for records in type_records:
+                        writer.write_records(records)
 
-                    # Do not include an empty string as a mutated sequence
-                    # (these are introduced when unknown mutations are encountered)
-                    df = df[df["mutant_sequence_kmer"] != ""]
+            if verbose:
+                logger.info(
+                    f"FASTA file containing mutated sequences created at {out}."
+                )
 
-                    fasta_file.write("".join(df["fasta_format"].values))
+            all_mut_seqs = None
 
-        # with open(out, "r") as fasta_file:
-        #     lines = [line for line in fasta_file if line.strip()]
+        # When out=None, return list of mutated seqs
+        else:
+            all_mut_seqs = [kmer for records in type_records for _, kmer in records]
+            if len(all_mut_seqs) == 0:
+                all_mut_seqs = None
 
-        # with open(out, "w") as fasta_file:
-        #     fasta_file.writelines(lines)
+        if return_stats:
+            return all_mut_seqs, stats.to_dict()
 
-        if verbose:
-            logger.info(f"FASTA file containing mutated sequences created at {out}.")
+        return all_mut_seqs
 
-    # When out=None, return list of mutated seqs
-    else:
-        all_mut_seqs = []
-        for mutation in mutation_dict:
-            df = mutation_dict[mutation]
-            all_mut_seqs.extend(df["mutant_sequence_kmer"].values)
-
-        # Remove empty strings from final list of mutated sequences
-        # (these are introduced when unknown mutations are encountered)
-        while "" in all_mut_seqs:
-            all_mut_seqs.remove("")
-
-        if len(all_mut_seqs) > 0:
-            return all_mut_seqs
+    finally:
+        if streaming:
+            for type_file in type_files:
+                type_file.close()
+        if fasta_idx is not None:
+            fasta_idx.close()
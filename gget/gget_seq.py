@@ -1,18 +1,73 @@
 import numpy as np
 
 # Custom functions
-from .utils import rest_query, get_uniprot_seqs, set_up_logger
+from .utils import (
+    rest_query,
+    rest_query_batch,
+    get_uniprot_seqs,
+    set_up_logger,
+    FastaWriter,
+)
 logger = set_up_logger()
 from .gget_info import info
 
 # Constants
-from .constants import ENSEMBL_REST_API, UNIPROT_REST_API
+from .constants import ENSEMBL_REST_API, ENSEMBL_REST_MAX_POST_IDS, UNIPROT_REST_API
+
+
+def fetch_ensembl_seqs(server, ids_to_fetch):
+    """
+    Fetch nucleotide sequences from the Ensembl REST API in batches
+    (POST sequence/id endpoint) and yield FASTA records as they are returned.
+
+    Args:
+    - server        Link to Ensembl REST API server.
+    - ids_to_fetch  List of (queried ID, ID to fetch sequence for, True/False whether to use
+                    the ID returned by the server in the FASTA header) tuples.
+
+    Yields FASTA records as [header line, sequence] lists in the order of ids_to_fetch.
+    """
+    for i in range(0, len(ids_to_fetch), ENSEMBL_REST_MAX_POST_IDS):
+        chunk = ids_to_fetch[i : i + ENSEMBL_REST_MAX_POST_IDS]
+        seq_ids = [seq_id for _, seq_id, _ in chunk]
+
+        try:
+            seq_results = rest_query_batch(server, "sequence/id", seq_ids)
+
+        # The server rejects the whole batch if it contains an invalid ID,
+        # in which case the IDs in this batch are queried one by one
+        except RuntimeError:
+            seq_results = {}
+            for seq_id in seq_ids:
+                try:
+                    seq_results[seq_id] = rest_query(
+                        server, "sequence/id/" + seq_id + "?", "application/json"
+                    )
+                except RuntimeError:
+                    pass
+
+        for ensembl_ID, seq_id, use_returned_id in chunk:
+            seq_result = seq_results.get(seq_id)
+
+            if not seq_result:
+                logger.error(
+                    f"ID {seq_id} not found. Please double-check spelling/arguments and try again."
+                )
+                continue
+
+            if use_returned_id:
+                header = ">" + seq_result["id"] + " " + seq_result["desc"]
+            else:
+                header = ">" + ensembl_ID + " " + seq_result["desc"]
+
+            yield [header, seq_result["seq"]]
 
 
 def seq(
     ens_ids,
     translate=False,
     isoforms=False,
+    id_mapping=False,
     save=False,
     transcribe=None,
     seqtype=None,
@@ -31,6 +86,9 @@ def seq(
                     Amino acid sequences are fetched from the UniProt REST API server.
     - isoforms      If True, returns the sequences of all known transcripts (default: False).
                     (Only for gene IDs.)
+    - id_mapping    If True, fetches amino acid sequences using UniProt ID mapping jobs instead of
+                    one UniProt search per ID (recommended for large numbers of IDs; default: False).
+                    (Only applies when translate=True.)
     - save          If True, saves output FASTA to current directory (default: False).
     - verbose       True/False whether to print progress information. Default True.
 
@@ -74,57 +132,35 @@ def seq(
     # Initiate empty 'fasta'
     fasta = []
 
+    # Get ID types (gene, transcript, ...) and transcripts of all IDs with a single (batched) gget info query
+    if isoforms == True or translate is True:
+        info_df = info(
+            ens_ids_clean, verbose=False, pdb=False, ncbi=False, uniprot=False
+        )
+
     ## Fetch nucleotide sequece
     if translate is False:
         # Define Ensembl REST API server
         server = ENSEMBL_REST_API
-        # Define type of returned content from REST
-        content_type = "application/json"
 
-        # Initiate dictionary to save results for all IDs in
-        master_dict = {}
-
-        # Query REST APIs from https://rest.ensembl.org/
-        for ensembl_ID in ens_ids_clean:
-            # Create dict to save query results
-            results_dict = {ensembl_ID: {}}
+        # List of (queried ID, ID to fetch sequence for, use ID returned by server in FASTA header)
+        ids_to_fetch = []
 
+        # Remove duplicates without changing their order
+        for ensembl_ID in sorted(set(ens_ids_clean), key=ens_ids_clean.index):
             # If isoforms False, just fetch sequences of passed Ensembl ID
             if isoforms == False:
-                # sequence/id/ query: Request sequence by stable identifier
-                query = "sequence/id/" + ensembl_ID + "?"
-
-                # Try if query valid
-                try:
-                    # Submit query; this will throw RuntimeError if ID not found
-                    df_temp = rest_query(server, query, content_type)
-
-                    # Delete superfluous entries
-                    keys_to_delete = ["query", "id", "version", "molecule"]
-                    for key in keys_to_delete:
-                        # Pop keys, None -> do not raise an error if key to delete not found
-                        df_temp.pop(key, None)
-
-                    # Add results to main dict
-                    results_dict[ensembl_ID].update({"seq": df_temp})
+                ids_to_fetch.append((ensembl_ID, ensembl_ID, False))
 
-                    if verbose:
-                        logger.info(
-                            f"Requesting nucleotide sequence of {ensembl_ID} from Ensembl."
-                        )
-
-                except RuntimeError:
-                    logger.error(
-                        f"ID {ensembl_ID} not found. Please double-check spelling/arguments and try again."
+                if verbose:
+                    logger.info(
+                        f"Requesting nucleotide sequence of {ensembl_ID} from Ensembl."
                     )
 
             # If isoforms true, fetch sequences of isoforms instead
             if isoforms == True:
-                # Get ID type (gene, transcript, ...) using gget info
-                info_df = info(ensembl_ID, verbose=False, pdb=False, ncbi=False, uniprot=False)
-
                 # Check if Ensembl ID was found
-                if isinstance(info_df, type(None)):
+                if isinstance(info_df, type(None)) or ensembl_ID not in info_df.index:
                     logger.warning(
                         f"ID '{ensembl_ID}' not found. Please double-check spelling/arguments and try again."
                     )
@@ -144,77 +180,28 @@ def seq(
                         if transcipt_id.startswith("ENS"):
                             transcipt_id = transcipt_id.split(".")[0]
 
-                        # Try if query is valid
-                        try:
-                            # Define the REST query
-                            query = "sequence/id/" + transcipt_id + "?"
-                            # Submit query
-                            df_temp = rest_query(server, query, content_type)
-
-                            # Delete superfluous entries
-                            keys_to_delete = ["query", "version", "molecule"]
-                            for key in keys_to_delete:
-                                # Pop keys, None -> do not raise an error if key to delete not found
-                                df_temp.pop(key, None)
-
-                            # Add results to main dict
-                            results_dict[ensembl_ID].update(
-                                {f"{transcipt_id}": df_temp}
-                            )
-
-                        except RuntimeError:
-                            logger.error(
-                                f"ID {transcipt_id} not found. "
-                                "Please double-check spelling/arguments and try again."
-                            )
+                        ids_to_fetch.append((ensembl_ID, transcipt_id, True))
 
                 # If isoform true, but ID is not a gene; ignore the isoform parameter
                 else:
-                    # Try if query is valid
-                    try:
-                        # Define the REST query
-                        query = "sequence/id/" + ensembl_ID + "?"
-
-                        # Submit query
-                        df_temp = rest_query(server, query, content_type)
-
-                        # Delete superfluous entries
-                        keys_to_delete = ["query", "id", "version", "molecule"]
-                        for key in keys_to_delete:
-                            # Pop keys, None -> do not raise an error if key to delete not found
-                            df_temp.pop(key, None)
-
-                        # Add results to main dict
-                        results_dict[ensembl_ID].update({"seq": df_temp})
+                    ids_to_fetch.append((ensembl_ID, ensembl_ID, False))
 
-                        logger.info(
-                            f"Requesting nucleotide sequence of {ensembl_ID} from Ensembl."
-                        )
-                        logger.warning("The isoform option only applies to gene IDs.")
-
-                    except RuntimeError:
-                        logger.error(
-                            f"ID {ensembl_ID} not found. "
-                            "Please double-check spelling/arguments and try again."
-                        )
+                    logger.info(
+                        f"Requesting nucleotide sequence of {ensembl_ID} from Ensembl."
+                    )
+                    logger.warning("The isoform option only applies to gene IDs.")
 
-            # Add results to master dict
-            master_dict.update(results_dict)
+        # Build FASTA file from the sequences as they are returned by the server
+        writer = FastaWriter("gget_seq_results.fa") if save else None
+        try:
+            for fasta_record in fetch_ensembl_seqs(server, ids_to_fetch):
+                fasta.extend(fasta_record)
 
-        # Build FASTA file
-        for ens_ID in master_dict:
-            for key in master_dict[ens_ID].keys():
-                if key == "seq":
-                    fasta.append(">" + ens_ID + " " + master_dict[ens_ID][key]["desc"])
-                    fasta.append(master_dict[ens_ID][key]["seq"])
-                else:
-                    fasta.append(
-                        ">"
-                        + master_dict[ens_ID][key]["id"]
-                        + " "
-                        + master_dict[ens_ID][key]["desc"]
-                    )
-                    fasta.append(master_dict[ens_ID][key]["seq"])
+                if save:
+                    writer.write(*fasta_record)
+        finally:
+            if save:
+                writer.close()
 
     ## Fetch amino acid sequences from UniProt
     if translate is True:
@@ -223,11 +210,8 @@ def seq(
             trans_ids = []
 
             for ensembl_ID in ens_ids_clean:
-                # Get ID type (gene, transcript, ...) using gget info
-                info_df = info(ensembl_ID, verbose=False, pdb=False, ncbi=False, uniprot=False)
-
                 # Check that Ensembl ID was found
-                if isinstance(info_df, type(None)):
+                if isinstance(info_df, type(None)) or ensembl_ID not in info_df.index:
                     logger.warning(
                         f"ID '{ensembl_ID}' not found. Please double-check spelling/arguments."
                     )
@@ -281,18 +265,17 @@ def seq(
                     )
 
             # Fetch the amino acid sequences of the transcript Ensembl IDs
-            df_uniprot = get_uniprot_seqs(UNIPROT_REST_API, trans_ids)
+            df_uniprot = get_uniprot_seqs(
+                UNIPROT_REST_API, trans_ids, id_mapping=id_mapping
+            )
 
         if isoforms is True:
             # List to collect transcript IDs
             trans_ids = []
 
             for ensembl_ID in ens_ids_clean:
-                # Get ID type (gene, transcript, ...) using gget info
-                info_df = info(ensembl_ID, verbose=False, pdb=False, ncbi=False, uniprot=False)
-
                 # Check that Ensembl ID was found
-                if isinstance(info_df, type(None)):
+                if isinstance(info_df, type(None)) or ensembl_ID not in info_df.index:
                     logger.warning(
                         f"ID '{ensembl_ID}' not found. Please double-check spelling/arguments."
                     )
@@ -342,7 +325,9 @@ def seq(
                     )
 
             # Fetch amino acid sequences of all isoforms from the UniProt REST API
-            df_uniprot = get_uniprot_seqs(UNIPROT_REST_API, trans_ids)
+            df_uniprot = get_uniprot_seqs(
+                UNIPROT_REST_API, trans_ids, id_mapping=id_mapping
+            )
 
         # Check if any results were found
         if len(df_uniprot) < 1:
@@ -381,11 +366,9 @@ def seq(
                 )
                 fasta.append(str(uniprot_seq))
 
-    # Save
-    if save:
-        file = open("gget_seq_results.fa", "w")
-        for element in fasta:
-            file.write(element + "\n")
-        file.close()
+    # Save (nucleotide sequences were already written as they were returned by the server)
+    if save and translate is True:
+        with FastaWriter("gget_seq_results.fa") as writer:
+            writer.write_records(zip(fasta[::2], fasta[1::2]))
 
     return fasta
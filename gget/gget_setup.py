@@ -11,6 +11,11 @@ from .utils import set_up_logger
 logger = set_up_logger()
 
 from .compile import PACKAGE_PATH
+from .gget_diamond import (
+    PRECOMPILED_DIAMOND_PATH,
+    make_diamond_db,
+    write_diamond_db_info,
+)
 from .constants import (
     ELM_INSTANCES_FASTA_DOWNLOAD,
     ELM_CLASSES_TSV_DOWNLOAD,
@@ -24,6 +29,8 @@ ELM_INSTANCES_FASTA = os.path.join(ELM_FILES, "elm_instances.fasta")
 ELM_CLASSES_TSV = os.path.join(ELM_FILES, "elms_classes.tsv")
 ELM_INSTANCES_TSV = os.path.join(ELM_FILES, "elm_instances.tsv")
 ELM_INTDOMAINS_TSV = os.path.join(ELM_FILES, "elm_interaction_domains.tsv")
+# DIAMOND database of the ELM instances (created from ELM_INSTANCES_FASTA during setup)
+ELM_INSTANCES_DMND = os.path.join(ELM_FILES, "elm_instances.dmnd")
 
 ## Variables for alphafold module
 ALPHAFOLD_GIT_REPO = "https://github.com/deepmind/alphafold"
@@ -131,6 +138,7 @@ def setup(module, verbose=True, out=None):
             elm_classes_tsv = os.path.join(elm_files_out, "elms_classes.tsv")
             elm_instances_tsv = os.path.join(elm_files_out, "elm_instances.tsv")
             elm_intdomains_tsv = os.path.join(elm_files_out, "elm_interaction_domains.tsv")
+            elm_instances_dmnd = os.path.join(elm_files_out, "elm_instances.dmnd")
 
             # Create folder for ELM files (if it does not exist)
             if not os.path.exists(elm_files_out):
@@ -141,6 +149,7 @@ def setup(module, verbose=True, out=None):
             elm_classes_tsv = ELM_CLASSES_TSV
             elm_instances_tsv = ELM_INSTANCES_TSV
             elm_intdomains_tsv = ELM_INTDOMAINS_TSV
+            elm_instances_dmnd = ELM_INSTANCES_DMND
 
             # Create folder for ELM files (if it does not exist)
             if not os.path.exists(ELM_FILES):
@@ -199,6 +208,30 @@ def setup(module, verbose=True, out=None):
         else:
             logger.error("ELM interactions domains file missing.")
 
+        # Create the DIAMOND database used by gget elm once instead of for every alignment
+        if os.path.exists(elm_instances_fasta):
+            if verbose:
+                logger.info("Creating DIAMOND database of ELM instances...")
+            try:
+                make_diamond_db(
+                    PRECOMPILED_DIAMOND_PATH, elm_instances_fasta, elm_instances_dmnd
+                )
+                write_diamond_db_info(
+                    PRECOMPILED_DIAMOND_PATH, elm_instances_fasta, elm_instances_dmnd
+                )
+                if verbose:
+                    logger.info("ELM DIAMOND database present.")
+            except RuntimeError as e:
+                logger.warning(
+                    f"Creating DIAMOND database of ELM instances failed ({e}). gget elm will create it next to the ELM files during the first alignment instead."
+                )
+
+        # Parse the refreshed ELM files on the next gget.elm call
+        if out is None:
+            from .gget_elm import clear_elm_reference
+
+            clear_elm_reference()
+
     if module == "alphafold":
         if platform.system() == "Windows":
             logger.error(
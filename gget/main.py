@@ -8,7 +8,7 @@ dt_string = datetime.now().strftime("%Y_%m_%d-%H_%M")
 import os
 import json
 
-from .utils import set_up_logger
+from .utils import set_up_logger, write_fasta
 
 logger = set_up_logger()
 
@@ -29,10 +29,11 @@ from .gget_setup import setup
 from .gget_pdb import pdb
 from .gget_gpt import gpt
 from .gget_cellxgene import cellxgene
-from .gget_elm import elm
+from .gget_elm import elm, elm_batch
 from .gget_diamond import diamond
 from .gget_cosmic import cosmic
 from .gget_mutate import mutate
+from .gget_cache import cache
 
 
 # Custom formatter for help messages that preserved the text formatting and adds the default value to the end of the help message
@@ -325,7 +326,7 @@ def main():
     parser_elm.add_argument(
         "sequence",
         type=str,
-        help="Amino acid sequence or Uniprot Acc. If Uniprot Acc, use flag '--uniprot'.",
+        help="Amino acid sequence or Uniprot Acc. If Uniprot Acc, use flag '--uniprot'. Path to FASTA file if flag '--batch' is used.",
     )
     parser_elm.add_argument(
         "-u",
@@ -335,6 +336,17 @@ def main():
         required=False,
         help="Use this flag if input is a Uniprot Acc instead of an amino acid sequence.",
     )
+    parser_elm.add_argument(
+        "-b",
+        "--batch",
+        default=False,
+        action="store_true",
+        required=False,
+        help=(
+            "Use this flag if input is a path to a FASTA file containing multiple amino acid sequences.\n"
+            "All sequences are aligned in a single DIAMOND run and results contain a 'query_id' column."
+        ),
+    )
     parser_elm.add_argument(
         "-s",
         "--sensitivity",
@@ -432,8 +444,8 @@ def main():
         default=None,
         required=False,
         help=(
-            "Path to save DIAMOND database created from reference.\n"
-            "Default: None -> Temporary db file will be deleted after alignment or saved in 'out' if 'out' is provided."
+            "Path to DIAMOND database (.dmnd) of the reference. Databases created from the same reference by a previous gget diamond call are reused, otherwise the database is (re)created from the reference.\n"
+            "Default: None -> Database is created for this alignment (see '--cache')."
         ),
     )
     parser_diamond.add_argument(
@@ -474,6 +486,29 @@ def main():
             "Default: None -> Uses DIAMOND binary installed with gget."
         ),
     )
+    parser_diamond.add_argument(
+        "-pq",
+        "--parquet",
+        default=False,
+        action="store_true",
+        required=False,
+        help=(
+            "Stream results from DIAMOND into 'out'/gget_diamond_results.parquet using compact data types (requires pyarrow and '--out').\n"
+            "Recommended for large numbers of alignments."
+        ),
+    )
+    parser_diamond.add_argument(
+        "-c",
+        "--cache",
+        default=False,
+        action="store_true",
+        required=False,
+        help=(
+            "Keep the DIAMOND database in the gget cache directory (GGET_CACHE_DIR, default: ~/.cache/gget) and reuse it for the same reference.\n"
+            "Cached databases are deleted using 'gget cache clear'.\n"
+            "Default: The temporary database is deleted after alignment or saved in 'out' if 'out' is provided."
+        ),
+    )
     parser_diamond.add_argument(
         "-q",
         "--quiet",
@@ -550,6 +585,14 @@ def main():
         required=False,
         help="Also returns PDB IDs (might increase run time).",
     )
+    parser_info.add_argument(
+        "-mw",
+        "--max_workers",
+        type=int,
+        default=5,
+        required=False,
+        help="Maximum number of concurrent requests to UniProt, NCBI and PDB.",
+    )
     parser_info.add_argument(
         "-q",
         "--quiet",
@@ -637,6 +680,17 @@ def main():
         required=False,
         help="Returns sequences of all known transcripts (default: False). (Only for gene IDs.)",
     )
+    parser_seq.add_argument(
+        "-idm",
+        "--id_mapping",
+        default=False,
+        action="store_true",
+        required=False,
+        help=(
+            "Fetches amino acid sequences using UniProt ID mapping jobs instead of one UniProt search per ID.\n"
+            "Recommended for large numbers of IDs. (Only applies when --translate is used.)"
+        ),
+    )
     parser_seq.add_argument(
         "-o",
         "--out",
@@ -1204,6 +1258,52 @@ def main():
         help="Path to folder where downloaded files are saved (currently only applies when module='elm'). Default: Files are saved inside the gget installation folder.",
     )
 
+    ## gget cache subparser
+    cache_desc = "Show statistics of or clear the persistent cache of server responses."
+    parser_cache = parent_subparsers.add_parser(
+        "cache",
+        parents=[parent],
+        description=cache_desc,
+        help=cache_desc,
+        add_help=True,
+        formatter_class=CustomHelpFormatter,
+    )
+    # cache parser arguments
+    parser_cache.add_argument(
+        "action",
+        type=str,
+        choices=["stats", "clear"],
+        help=(
+            "'stats': Print cache statistics.\n"
+            "'clear': Delete cached responses and cached DIAMOND databases.\n"
+            "Caching is enabled by setting the GGET_CACHE_DIR environment variable to the cache directory."
+        ),
+    )
+    parser_cache.add_argument(
+        "-d",
+        "--cache_dir",
+        type=str,
+        default=None,
+        required=False,
+        help="Path to the cache directory. Default: GGET_CACHE_DIR environment variable if set, else ~/.cache/gget.",
+    )
+    parser_cache.add_argument(
+        "-e",
+        "--expired_only",
+        default=False,
+        action="store_true",
+        required=False,
+        help="Only delete expired responses (only applies to action 'clear'). Cached DIAMOND databases are kept.",
+    )
+    parser_cache.add_argument(
+        "-q",
+        "--quiet",
+        default=True,
+        action="store_false",
+        required=False,
+        help="Does not print progress information.",
+    )
+
     ## gget alphafold subparser
     alphafold_desc = "Predicts the structure of a protein using a simplified version of AlphaFold v2.3.0 (https://doi.org/10.1038/s41586-021-03819-2)."
     parser_alphafold = parent_subparsers.add_parser(
@@ -1814,6 +1914,30 @@ def main():
         required=False,
         help="Do NOT create a modified version of the database for use with gget mutate (only for use with --download_cosmic).",
     )
+    parser_cosmic.add_argument(
+        "-pq",
+        "--parquet",
+        default=False,
+        action="store_true",
+        required=False,
+        help=(
+            "Also convert the database into a compressed Parquet file with typed columns, which can be queried locally using --local_db\n"
+            "(only for use with --download_cosmic; requires pyarrow)."
+        ),
+    )
+    parser_cosmic.add_argument(
+        "-ldb",
+        "--local_db",
+        default=None,
+        type=str,
+        required=False,
+        help=(
+            "Path to a COSMIC database downloaded using --download_cosmic (TSV file or Parquet file created using --parquet),\n"
+            "e.g. path/to/CancerMutationCensus_AllData_v99_GRCh37.tsv.\n"
+            "Searches the local database instead of the COSMIC server (without network access; only entities 'mutations' and 'samples' are supported).\n"
+            "An index is built on the first search and saved next to the database."
+        ),
+    )
     parser_cosmic.add_argument(
         "-o",
         "--out",
@@ -1931,6 +2055,36 @@ def main():
             "The identifiers (following the '>') of the mutated sequences in the output fasta will be '>[seq_ID]_[mut_ID]'."
         ),
     )
+    parser_mutate.add_argument(
+        "-t",
+        "--threads",
+        default=1,
+        type=int,
+        required=False,
+        help="Number of processes used to mutate sequences (mutations are distributed across processes by sequence ID).",
+    )
+    parser_mutate.add_argument(
+        "-cs",
+        "--chunksize",
+        default=None,
+        type=int,
+        required=False,
+        help=(
+            "Number of mutations read and mutated at a time (keeps memory bounded for very large mutation tables).\n"
+            "Default: None -> all mutations at once."
+        ),
+    )
+    parser_mutate.add_argument(
+        "-fi",
+        "--fasta_index",
+        default=False,
+        action="store_true",
+        required=False,
+        help=(
+            "Read only the sequences referenced in the mutations file from the sequences FASTA file using a faidx-style index\n"
+            "(built once and saved next to the FASTA file as [sequences].fai) instead of loading the entire file."
+        ),
+    )
     parser_mutate.add_argument(
         "-q",
         "--quiet",
@@ -1988,6 +2142,7 @@ def main():
         "diamond": parser_diamond,
         "cosmic": parser_cosmic,
         "mutate": parser_mutate,
+        "cache": parser_cache,
     }
 
     if len(sys.argv) == 2:
@@ -2175,6 +2330,9 @@ def main():
             mut_id_column=args.mut_id_column,
             seq_id_column=args.seq_id_column,
             out=args.out,
+            threads=args.threads,
+            chunksize=args.chunksize,
+            fasta_index=args.fasta_index,
             verbose=args.quiet,
         )
 
@@ -2196,6 +2354,8 @@ def main():
             cosmic_version=args.cosmic_version,
             grch_version=args.grch_version,
             gget_mutate=args.gget_mutate,
+            parquet=args.parquet,
+            local_db=args.local_db,
             out=args.out,
             verbose=args.quiet,
         )
@@ -2296,7 +2456,29 @@ def main():
         muscle(fasta=args.fasta, super5=args.super5, out=args.out, verbose=args.quiet)
 
     ## elm return
-    if args.command == "elm":
+    if args.command == "elm" and args.batch:
+        results = elm_batch(
+            sequences=args.sequence,
+            sensitivity=args.sensitivity,
+            threads=args.threads,
+            diamond_binary=args.diamond_binary,
+            expand=args.expand,
+            verbose=args.quiet,
+            json=args.csv,
+            out=args.out,
+        )
+        # Print results if no directory specified
+        if not args.out and not args.csv:
+            # Print ortholog results of all queries followed by regex results of all queries
+            for result_idx in range(2):
+                for query_idx, (query_id, query_results) in enumerate(results.items()):
+                    df = query_results[result_idx]
+                    df.insert(0, "query_id", query_id)
+                    df.to_csv(sys.stdout, index=False, header=query_idx == 0)
+        if not args.out and args.csv:
+            print(json.dumps(results, ensure_ascii=False, indent=4))
+
+    elif args.command == "elm":
         ortho, regex = elm(
             sequence=args.sequence,
             uniprot=args.uniprot,
@@ -2325,6 +2507,8 @@ def main():
             sensitivity=args.sensitivity,
             threads=args.threads,
             diamond_binary=args.diamond_binary,
+            cache=args.cache,
+            parquet=args.parquet,
             verbose=args.quiet,
             json=args.csv,
             out=args.out,
@@ -2672,6 +2856,7 @@ def main():
             expand=args.expand,
             json=args.csv,
             verbose=args.quiet,
+            max_workers=args.max_workers,
         )
 
         # Check if the function returned something
@@ -2732,6 +2917,7 @@ def main():
             translate=args.translate,
             seqtype=args.seqtype,
             isoforms=args.isoforms,
+            id_mapping=args.id_mapping,
             transcribe=args.transcribe,
             verbose=args.quiet,
         )
@@ -2741,10 +2927,7 @@ def main():
             directory = "/".join(args.out.split("/")[:-1])
             if directory != "":
                 os.makedirs(directory, exist_ok=True)
-            file = open(args.out, "w")
-            for element in seq_results:
-                file.write(element + "\n")
-            file.close()
+            write_fasta(args.out, zip(seq_results[::2], seq_results[1::2]))
 
         # Print results if no directory specified
         else:
@@ -2756,6 +2939,17 @@ def main():
     if args.command == "setup":
         setup(args.module, verbose=args.quiet, out=args.out)
 
+    ## cache return
+    if args.command == "cache":
+        cache_results = cache(
+            args.action,
+            cache_dir=args.cache_dir,
+            expired_only=args.expired_only,
+            verbose=args.quiet,
+        )
+        if args.action == "stats":
+            print(json.dumps(cache_results, ensure_ascii=False, indent=4))
+
     ## alphafold return
     if args.command == "alphafold":
         if args.out:
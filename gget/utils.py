@@ -1,11 +1,21 @@
 from bs4 import BeautifulSoup
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 
-# from requests.adapters import HTTPAdapter, Retry
-# import time
+import time
 import re
 import os
+import io
 import uuid
+import json
+import hashlib
+import functools
+import sqlite3
+import threading
+import mmap
+import gzip
 import pandas as pd
 import numpy as np
 from IPython.display import display, HTML
@@ -21,6 +31,18 @@ from .constants import (
     ENSEMBL_FTP_URL_NV,
     ENS_TO_PDB_API,
     COSMIC_RELEASE_URL,
+    ENSEMBL_REST_MAX_POST_IDS,
+    GGET_CACHE_DIR,
+    GGET_CACHE_ENSEMBL_RELEASE_URLS,
+    GGET_CACHE_MAX_SIZE,
+    GGET_CACHE_TTLS,
+    RETRY_POST_URLS,
+    UNIPROT_IDMAPPING_API,
+    UNIPROT_IDMAPPING_MAX_IDS,
+    UNIPROT_IDMAPPING_POLLING_INTERVAL,
+    FASTA_BUFFER_SIZE,
+    DOWNLOAD_MAX_RESUMES,
+    DOWNLOAD_TIMEOUT,
 )
 
 
@@ -55,6 +77,570 @@ def set_up_logger():
 
 logger = set_up_logger()
 
+# Process-wide HTTP session shared by all gget modules (see get_session)
+session = None
+# Persistent response cache (None = caching disabled, see enable_cache)
+response_cache = None
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of HTTP responses stored in an SQLite database.
+
+    Responses are keyed on the request method, URL and body. The time-to-live of a
+    response depends on its URL (see GGET_CACHE_TTLS in constants.py).
+    When the total size of the cached responses exceeds max_size (in MB),
+    the least recently used responses are evicted.
+    """
+
+    def __init__(self, cache_dir=GGET_CACHE_DIR, max_size=GGET_CACHE_MAX_SIZE, ttls=None):
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        self.max_size = int(max_size * 1024 * 1024)
+        self.ttls = [
+            (re.compile(pattern), ttl)
+            for pattern, ttl in (GGET_CACHE_TTLS if ttls is None else ttls)
+        ]
+        # Hits and misses of this process
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.db_path = os.path.join(self.cache_dir, "gget_cache.sqlite")
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            self.db_path, timeout=30, check_same_thread=False
+        )
+        with self.lock, self.connection:
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    url TEXT,
+                    status INTEGER,
+                    headers TEXT,
+                    content BLOB,
+                    size INTEGER,
+                    created REAL,
+                    accessed REAL,
+                    expires REAL
+                )
+                """
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed)"
+            )
+
+    def get_ttl(self, url):
+        """
+        Returns (True, TTL in seconds or None) if the URL can be cached, else (False, None).
+        """
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return True, ttl
+        return False, None
+
+    @staticmethod
+    def make_key(method, url, body=None, release=None):
+        """
+        Returns cache key for a request (and the Ensembl release the response belongs to, if any).
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        prefix = b"" if release is None else f"release-{release} ".encode("utf-8")
+        return hashlib.sha256(
+            prefix
+            + method.encode("utf-8")
+            + b" "
+            + url.encode("utf-8")
+            + b"\n"
+            + (body or b"")
+        ).hexdigest()
+
+    def get(self, key):
+        """
+        Returns (status, headers, content) of a cached response or None if the key is not
+        cached or the cached response expired.
+        """
+        now = time.time()
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT status, headers, content, expires FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None or (row[3] is not None and row[3] < now):
+                self.misses += 1
+                return None
+
+            self.connection.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+
+        return row[0], json.loads(row[1]), row[2]
+
+    def set(self, key, url, status, headers, content, ttl=None):
+        """
+        Save a response and evict the least recently used responses if the cache is full.
+        """
+        now = time.time()
+        expires = None if ttl is None else now + ttl
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    url,
+                    status,
+                    json.dumps(headers),
+                    sqlite3.Binary(content),
+                    len(content),
+                    now,
+                    now,
+                    expires,
+                ),
+            )
+            self.evict()
+
+    def evict(self):
+        """
+        Delete expired responses and least recently used responses until the cache
+        is smaller than max_size. Must be called while holding the lock.
+        """
+        self.connection.execute(
+            "DELETE FROM responses WHERE expires IS NOT NULL AND expires < ?",
+            (time.time(),),
+        )
+        total_size = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+        if total_size > self.max_size:
+            to_delete = []
+            for key, size in self.connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed ASC"
+            ):
+                to_delete.append((key,))
+                total_size -= size
+                if total_size <= self.max_size:
+                    break
+            self.connection.executemany(
+                "DELETE FROM responses WHERE key = ?", to_delete
+            )
+
+    def stats(self):
+        """
+        Returns dictionary with cache statistics.
+        """
+        now = time.time()
+        with self.lock:
+            n_entries, total_size, n_expired = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), "
+                "COALESCE(SUM(expires IS NOT NULL AND expires < ?), 0) FROM responses",
+                (now,),
+            ).fetchone()
+
+        return {
+            "cache_dir": self.cache_dir,
+            "entries": n_entries,
+            "expired_entries": n_expired,
+            "size_mb": round(total_size / 1024 / 1024, 3),
+            "max_size_mb": round(self.max_size / 1024 / 1024, 3),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self, expired_only=False):
+        """
+        Delete all (or only expired) cached responses.
+
+        Returns number of deleted responses.
+        """
+        with self.lock, self.connection:
+            if expired_only:
+                cursor = self.connection.execute(
+                    "DELETE FROM responses WHERE expires IS NOT NULL AND expires < ?",
+                    (time.time(),),
+                )
+            else:
+                cursor = self.connection.execute("DELETE FROM responses")
+        n_deleted = cursor.rowcount
+        with self.lock:
+            self.connection.execute("VACUUM")
+        return n_deleted
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    HTTP adapter that serves responses from the persistent response cache (if enabled)
+    and saves successful responses to it.
+    """
+
+    def send(self, request, **kwargs):
+        cache = response_cache
+        if cache is None or request.method not in ("GET", "POST"):
+            return super().send(request, **kwargs)
+
+        cacheable, ttl = cache.get_ttl(request.url)
+        if not cacheable:
+            return super().send(request, **kwargs)
+
+        release = None
+        if re.search(GGET_CACHE_ENSEMBL_RELEASE_URLS, request.url):
+            try:
+                # Not memoized: the VERSION file is served from this cache and refetched when
+                # the cached response expires, so new releases are picked up by long-running processes
+                release = find_latest_ens_rel.__wrapped__()
+            except (RuntimeError, requests.exceptions.RequestException):
+                # Do not cache responses that cannot be assigned to a release
+                return super().send(request, **kwargs)
+
+        key = cache.make_key(request.method, request.url, request.body, release)
+        cached = cache.get(key)
+        if cached is not None:
+            status, headers, content = cached
+            response = requests.Response()
+            response.status_code = status
+            response.reason = "OK"
+            response.headers = requests.structures.CaseInsensitiveDict(headers)
+            response._content = content
+            response.url = request.url
+            response.request = request
+            response.encoding = requests.utils.get_encoding_from_headers(
+                response.headers
+            )
+            return response
+
+        response = super().send(request, **kwargs)
+        if response.status_code == 200:
+            # The content is saved decoded, so the encoding headers no longer apply
+            headers = {
+                k: v
+                for k, v in response.headers.items()
+                if k.lower()
+                not in ("content-encoding", "transfer-encoding", "content-length")
+            }
+            cache.set(
+                key, request.url, response.status_code, headers, response.content, ttl
+            )
+        return response
+
+
+def enable_cache(cache_dir=None, max_size=GGET_CACHE_MAX_SIZE):
+    """
+    Enable the persistent response cache for all requests made through the
+    process-wide HTTP session.
+
+    Args:
+    - cache_dir     Path to the cache directory.
+                    Default: GGET_CACHE_DIR environment variable if set, else ~/.cache/gget.
+    - max_size      Maximum size of the cache in MB. Default: 1024.
+
+    Returns ResponseCache object.
+    """
+    global response_cache
+    if cache_dir is None:
+        cache_dir = os.environ.get("GGET_CACHE_DIR", GGET_CACHE_DIR)
+    disable_cache()
+    response_cache = ResponseCache(cache_dir=cache_dir, max_size=max_size)
+    return response_cache
+
+
+def disable_cache():
+    """
+    Disable the persistent response cache (cached responses are kept on disk).
+    """
+    global response_cache
+    if response_cache is not None:
+        response_cache.close()
+    response_cache = None
+
+
+def create_session(pool_size=10, max_retries=5, backoff_factor=0.5):
+    """
+    Create a requests session with a pooled keep-alive connection adapter.
+    Requests that fail with HTTP status 429 (rate limit exceeded) or a server error
+    are retried with exponential backoff, respecting the 'Retry-After' header
+    returned by the server (e.g. by the Ensembl REST API).
+
+    Args:
+    - pool_size         Maximum number of connections kept alive per host.
+    - max_retries       Maximum number of retries per request.
+    - backoff_factor    Backoff factor (in seconds) between retries.
+
+    Returns requests.Session object.
+    """
+    retries = Retry(
+        total=max_retries,
+        # Retry connection and read errors at most twice (e.g. to fail fast when offline)
+        connect=min(2, max_retries),
+        read=min(2, max_retries),
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        # Only idempotent methods (not POST) are retried by default
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        # Return the last response instead of raising an error, so the status code can be handled downstream
+        raise_on_status=False,
+    )
+
+    new_session = requests.Session()
+    mount_adapters(new_session, pool_size, retries)
+
+    return new_session
+
+
+def mount_adapters(session, pool_size, retries):
+    """
+    Mount pooled connection adapters using the specified retry settings on a session.
+    POST requests are only retried for the read-only endpoints in RETRY_POST_URLS.
+
+    Args:
+    - session       requests.Session object.
+    - pool_size     Maximum number of connections kept alive per host.
+    - retries       urllib3 Retry object for idempotent requests.
+    """
+    adapter = CachingAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    post_adapter = CachingAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retries.new(
+            allowed_methods=frozenset(retries.allowed_methods) | {"POST"}
+        ),
+    )
+    for url in RETRY_POST_URLS:
+        session.mount(url, post_adapter)
+
+
+def get_session():
+    """
+    Returns the process-wide HTTP session (created on first use).
+    """
+    global session
+    if session is None:
+        session = create_session()
+        # Opt in to the persistent response cache using the GGET_CACHE_DIR environment variable
+        if response_cache is None and os.environ.get("GGET_CACHE_DIR"):
+            enable_cache()
+    return session
+
+
+def configure_session(pool_size=10, max_retries=5, backoff_factor=0.5):
+    """
+    Replace the process-wide HTTP session with a new session using the specified settings.
+
+    Args:
+    - pool_size         Maximum number of connections kept alive per host. Default: 10.
+    - max_retries       Maximum number of retries per request. Default: 5.
+    - backoff_factor    Backoff factor (in seconds) between retries. Default: 0.5.
+
+    Returns the new requests.Session object.
+    """
+    global session
+    old_session = session
+    session = create_session(
+        pool_size=pool_size, max_retries=max_retries, backoff_factor=backoff_factor
+    )
+    if old_session is not None:
+        old_session.close()
+    return session
+
+
+def resize_session_pool(pool_size):
+    """
+    Resize the connection pool of the process-wide HTTP session, keeping its retry settings.
+    Requests already running on the previous connection pool are allowed to finish.
+
+    Args:
+    - pool_size     Maximum number of connections kept alive per host.
+
+    Returns the requests.Session object.
+    """
+    current_session = get_session()
+    retries = current_session.get_adapter("https://").max_retries
+    mount_adapters(current_session, pool_size, retries)
+    return current_session
+
+
+class ResumableDownload(io.RawIOBase):
+    """
+    Read-only file-like object streaming the body of an HTTP GET request (using the process-wide session).
+
+    If the connection breaks, the download is resumed from the current position using an
+    HTTP Range request (up to max_resumes times), so readers of the stream do not notice.
+    The number of bytes read and the MD5/SHA-256 checksums of the body are computed on the fly (see verify).
+
+    Usage:
+        with ResumableDownload(url) as stream:
+            with tarfile.open(fileobj=stream, mode="r|*") as tar:
+                ...
+            sha256 = stream.verify()
+    """
+
+    def __init__(self, url, headers=None, max_resumes=DOWNLOAD_MAX_RESUMES):
+        self.url = url
+        self.headers = dict(headers or {})
+        self.max_resumes = max_resumes
+        self.resumes = 0
+        self.position = 0
+        self.md5 = hashlib.md5()
+        self.sha256 = hashlib.sha256()
+        self.etag = None
+        self.response = None
+
+        self.response = self.open()
+        content_length = self.response.headers.get("Content-Length")
+        self.total_size = int(content_length) if content_length else None
+        self.etag = self.response.headers.get("ETag")
+
+    def open(self):
+        headers = dict(self.headers)
+        if self.position > 0:
+            headers["Range"] = f"bytes={self.position}-"
+            # Only resume if the file on the server did not change
+            if self.etag:
+                headers["If-Range"] = self.etag
+
+        response = get_session().get(
+            self.url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+        )
+
+        if not response.ok:
+            response.close()
+            raise RuntimeError(
+                f"Download from {self.url.split('?')[0]} failed with status code {response.status_code}."
+            )
+        if self.position > 0 and response.status_code != 206:
+            response.close()
+            raise RuntimeError(
+                "The download was interrupted and the server does not support resuming it. Please try again."
+            )
+
+        return response
+
+    def resume(self, error):
+        self.response.close()
+        while True:
+            if self.resumes >= self.max_resumes:
+                raise RuntimeError(
+                    f"Download from {self.url.split('?')[0]} failed after {self.resumes} attempts to resume it: {error}"
+                )
+            self.resumes += 1
+            logger.warning(
+                f"Connection lost after {self.position} bytes ({error}). Resuming download..."
+            )
+            time.sleep(min(2 ** (self.resumes - 1), 30))
+
+            try:
+                self.response = self.open()
+                return
+            except requests.exceptions.RequestException as e:
+                error = e
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            try:
+                data = self.response.raw.read(len(buffer))
+            except (Urllib3HTTPError, requests.exceptions.RequestException) as e:
+                self.resume(e)
+                continue
+
+            # The connection was closed before the complete body was received
+            if (
+                not data
+                and len(buffer) > 0
+                and self.total_size is not None
+                and self.position < self.total_size
+            ):
+                self.resume(
+                    f"received {self.position} of {self.total_size} bytes"
+                )
+                continue
+
+            n_bytes = len(data)
+            buffer[:n_bytes] = data
+            self.md5.update(data)
+            self.sha256.update(data)
+            self.position += n_bytes
+            return n_bytes
+
+    def verify(self, md5=None, sha256=None):
+        """
+        Check that the complete body was received and that its checksums match the expected checksums.
+        If md5 is not provided, the ETag returned by the server is used if it is an MD5 checksum.
+
+        Returns the SHA-256 checksum of the body.
+        """
+        if self.total_size is not None and self.position != self.total_size:
+            raise RuntimeError(
+                f"Incomplete download: received {self.position} of {self.total_size} bytes."
+            )
+
+        if md5 is None and self.etag:
+            etag = self.etag.strip('"')
+            if re.fullmatch(r"[0-9a-f]{32}", etag):
+                md5 = etag
+
+        if md5 is not None and self.md5.hexdigest() != md5.lower():
+            raise RuntimeError(
+                f"MD5 checksum of the download ({self.md5.hexdigest()}) does not match the expected checksum ({md5})."
+            )
+        if sha256 is not None and self.sha256.hexdigest() != sha256.lower():
+            raise RuntimeError(
+                f"SHA-256 checksum of the download ({self.sha256.hexdigest()}) does not match the expected checksum ({sha256})."
+            )
+
+        return self.sha256.hexdigest()
+
+    def close(self):
+        if not self.closed and self.response is not None:
+            self.response.close()
+        super().close()
+
+
+class ServiceLimiter:
+    """
+    Context manager limiting the number of concurrent requests and the
+    request rate to a web service when it is queried from multiple threads.
+
+    Args:
+    - max_concurrent    Maximum number of concurrent requests.
+    - max_per_second    Maximum number of requests started per second.
+    """
+
+    def __init__(self, max_concurrent, max_per_second):
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.interval = 1 / max_per_second
+        self.lock = threading.Lock()
+        self.next_slot = 0
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        # Reserve the next free time slot and wait for it
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.semaphore.release()
+        return False
+
 
 def flatten(xss):
     """
@@ -64,7 +650,7 @@ def flatten(xss):
 
 
 def get_latest_cosmic():
-    html = requests.get(COSMIC_RELEASE_URL)
+    html = get_session().get(COSMIC_RELEASE_URL)
     if html.status_code != 200:
         raise RuntimeError(
             f"The COSMIC server returned error status code {html.status_code}. Please try again."
@@ -74,47 +660,347 @@ def get_latest_cosmic():
     return int(soup.find("div", class_="news").get("id").split("v")[-1])
 
 
-def read_fasta(fasta):
+def open_fasta(fasta, mode="rt"):
     """
+    Open a FASTA file for reading or writing as text.
+    Gzip-compressed files (ending in '.gz', or starting with the gzip magic number when reading)
+    are decompressed/compressed transparently.
+
     Args:
     - fasta     (str) Path to fasta file.
+    - mode      'rt' (read), 'wt' (write) or 'at' (append). Default: 'rt'.
+
+    Returns a text file object.
+    """
+    if mode.startswith("r"):
+        with open(fasta, "rb") as fasta_file:
+            is_gzip = fasta_file.read(2) == b"\x1f\x8b"
+    else:
+        is_gzip = fasta.endswith(".gz")
+
+    if is_gzip:
+        return gzip.open(fasta, mode)
+    return open(fasta, mode)
+
+
+def iter_fasta(fasta):
+    """
+    Read the records of a (optionally gzip-compressed) FASTA file one at a time.
+
+    Args:
+    - fasta     (str) Path to fasta file.
+
+    Yields (title, sequence) tuples. Titles are the header lines without the '>' character.
+    """
+    title = None
+    seq_lines = []
+    with open_fasta(fasta) as fasta_file:
+        for line in fasta_file:
+            if line[:1] == ">":
+                if title is not None:
+                    if not seq_lines:
+                        raise ValueError(
+                            "FASTA file contains two lines starting with '>' in a row -> missing sequence line. "
+                        )
+                    # Join the lines of multi-line sequences once
+                    yield title, "".join(seq_lines)
+
+                title = line.strip().replace(">", "")
+                seq_lines = []
+
+            elif title is None:
+                raise ValueError("Expected FASTA file to start with a '>' character. ")
+
+            else:
+                seq_lines.append(line.strip())
+
+    if title is not None:
+        if not seq_lines:
+            raise ValueError(
+                "FASTA file ends with a line starting with '>' -> missing sequence line. "
+            )
+        yield title, "".join(seq_lines)
+
+
+def read_fasta(fasta):
+    """
+    Args:
+    - fasta     (str) Path to fasta file (optionally gzip-compressed).
 
     Returns titles and seqs from fasta file as two list objects.
     """
     titles = []
     seqs = []
-    title_last = False
-    new_seq = False
-    with open(fasta) as fasta_file:
-        for i, line in enumerate(fasta_file):
-            if i == 0 and line[0] != ">":
-                raise ValueError("Expected FASTA file to start with a '>' character. ")
-            elif line[0] == ">":
-                if title_last:
-                    raise ValueError(
-                        "FASTA file contains two lines starting with '>' in a row -> missing sequence line. "
-                    )
+    for title, seq in iter_fasta(fasta):
+        titles.append(title)
+        seqs.append(seq)
+
+    return titles, seqs
+
+
+class FastaWriter:
+    """
+    Buffered FASTA writer.
+
+    Records are collected in memory and written in blocks of about buffer_size characters.
+    Sequences are wrapped at line_width characters per line (not wrapped if line_width=None).
+
+    Usage:
+        with FastaWriter("seqs.fa", line_width=60) as writer:
+            writer.write("seq1 description", "ACTG...")
+    """
+
+    def __init__(self, fasta, line_width=None, buffer_size=FASTA_BUFFER_SIZE):
+        """
+        Args:
+        - fasta         Path to the output fasta file (gzip-compressed if it ends in '.gz')
+                        or a writable text file object (which is not closed by the writer).
+        - line_width    Maximum number of sequence characters per line. Default: None (no line wrapping).
+        - buffer_size   Number of characters collected before they are written to the file. Default: 1 MB.
+        """
+        if line_width is not None and line_width < 1:
+            raise ValueError(
+                f"'line_width' argument specified as {line_width}. Expected an integer >= 1 or None."
+            )
+
+        if isinstance(fasta, str):
+            self.file = open_fasta(fasta, "wt")
+            self.close_file = True
+        else:
+            self.file = fasta
+            self.close_file = False
+
+        self.line_width = line_width
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.buffered = 0
+
+    def write(self, title, seq):
+        """
+        Add one record. 'title' is the header line (with or without the leading '>').
+        """
+        if self.line_width is not None and len(seq) > self.line_width:
+            seq = "\n".join(
+                seq[i : i + self.line_width]
+                for i in range(0, len(seq), self.line_width)
+            )
+
+        record = (title if title[:1] == ">" else ">" + title) + "\n" + seq + "\n"
+        self.buffer.append(record)
+        self.buffered += len(record)
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def write_records(self, records):
+        """
+        Add all (title, sequence) records of an iterable.
+        """
+        for title, seq in records:
+            self.write(title, seq)
+
+    def flush(self):
+        if self.buffer:
+            self.file.write("".join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+
+    def close(self):
+        self.flush()
+        if self.close_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def write_fasta(fasta, records, line_width=None):
+    """
+    Write (title, sequence) records to a FASTA file.
 
-                if new_seq:
-                    # Append last recorded sequence
-                    seqs.append(new_seq)
+    Args:
+    - fasta         Path to the output fasta file (gzip-compressed if it ends in '.gz') or a writable text file object.
+    - records       Iterable of (title, sequence) tuples. Titles are written with a leading '>'.
+    - line_width    Maximum number of sequence characters per line. Default: None (no line wrapping).
+    """
+    with FastaWriter(fasta, line_width=line_width) as writer:
+        writer.write_records(records)
+
+
+def build_fasta_index(fasta):
+    """
+    Build a faidx-style index of a (plain text) FASTA file.
 
-                # Append title line to titles list
-                titles.append(line.strip().replace(">", ""))
-                title_last = True
+    Args:
+    - fasta     (str) Path to fasta file.
+
+    Returns a dictionary mapping each sequence name (the title until the first whitespace)
+    to a tuple of (sequence length, byte offset of the sequence, bases per line, bytes per line).
+    If a name occurs more than once, the last sequence with that name is kept.
+    """
+    entries = {}
+    name = None
+    position = 0
+
+    with open(fasta, "rb") as fasta_file:
+        for line in fasta_file:
+            line_length = len(line)
+
+            if line[:1] == b">":
+                if name is not None:
+                    entries[name] = (length, offset, line_bases, line_width)
+
+                title = line[1:].split(None, 1)
+                name = title[0].decode() if title else ""
+                offset = position + line_length
+                length = 0
+                line_bases = line_width = 0
+                # Whether a short (last) line or a blank line was seen for this sequence
+                short_line = False
+                blank_line = False
 
             else:
-                if title_last:
-                    # Start recording new sequence if title was last
-                    new_seq = line.strip()
+                bases = len(line.rstrip(b"\r\n"))
+
+                if name is None:
+                    if bases > 0:
+                        raise ValueError(
+                            "Expected FASTA file to start with a '>' character. "
+                        )
+
+                elif bases == 0:
+                    blank_line = True
+
                 else:
-                    new_seq = new_seq + line.strip()
-                title_last = False
+                    if short_line or blank_line:
+                        raise ValueError(
+                            f"Different line lengths in sequence '{name}'. "
+                            "Indexing requires all sequence lines (except the last) to be of the same length."
+                        )
 
-        # Append last sequence
-        seqs.append(new_seq)
+                    if line_bases == 0:
+                        line_bases, line_width = bases, line_length
+                    elif bases > line_bases or (
+                        line.endswith(b"\n")
+                        and line_length - bases != line_width - line_bases
+                    ):
+                        raise ValueError(
+                            f"Different line lengths in sequence '{name}'. "
+                            "Indexing requires all sequence lines (except the last) to be of the same length."
+                        )
+                    elif bases < line_bases:
+                        short_line = True
 
-    return titles, seqs
+                    length += bases
+
+            position += line_length
+
+    if name is None:
+        raise ValueError("Expected FASTA file to start with a '>' character. ")
+
+    entries[name] = (length, offset, line_bases, line_width)
+
+    return entries
+
+
+class FastaIndex:
+    """
+    Random access to the sequences of a (plain text) FASTA file using a faidx-style index.
+
+    The index ('[fasta].fai', same format as 'samtools faidx') is built once and cached next to
+    the FASTA file. It is rebuilt when the FASTA file is newer than the index.
+    Sequences are read from a memory map of the FASTA file, so only the requested sequences are read.
+
+    Usage:
+        with FastaIndex("transcriptome.fa") as fasta_index:
+            seq = fasta_index.fetch("ENST00000335137.4")
+    """
+
+    def __init__(self, fasta, index_path=None, verbose=False):
+        if fasta.endswith(".gz"):
+            raise ValueError(
+                "Indexed access is only supported for uncompressed FASTA files."
+            )
+
+        self.fasta = fasta
+        self.index_path = fasta + ".fai" if index_path is None else index_path
+
+        if os.path.exists(self.index_path) and os.path.getmtime(
+            self.index_path
+        ) >= os.path.getmtime(fasta):
+            self.entries = self.read_index(self.index_path)
+        else:
+            if verbose:
+                logger.info(f"Indexing FASTA file {fasta}...")
+            self.entries = build_fasta_index(fasta)
+            try:
+                self.write_index(self.index_path)
+            except OSError as e:
+                # The index is still used for this call
+                logger.warning(
+                    f"FASTA index could not be saved to {self.index_path}: {e}"
+                )
+
+        self.file = open(fasta, "rb")
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def read_index(index_path):
+        entries = {}
+        with open(index_path) as index_file:
+            for line in index_file:
+                fields = line.rstrip("\n").split("\t")
+                entries[fields[0]] = tuple(int(field) for field in fields[1:5])
+        return entries
+
+    def write_index(self, index_path):
+        # Write to a temporary file first so a partially written index is never used
+        tmp_path = f"{index_path}.{uuid.uuid4()}.tmp"
+        try:
+            with open(tmp_path, "w") as index_file:
+                for name, entry in self.entries.items():
+                    index_file.write("\t".join([name] + [str(x) for x in entry]) + "\n")
+            os.replace(tmp_path, index_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @property
+    def names(self):
+        return list(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def fetch(self, name):
+        """
+        Return the sequence with the given name (title until the first whitespace) as a string.
+        """
+        length, offset, line_bases, line_width = self.entries[name]
+        if length == 0:
+            return ""
+
+        full_lines, remainder = divmod(length, line_bases)
+        end = offset + full_lines * line_width + remainder
+
+        return self.mmap[offset:end].translate(None, b"\r\n").decode()
+
+    def close(self):
+        self.mmap.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
 
 def n_colors(nucleotide):
@@ -231,13 +1117,201 @@ def aa_colors(amino_acid):
     return f"\033[38;5;{textcolor}m\033[48;5;{bkg_color}m{amino_acid}\033[0;0m"
 
 
-def get_uniprot_seqs(server, ensembl_ids):
+def uniprot_idmapping_from_db(id_):
+    """
+    Returns the UniProt ID mapping database name ('from' argument) for an
+    Ensembl, WormBase or FlyBase ID, or None if the ID type is not recognized.
+    """
+    ensembl_match = re.match(r"^ENS[A-Z]*([GTP])\d+", id_)
+    if ensembl_match:
+        return {"G": "Ensembl", "T": "Ensembl_Transcript", "P": "Ensembl_Protein"}[
+            ensembl_match.group(1)
+        ]
+    if id_.startswith("WBGene"):
+        return "WormBase"
+    if id_.startswith("FBgn"):
+        return "FlyBase"
+    return None
+
+
+def submit_uniprot_idmapping(ids, from_db, to_db="UniProtKB"):
+    """
+    Submit an ID mapping job to the UniProt ID mapping API
+    (https://www.uniprot.org/help/id_mapping) and wait for it to finish.
+
+    Args:
+    - ids       List of IDs to map.
+    - from_db   UniProt ID mapping database name of the IDs, e.g. 'Ensembl_Transcript'.
+    - to_db     UniProt ID mapping database name to map the IDs to. Default: 'UniProtKB'.
+
+    Returns job ID.
+    """
+    r = get_session().post(
+        f"{UNIPROT_IDMAPPING_API}/run",
+        data={"from": from_db, "to": to_db, "ids": ",".join(ids)},
+    )
+    if not r.ok:
+        raise RuntimeError(
+            f"UniProt ID mapping request returned with error status code: {r.status_code}. Please double-check arguments or try again later."
+        )
+    job_id = r.json()["jobId"]
+
+    # Poll job status until the job is done
+    while True:
+        r = get_session().get(
+            f"{UNIPROT_IDMAPPING_API}/status/{job_id}", allow_redirects=False
+        )
+        if not r.ok:
+            raise RuntimeError(
+                f"UniProt ID mapping status request returned with error status code: {r.status_code}. Please try again later."
+            )
+
+        # The server redirects to the results once the job is finished
+        if r.is_redirect:
+            return job_id
+
+        status = r.json()
+        if "jobStatus" not in status or status["jobStatus"] == "FINISHED":
+            return job_id
+        if status["jobStatus"] not in ("NEW", "RUNNING"):
+            raise RuntimeError(
+                f"UniProt ID mapping job {job_id} returned status '{status['jobStatus']}'."
+            )
+
+        time.sleep(UNIPROT_IDMAPPING_POLLING_INTERVAL)
+
+
+def stream_uniprot_idmapping_results(job_id, fields):
+    """
+    Page through the UniProtKB results of a finished UniProt ID mapping job in TSV format.
+
+    Args:
+    - job_id    UniProt ID mapping job ID.
+    - fields    List of UniProtKB return fields (https://rest.uniprot.org/configure/uniprotkb/result-fields).
+
+    Yields one dictionary per result (keys: 'From' + TSV column names).
+    """
+    url = (
+        f"{UNIPROT_IDMAPPING_API}/uniprotkb/results/{job_id}"
+        f"?format=tsv&fields={','.join(fields)}&size=500"
+    )
+    while url:
+        r = get_session().get(url, stream=True)
+        if not r.ok:
+            raise RuntimeError(
+                f"UniProt ID mapping results request returned with error status code: {r.status_code}. Please try again later."
+            )
+
+        lines = r.iter_lines(decode_unicode=True)
+        header = next(lines, "").split("\t")
+        for line in lines:
+            if line:
+                yield dict(zip(header, line.split("\t")))
+
+        # Get link to next page of results
+        url = r.links.get("next", {}).get("url")
+
+
+def get_uniprot_seqs_idmapping(ensembl_ids):
+    """
+    Retrieve UniProt sequences based on Ensembl, WormBase or FlyBase identifiers
+    using one UniProt ID mapping job per ID type (instead of one UniProt search per ID).
+    If reviewed UniProt entries are found for an ID, only the reviewed entries are returned.
+
+    Args:
+    - ensembl_ids   List of Ensembl, WormBase or FlyBase IDs.
+
+    Returns data frame with UniProt ID, gene name, organism, sequence, sequence length, and query ID
+    and list of IDs for which the ID type was not recognized.
+    """
+    # Group IDs by ID mapping database (Ensembl IDs are submitted without version)
+    ids_by_db = {}
+    query_ids = {}
+    unrecognized_ids = []
+    for id_ in ensembl_ids:
+        from_db = uniprot_idmapping_from_db(id_)
+        if from_db is None:
+            unrecognized_ids.append(id_)
+            continue
+
+        submit_id = id_.split(".")[0] if id_.startswith("ENS") else id_
+        ids_by_db.setdefault(from_db, [])
+        if submit_id not in query_ids:
+            ids_by_db[from_db].append(submit_id)
+            query_ids[submit_id] = []
+        query_ids[submit_id].append(id_)
+
+    # Collect results for each submitted ID
+    results = {submit_id: [] for submit_id in query_ids}
+    fields = ["accession", "reviewed", "gene_primary", "organism_name", "sequence", "length"]
+    for from_db, ids in ids_by_db.items():
+        for i in range(0, len(ids), UNIPROT_IDMAPPING_MAX_IDS):
+            job_id = submit_uniprot_idmapping(
+                ids[i : i + UNIPROT_IDMAPPING_MAX_IDS], from_db
+            )
+            for result in stream_uniprot_idmapping_results(job_id, fields):
+                if result["From"] in results:
+                    results[result["From"]].append(result)
+
+    rows = []
+    skip_ids = set(unrecognized_ids)
+    # Each ID is only returned once (in the order it was passed)
+    for id_ in dict.fromkeys(ensembl_ids):
+        if id_ in skip_ids:
+            continue
+        submit_id = id_.split(".")[0] if id_.startswith("ENS") else id_
+        id_results = results[submit_id]
+
+        # Only keep reviewed entries if available
+        reviewed = [result for result in id_results if result["Reviewed"] == "reviewed"]
+        if len(reviewed) > 0:
+            id_results = reviewed
+        elif len(id_results) > 0:
+            logger.warning(
+                f"No reviewed UniProt results were found for ID {id_}. Returning all unreviewed results."
+            )
+        else:
+            # If no results were found, warn user
+            logger.warning(f"No UniProt sequences were found for ID {id_}.")
+
+        for result in id_results:
+            rows.append(
+                [
+                    result["Entry"],
+                    result["Organism"],
+                    result["Sequence"],
+                    int(result["Length"]),
+                    result["Gene Names (primary)"] or np.NaN,
+                    id_,
+                ]
+            )
+
+    df = pd.DataFrame(
+        rows,
+        columns=[
+            "uniprot_id",
+            "organism",
+            "sequence",
+            "sequence_length",
+            "gene_name",
+            "query",
+        ],
+    )
+
+    return df, unrecognized_ids
+
+
+def get_uniprot_seqs(server, ensembl_ids, id_mapping=False):
     """
     Retrieve UniProt sequences based on Ensemsbl, WormBase or FlyBase identifiers.
 
     Args:
     - server        Link to UniProt REST API server.
     - ensembl_ids   One or more Ensembl, WormBase or FlyBase IDs (string or list of strings).
+    - id_mapping    If True, submits all IDs as UniProt ID mapping jobs instead of
+                    submitting one UniProt search per ID (recommended for large numbers of IDs).
+                    IDs whose type is not supported by the ID mapping API are still searched individually.
+                    Default: False.
 
     Returns data frame with UniProt ID, gene name, organism, sequence, sequence length, and query ID.
     """
@@ -246,13 +1320,19 @@ def get_uniprot_seqs(server, ensembl_ids):
     if type(ensembl_ids) == str:
         ensembl_ids = [ensembl_ids]
 
-    # Initiate data frame so empty df will be returned if no matches are found
-    master_df = pd.DataFrame()
+    # Collect data frames of all IDs (empty df will be returned if no matches are found)
+    dfs = {}
 
-    for id_ in ensembl_ids:
+    search_ids = list(dict.fromkeys(ensembl_ids))
+    if id_mapping:
+        df_mapping, search_ids = get_uniprot_seqs_idmapping(search_ids)
+        for id_, df in df_mapping.groupby("query", sort=False):
+            dfs[id_] = df
+
+    for id_ in search_ids:
         # API documentation: https://www.uniprot.org/help/api_queries
         # Submit server request
-        r = requests.get(server + id_ + "+AND+reviewed:true")
+        r = get_session().get(server + id_ + "+AND+reviewed:true")
         if not r.ok:
             logger.error(
                 f"UniProt server request returned with error status code: {r.status_code}. Please double-check arguments or try again later."
@@ -263,7 +1343,7 @@ def get_uniprot_seqs(server, ensembl_ids):
         # If no reviewed results were found, try again for unreviewed results
         if not len(json["results"]) > 0:
             # Submit server request
-            r = requests.get(server + id_)
+            r = get_session().get(server + id_)
             if not r.ok:
                 logger.error(
                     f"UniProt server request returned with error status code: {r.status_code}. Please double-check arguments or try again later."
@@ -311,14 +1391,18 @@ def get_uniprot_seqs(server, ensembl_ids):
             df["gene_name"] = gene_names
             df["query"] = id_
 
-            # Append results for this ID to master data frame
-            master_df = pd.concat([master_df, df], axis=0)
+            # Save results for this ID
+            dfs[id_] = df
 
         else:
             # If no results were found, warn user and do nothing -> returns empty df
             logger.warning(f"No UniProt sequences were found for ID {id_}.")
 
-    return master_df
+    if len(dfs) == 0:
+        return pd.DataFrame()
+
+    # Concatenate once in the order of the passed IDs (instead of growing the data frame inside the loop)
+    return pd.concat([dfs[id_] for id_ in ensembl_ids if id_ in dfs], axis=0)
 
 
 def get_uniprot_info(server, ensembl_id, verbose=True):
@@ -334,7 +1418,7 @@ def get_uniprot_info(server, ensembl_id, verbose=True):
     """
     # API documentation: https://www.uniprot.org/help/api_queries
     # Submit server request for reviewed entries
-    r = requests.get(server + ensembl_id + "+AND+reviewed:true")
+    r = get_session().get(server + ensembl_id + "+AND+reviewed:true")
     if not r.ok:
         logger.error(
             f"UniProt server request returned with error status code: {r.status_code}. Please double-check arguments or try again later."
@@ -345,7 +1429,7 @@ def get_uniprot_info(server, ensembl_id, verbose=True):
     # If no reviewed entries were found, try again for unreviewed entries
     if not len(json["results"]) > 0:
         # Submit server request
-        r = requests.get(server + ensembl_id)
+        r = get_session().get(server + ensembl_id)
         if not r.ok:
             logger.error(
                 f"UniProt server request returned with error status code: {r.status_code}. Please double-check arguments or try again later."
@@ -592,7 +1676,7 @@ def get_pdb_ids(ens_id):
     https://www.ebi.ac.uk/pdbe/aggregated-api/#/SIFTS/get_ensembl_to_pdb_mappings_api_mappings_ensembl_to_pdb__gene_id__get
     """
 
-    res = requests.get(ENS_TO_PDB_API + ens_id)
+    res = get_session().get(ENS_TO_PDB_API + ens_id)
 
     if not res.ok:
         # If no PDB IDs were found, return None
@@ -634,7 +1718,7 @@ def rest_query(server, query, content_type):
     Returns server output.
     """
 
-    r = requests.get(server + query, headers={"Content-Type": content_type})
+    r = get_session().get(server + query, headers={"Content-Type": content_type})
 
     if not r.ok:
         raise RuntimeError(
@@ -648,9 +1732,59 @@ def rest_query(server, query, content_type):
         return r.text
 
 
+def rest_query_batch(
+    server, query, ids, data=None, chunk_size=ENSEMBL_REST_MAX_POST_IDS
+):
+    """
+    Function to perform a batched REST API POST query.
+    The IDs are submitted in chunks of at most chunk_size IDs per request.
+
+    Args:
+    - server        Server to query.
+    - query         Query (endpoint) that is passed to server, e.g. 'lookup/id'.
+    - ids           List of IDs to submit.
+    - data          Dictionary of additional parameters passed in the request body (e.g. {'expand': 1}).
+    - chunk_size    Maximum number of IDs submitted per request.
+
+    Returns dictionary with the submitted IDs as keys and the server output as values
+    (None for IDs that were not found).
+    """
+    results = {}
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i : i + chunk_size]
+
+        body = {"ids": chunk}
+        if data:
+            body.update(data)
+
+        r = get_session().post(
+            server + query,
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+            json=body,
+        )
+
+        if not r.ok:
+            raise RuntimeError(
+                f"{server} returned error status code {r.status_code}. "
+                "Please double-check arguments and try again.\n"
+            )
+
+        output = r.json()
+        # Some endpoints (e.g. sequence/id) return a list of results which include the submitted ID as 'query'
+        if isinstance(output, list):
+            output = {result.get("query", result.get("id")): result for result in output}
+
+        results.update(output)
+
+    return results
+
+
+@functools.lru_cache(maxsize=None)
 def find_latest_ens_rel(database=ENSEMBL_FTP_URL):
     """
     Returns the latest Ensembl release number.
+    The result is memoized for each database within a process
+    (reset using find_latest_ens_rel.cache_clear()).
 
     Args:
     - database    Link to Ensembl database.
@@ -674,7 +1808,7 @@ def find_latest_ens_rel(database=ENSEMBL_FTP_URL):
     # # Find highest release number (= latest release)
     # ENS_rel = np.array(rels).astype(int).max()
 
-    html = requests.get(database + "VERSION")
+    html = get_session().get(database + "VERSION")
     if html.status_code != 200:
         raise RuntimeError(
             f"The Ensembl FTP server returned error status code {html.status_code}. Please try again."
@@ -684,6 +1818,31 @@ def find_latest_ens_rel(database=ENSEMBL_FTP_URL):
     return ENS_rel
 
 
+@functools.lru_cache(maxsize=None)
+def get_ftp_listing(url):
+    """
+    Returns the links listed in an Ensembl FTP directory.
+    The result is memoized for each URL (which includes the database and release) within a process
+    (reset using get_ftp_listing.cache_clear()).
+
+    Args:
+    - url       Link to Ensembl FTP directory.
+
+    Returns tuple of links (href) found in the directory listing.
+    """
+    html = get_session().get(url)
+
+    # Raise error if status code not "OK" Response
+    if html.status_code != 200:
+        raise RuntimeError(
+            f"The Ensembl server returned error status code {html.status_code}. Please try again."
+        )
+
+    soup = BeautifulSoup(html.text, "html.parser")
+
+    return tuple(subsoup["href"] for subsoup in soup.body.findAll("a"))
+
+
 def search_species_options(database=ENSEMBL_FTP_URL, release=None):
     """
     Function to find all available species core databases for gget search.
@@ -708,42 +1867,19 @@ def search_species_options(database=ENSEMBL_FTP_URL, release=None):
     ## Find all available databases
     # Handle structure of invertebrate database
     if "ensemblgenomes" in database:
-        databases = []
-        kds = ["plants", "protists", "metazoa", "fungi"]
-        for kingdom in kds:
-            url = database + f"release-{ENS_rel}/{kingdom}/mysql/"
-            html = requests.get(url)
-
-            # Raise error if status code not "OK" Response
-            if html.status_code != 200:
-                raise RuntimeError(
-                    f"The Ensembl server returned error status code {html.status_code}. Please try again."
-                )
-
-            soup = BeautifulSoup(html.text, "html.parser")
-
-            # Find all available databases
-            for subsoup in soup.body.findAll("a"):
-                if "core" in subsoup["href"]:
-                    databases.append(subsoup["href"].split("/")[0])
-
+        urls = [
+            database + f"release-{ENS_rel}/{kingdom}/mysql/"
+            for kingdom in ["plants", "protists", "metazoa", "fungi"]
+        ]
     else:
-        url = database + f"release-{ENS_rel}/mysql/"
-        html = requests.get(url)
-
-        # Raise error if status code not "OK" Response
-        if html.status_code != 200:
-            raise RuntimeError(
-                f"The Ensembl server returned error status code {html.status_code}. Please try again."
-            )
+        urls = [database + f"release-{ENS_rel}/mysql/"]
 
-        soup = BeautifulSoup(html.text, "html.parser")
-
-        # Return list of all available databases
-        databases = []
-        for subsoup in soup.body.findAll("a"):
-            if "core" in subsoup["href"]:
-                databases.append(subsoup["href"].split("/")[0])
+    # Return list of all available databases
+    databases = []
+    for url in urls:
+        for href in get_ftp_listing(url):
+            if "core" in href:
+                databases.append(href.split("/")[0])
 
     return databases
 
@@ -752,20 +1888,9 @@ def find_nv_kingdom(species, release):
     kds = ["plants", "protists", "metazoa", "fungi"]
     for kingdom in kds:
         url = ENSEMBL_FTP_URL_NV + f"release-{release}/{kingdom}/fasta/"
-        html = requests.get(url)
-
-        # Raise error if status code not "OK" Response
-        if html.status_code != 200:
-            raise RuntimeError(
-                f"The Ensembl server returned error status code {html.status_code}. Please try again."
-            )
-
-        # Parse the html and generate a clean list of the available genomes
-        soup = BeautifulSoup(html.text, "html.parser")
 
-        sps = []
-        for subsoup in soup.body.findAll("a"):
-            sps.append(subsoup["href"].split("/")[0])
+        # Generate a clean list of the available genomes
+        sps = [href.split("/")[0] for href in get_ftp_listing(url)]
 
         # Return kingdom if species was found
         if species in sps[5:]:
@@ -806,20 +1931,9 @@ def ref_species_options(which, database=ENSEMBL_FTP_URL, release=None):
                 url = database + f"release-{ENS_rel}/{kingdom}/gtf/"
             elif which in ("dna", "cdna"):
                 url = database + f"release-{ENS_rel}/{kingdom}/fasta/"
-            html = requests.get(url)
 
-            # Raise error if status code not "OK" Response
-            if html.status_code != 200:
-                raise RuntimeError(
-                    f"The Ensembl server returned error status code {html.status_code}. Please try again."
-                )
-
-            # Parse the html and generate a clean list of the available genomes
-            soup = BeautifulSoup(html.text, "html.parser")
-
-            sps = []
-            for subsoup in soup.body.findAll("a"):
-                sps.append(subsoup["href"].split("/")[0])
+            # Generate a clean list of the available genomes
+            sps = [href.split("/")[0] for href in get_ftp_listing(url)]
 
             species_list.append(sps[5:])
 
@@ -831,20 +1945,9 @@ def ref_species_options(which, database=ENSEMBL_FTP_URL, release=None):
             url = database + f"release-{ENS_rel}/gtf/"
         elif which in ("dna", "cdna"):
             url = database + f"release-{ENS_rel}/fasta/"
-        html = requests.get(url)
 
-        # Raise error if status code not "OK" Response
-        if html.status_code != 200:
-            raise RuntimeError(
-                f"The Ensembl server returned error status code {html.status_code}. Please try again."
-            )
-
-        # Parse the html and generate a clean list of the available genomes
-        soup = BeautifulSoup(html.text, "html.parser")
-
-        sps = []
-        for subsoup in soup.body.findAll("a"):
-            sps.append(subsoup["href"].split("/")[0])
+        # Generate a clean list of the available genomes
+        sps = [href.split("/")[0] for href in get_ftp_listing(url)]
 
         species_list = sps[5:]
 
@@ -930,17 +2033,20 @@ def parse_blast_ref_page(handle):
         )
 
 
-def tsv_to_df(tsv_file, headers=None, skiprows=None):
+def tsv_to_df(tsv_file, headers=None, skiprows=None, dtype=None):
     """
     Convert tsv file to dataframe format.
 
     Args:
     - tsv_file      File to be converted
+    - dtype         Data types of (some of) the columns, e.g. {'query_accession': str}. Default: None -> inferred.
 
     Returns data frame.
     """
     try:
-        df = pd.read_csv(tsv_file, sep="\t", names=headers, skiprows=skiprows)
+        df = pd.read_csv(
+            tsv_file, sep="\t", names=headers, skiprows=skiprows, dtype=dtype
+        )
         return df
 
     except pd.errors.EmptyDataError:
@@ -962,9 +2068,10 @@ def create_tmp_fasta(sequences):
     if type(sequences) == str:
         sequences = [sequences]
 
-    with open(f"tmp_{random_id}.fa", "w") as f:
-        for idx, seq in enumerate(sequences):
-            f.write(f">Seq{idx}\n" + seq + "\n")
+    write_fasta(
+        f"tmp_{random_id}.fa",
+        ((f"Seq{idx}", seq) for idx, seq in enumerate(sequences)),
+    )
 
     return os.path.abspath(f"tmp_{random_id}.fa")
 
@@ -0,0 +1,59 @@
+import unittest
+import asyncio
+import inspect
+import threading
+
+import gget
+from gget import aio
+from gget.utils import get_session, configure_session
+
+
+class TestAio(unittest.TestCase):
+    def tearDown(self):
+        aio.configure()
+
+    def test_aio_coroutines(self):
+        for func in [
+            gget.info,
+            gget.seq,
+            gget.blast,
+            gget.blat,
+            gget.pdb,
+            gget.enrichr,
+            gget.archs4,
+        ]:
+            aio_func = getattr(aio, func.__name__)
+            self.assertTrue(inspect.iscoroutinefunction(aio_func))
+            self.assertEqual(inspect.signature(aio_func), inspect.signature(func))
+
+    def test_aio_run_concurrent(self):
+        # All calls have to run at the same time for the barrier to be passed
+        barrier = threading.Barrier(4, timeout=10)
+
+        def query(x, y=0):
+            barrier.wait()
+            return x + y
+
+        async def main():
+            return await asyncio.gather(*[aio.run(query, i, y=1) for i in range(4)])
+
+        aio.configure(max_workers=4)
+        result_to_test = asyncio.run(main())
+
+        self.assertListEqual(result_to_test, [1, 2, 3, 4])
+
+    def test_aio_configure_keeps_retries(self):
+        configure_session(max_retries=2, backoff_factor=1)
+        aio.configure(max_workers=4)
+        adapter = get_session().get_adapter("https://rest.ensembl.org/")
+
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertEqual(adapter.max_retries.backoff_factor, 1)
+
+        # Restore default session
+        configure_session()
+
+    def test_aio_configure_bad_max_workers(self):
+        with self.assertRaises(ValueError):
+            aio.configure(max_workers=0)
@@ -0,0 +1,118 @@
+import unittest
+import tempfile
+import shutil
+import time
+from unittest import mock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from gget.gget_cache import cache
+from gget.utils import ResponseCache, enable_cache, disable_cache, get_session
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_response_cache_get_set(self):
+        response_cache = ResponseCache(cache_dir=self.cache_dir)
+        key = response_cache.make_key("GET", "http://rest.ensembl.org/lookup/id/X")
+        response_cache.set(
+            key, "http://rest.ensembl.org/lookup/id/X", 200, {"a": "b"}, b"content"
+        )
+        result_to_test = response_cache.get(key)
+        response_cache.close()
+
+        self.assertEqual(result_to_test, (200, {"a": "b"}, b"content"))
+
+    def test_response_cache_key_release(self):
+        url = "http://rest.ensembl.org/lookup/id/X"
+        result_to_test = [
+            ResponseCache.make_key("GET", url),
+            ResponseCache.make_key("GET", url, release=112),
+            ResponseCache.make_key("GET", url, release=113),
+        ]
+
+        # Responses of different Ensembl releases are saved under different keys
+        self.assertEqual(len(set(result_to_test)), 3)
+
+    def test_response_cache_new_release(self):
+        # Latest Ensembl release returned by the (mocked) server
+        release = {"number": "112"}
+
+        def send(adapter, request, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response.url = request.url
+            if request.url.endswith("VERSION"):
+                response._content = release["number"].encode()
+            else:
+                response._content = f"release {release['number']}".encode()
+            return response
+
+        url = "http://rest.ensembl.org/lookup/id/X"
+        response_cache = enable_cache(cache_dir=self.cache_dir)
+        try:
+            with mock.patch.object(HTTPAdapter, "send", send):
+                result_to_test = [get_session().get(url).text]
+                release["number"] = "113"
+                # The cached release is used until the cached VERSION response expires
+                result_to_test.append(get_session().get(url).text)
+                with response_cache.lock, response_cache.connection:
+                    response_cache.connection.execute(
+                        "UPDATE responses SET expires = 0 WHERE url LIKE '%VERSION'"
+                    )
+                result_to_test.append(get_session().get(url).text)
+        finally:
+            disable_cache()
+
+        self.assertListEqual(
+            result_to_test, ["release 112", "release 112", "release 113"]
+        )
+
+    def test_response_cache_expired(self):
+        response_cache = ResponseCache(cache_dir=self.cache_dir)
+        response_cache.set("key", "url", 200, {}, b"content", ttl=-1)
+        result_to_test = response_cache.get("key")
+        response_cache.close()
+
+        self.assertIsNone(result_to_test)
+
+    def test_response_cache_lru_eviction(self):
+        # Maximum size of 20 bytes
+        response_cache = ResponseCache(cache_dir=self.cache_dir, max_size=20 / 1024 / 1024)
+        for key in ["key1", "key2", "key3"]:
+            response_cache.set(key, "url", 200, {}, b"x" * 8)
+            time.sleep(0.01)
+        result_to_test = [response_cache.get(key) is not None for key in ["key1", "key2", "key3"]]
+        response_cache.close()
+
+        self.assertListEqual(result_to_test, [False, True, True])
+
+    def test_response_cache_ttl(self):
+        response_cache = ResponseCache(cache_dir=self.cache_dir)
+        result_to_test = [
+            response_cache.get_ttl("http://ftp.ensembl.org/pub/VERSION"),
+            response_cache.get_ttl("http://ftp.ensembl.org/pub/release-112/fasta/"),
+            response_cache.get_ttl("https://maayanlab.cloud/speedrichr/api/addList"),
+        ]
+        response_cache.close()
+
+        self.assertListEqual(result_to_test, [(True, 86400), (True, None), (False, None)])
+
+    def test_cache_stats_clear(self):
+        response_cache = ResponseCache(cache_dir=self.cache_dir)
+        response_cache.set("key", "url", 200, {}, b"content")
+        response_cache.close()
+
+        self.assertEqual(cache("stats", cache_dir=self.cache_dir)["entries"], 1)
+        self.assertEqual(cache("clear", cache_dir=self.cache_dir, verbose=False), 1)
+        self.assertEqual(cache("stats", cache_dir=self.cache_dir)["entries"], 0)
+
+    def test_cache_bad_action(self):
+        with self.assertRaises(ValueError):
+            cache("banana")
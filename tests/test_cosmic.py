@@ -5,7 +5,13 @@ from parameterized import parameterized
 import pandas as pd
 import json
 import time
-from gget.gget_cosmic import cosmic
+import tempfile
+import io
+import gzip
+import tarfile
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from gget.gget_cosmic import cosmic, convert_to_parquet, stream_tar_member
 from gget.utils import get_latest_cosmic
 
 # Test download data from the latest COSMIC release
@@ -108,6 +114,155 @@ class TestCosmic(unittest.TestCase):
         self.assertListEqual(result_to_test, expected_result)
 
 
+class TestCosmicLocal(unittest.TestCase):
+    def test_cosmic_local_db(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tsv_file = os.path.join(tmp_dir, "CancerMutationCensus_AllData_test.tsv")
+            pd.DataFrame(
+                {
+                    "GENE_NAME": ["EGFR", "EGFR", "BRAF", "KRAS"] * 25,
+                    "ACCESSION_NUMBER": [
+                        "ENST00000275493.2",
+                        "ENST00000275493.2",
+                        "ENST00000288602.6",
+                        "ENST00000256078.4",
+                    ]
+                    * 25,
+                    "Mutation CDS": [f"c.{i+1}A>T" for i in range(100)],
+                }
+            ).to_csv(tsv_file, sep="\t", index=False)
+
+            parquet_file = tsv_file.replace(".tsv", ".parquet")
+            convert_to_parquet(tsv_file, parquet_file, verbose=False)
+
+            result_gene = cosmic("egfr", local_db=parquet_file, limit=10, verbose=False)
+            result_transcript = cosmic(
+                "ENST00000288602", local_db=parquet_file, json=True, verbose=False
+            )
+            result_none = cosmic("TP53", local_db=parquet_file, verbose=False)
+            # The TSV and Parquet files of the same database have separate indexes
+            result_tsv = cosmic("egfr", local_db=tsv_file, limit=10, verbose=False)
+            index_files = sorted(
+                f for f in os.listdir(tmp_dir) if f.endswith("_index.sqlite")
+            )
+
+        self.assertListEqual(
+            index_files,
+            [
+                "CancerMutationCensus_AllData_test.parquet_index.sqlite",
+                "CancerMutationCensus_AllData_test.tsv_index.sqlite",
+            ],
+        )
+        self.assertEqual(len(result_tsv), 10)
+        self.assertEqual(len(result_gene), 10)
+        self.assertListEqual(list(result_gene["GENE_NAME"].unique()), ["EGFR"])
+        self.assertEqual(len(result_transcript), 25)
+        self.assertEqual(result_transcript[0]["Mutation CDS"], "c.3A>T")
+        self.assertEqual(result_transcript[0]["ACCESSION_NUMBER"], "ENST00000288602.6")
+        self.assertIsNone(result_none)
+
+    def test_cosmic_local_db_samples(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tsv_file = os.path.join(tmp_dir, "Cosmic_GenomeScreensMutant_test.tsv")
+            pd.DataFrame(
+                {
+                    "GENE_SYMBOL": ["BRAF", "EGFR", "BRAF"],
+                    "SAMPLE_NAME": ["sample1", "sample1", "sample2"],
+                    "COSMIC_SAMPLE_ID": ["COSS1", "COSS1", "COSS2"],
+                    "TRANSCRIPT_ACCESSION": [
+                        "ENST00000288602.6",
+                        "ENST00000275493.2",
+                        "ENST00000288602.6",
+                    ],
+                    "GENOMIC_MUTATION_ID": ["COSV56056643", None, "COSV56056643"],
+                    "MUTATION_CDS": ["c.1799T>A", "c.2573T>G", "c.1799T>A"],
+                    "MUTATION_AA": ["p.V600E", "p.L858R", "p.V600E"],
+                }
+            ).to_csv(tsv_file, sep="\t", index=False)
+
+            result_samples = cosmic(
+                "coss1", entity="samples", local_db=tsv_file, verbose=False
+            )
+            result_aa = cosmic("v600e", local_db=tsv_file, verbose=False)
+            result_cds = cosmic("c.2573T>G", local_db=tsv_file, verbose=False)
+
+        self.assertListEqual(list(result_samples["GENE_SYMBOL"]), ["BRAF", "EGFR"])
+        self.assertListEqual(list(result_aa["SAMPLE_NAME"]), ["sample1", "sample2"])
+        self.assertEqual(result_cds["GENOMIC_MUTATION_ID"][0], None)
+
+
+class InterruptingHandler(BaseHTTPRequestHandler):
+    """
+    Serves self.server.archive and closes the connection halfway through the first response.
+    """
+
+    def do_GET(self):
+        archive = self.server.archive
+        start = 0
+        if "Range" in self.headers:
+            start = int(self.headers["Range"].split("=")[1].split("-")[0])
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(archive) - 1}/{len(archive)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(archive) - start))
+        self.end_headers()
+
+        if self.server.requests == 0:
+            self.wfile.write(archive[start : len(archive) // 2])
+            self.close_connection = True
+        else:
+            self.wfile.write(archive[start:])
+        self.server.requests += 1
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCosmicStreamDownload(unittest.TestCase):
+    def test_stream_tar_member(self):
+        content = "".join(f"GENE{i}\tc.{i}A>T\n" for i in range(10000)).encode()
+
+        # Archive containing a gzip-compressed database (as provided by COSMIC)
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="w") as tar:
+            for name, data in [
+                ("README.txt", b"readme"),
+                ("Cosmic_Test_v99_GRCh37.tsv.gz", gzip.compress(content)),
+            ]:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+        server = HTTPServer(("127.0.0.1", 0), InterruptingHandler)
+        server.archive = archive.getvalue()
+        server.requests = 0
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                file_path = os.path.join(tmp_dir, "Cosmic_Test_v99_GRCh37.tsv")
+                stream_tar_member(
+                    f"http://127.0.0.1:{server.server_port}/archive.tar",
+                    file_path,
+                    verbose=False,
+                )
+                with open(file_path, "rb") as f:
+                    result = f.read()
+                files = os.listdir(tmp_dir)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(result, content)
+        self.assertListEqual(files, ["Cosmic_Test_v99_GRCh37.tsv"])
+        # The interrupted download was resumed
+        self.assertEqual(server.requests, 2)
+
+
 class TestCaseBase(unittest.TestCase):
     def assertIsFile(self, path):
         if not pl.Path(path).resolve().is_file():
@@ -159,8 +314,9 @@ class TestCosmicDownload(TestCaseBase):
             else:
                 tarred_folder = f"{file_name}_Tsv_v{cosmic_version}_GRCh{grch_version}"
 
-            # Remove tarred COSMIC database folder
-            os.remove(tarred_folder + ".tar")
+            # Remove tarred COSMIC database folder (only saved by previous versions)
+            if os.path.exists(tarred_folder + ".tar"):
+                os.remove(tarred_folder + ".tar")
 
             # Delete untarred COSMIC database folder and all files within
             if os.path.exists(tarred_folder):
@@ -1,7 +1,13 @@
 import unittest
 import json
+import os
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
 
-from gget.gget_diamond import diamond
+from gget.gget_cache import cache
+from gget.gget_diamond import diamond, iter_diamond, make_diamond_db
 
 # Load dictionary containing arguments and expected results
 with open("./tests/fixtures/test_diamond.json") as json_file:
@@ -60,4 +66,95 @@ class TestDiamond(unittest.TestCase):
 
         result_to_test = diamond(**diamond_dict[test]["args"])
 
-        self.assertEqual(result_to_test, expected_result)
\ No newline at end of file
+        self.assertEqual(result_to_test, expected_result)
+
+    def test_diamond_cached_db(self):
+        test = "test1"
+        expected_result = diamond_dict[test]["expected_result"]
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with mock.patch.dict(os.environ, {"GGET_CACHE_DIR": cache_dir}):
+                # The database is created by the first alignment and reused by the second
+                for _ in range(2):
+                    result_to_test = diamond(**diamond_dict[test]["args"], cache=True)
+                    self.assertListEqual(result_to_test.values.tolist(), expected_result)
+
+            cached_dbs = os.listdir(os.path.join(cache_dir, "diamond_db"))
+            self.assertEqual(len(cached_dbs), 1)
+            self.assertTrue(cached_dbs[0].endswith(".dmnd"))
+
+            # Cached databases are deleted when the cache is cleared
+            cache("clear", cache_dir=cache_dir, verbose=False)
+            self.assertFalse(os.path.exists(os.path.join(cache_dir, "diamond_db")))
+
+    def test_diamond_existing_db(self):
+        test = "test1"
+        expected_result = diamond_dict[test]["expected_result"]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            diamond_db = os.path.join(tmp_dir, "db.dmnd")
+            diamond(**diamond_dict[test]["args"], diamond_db=diamond_db)
+            self.assertTrue(os.path.exists(diamond_db))
+            with open(f"{diamond_db}.json") as f:
+                db_info = json.load(f)
+
+            # A database created from the same reference is used as is
+            with mock.patch(
+                "gget.gget_diamond.make_diamond_db", wraps=make_diamond_db
+            ) as make_db_mock:
+                result_to_test = diamond(**diamond_dict[test]["args"], diamond_db=diamond_db)
+                make_db_mock.assert_not_called()
+            self.assertListEqual(result_to_test.values.tolist(), expected_result)
+
+            # A database created from other reference sequences is recreated
+            args = dict(diamond_dict[test]["args"], reference="MAAAAAAAAAAA")
+            diamond(**args, diamond_db=diamond_db)
+            with open(f"{diamond_db}.json") as f:
+                self.assertNotEqual(
+                    json.load(f)["reference_sha256"], db_info["reference_sha256"]
+                )
+
+    def test_diamond_numeric_ids(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            query = os.path.join(tmp_dir, "query.fa")
+            with open(query, "w") as f:
+                f.write(">1\nGGETISAWESQME\n>2\nPACHTERLABRQCKS\n")
+
+            result_to_test = diamond(
+                query, diamond_dict["test1"]["args"]["reference"], verbose=False
+            )
+
+        # Numeric sequence IDs are returned as they appear in the FASTA headers
+        self.assertListEqual(list(result_to_test["query_accession"]), ["1", "2"])
+
+    def test_diamond_failed_db_temp_files(self):
+        files_before = set(os.listdir())
+
+        # Temporary FASTA files are deleted if the database cannot be created
+        with self.assertRaises(RuntimeError):
+            diamond(
+                **diamond_dict["test1"]["args"],
+                diamond_binary="path/to/missing/diamond",
+                verbose=False,
+            )
+
+        self.assertSetEqual(set(os.listdir()), files_before)
+
+    def test_diamond_stream(self):
+        test = "test1"
+        expected_result = pd.DataFrame(
+            diamond_dict[test]["expected_result"], columns=diamond(**diamond_dict[test]["args"]).columns
+        )
+
+        batches = list(iter_diamond(**diamond_dict[test]["args"], batch_size=2))
+        self.assertListEqual([len(batch) for batch in batches], [2, 1])
+
+        result_to_test = pd.concat(batches, ignore_index=True)
+        self.assertEqual(result_to_test["subject_accession"].dtype, "category")
+        self.assertEqual(result_to_test["query_start"].dtype, np.int32)
+        self.assertEqual(result_to_test["identity_percentage"].dtype, np.float32)
+        for col in expected_result.columns:
+            if expected_result[col].dtype.kind == "f":
+                self.assertTrue(np.allclose(result_to_test[col], expected_result[col], rtol=1e-5))
+            else:
+                self.assertListEqual(result_to_test[col].astype(object).tolist(), expected_result[col].tolist())
@@ -1,7 +1,11 @@
 import unittest
 import json
+import os
+import tempfile
+from unittest import mock
 
-from gget.gget_elm import elm
+import gget.gget_elm as gget_elm
+from gget.gget_elm import elm, elm_batch, ElmReference
 from gget.gget_setup import setup as gget_setup
 
 # Load dictionary containing arguments and expected results
@@ -46,3 +50,136 @@ class TestELM(unittest.TestCase):
         )
 
         self.assertListEqual(result_to_test, expected_result)
+
+
+def write_elm_files(folder):
+    """
+    Write small ELM classes, instances and interaction domains tsv files to folder.
+    """
+    header = "".join(f"#comment {i}\n" for i in range(5))
+    classes = [
+        ["Accession", "ELMIdentifier", "FunctionalSiteName", "Description", "Regex", "Probability", "#Instances", "#Instances_in_PDB"],
+        ["ELME000001", "LIG_A", "site A", "desc A", "R.[ST]", "0.01", "2", "0"],
+        ["ELME000002", "MOD_B", "site B", "desc B", "P.P", "0.02", "1", "1"],
+    ]
+    instances = [
+        ["Accession", "ELMType", "ELMIdentifier", "ProteinName", "Primary_Acc", "Accessions", "Start", "End", "References", "Methods", "InstanceLogic", "PDB", "Organism"],
+        ["ELMI000001", "LIG", "LIG_A", "PROT1", "P00001", "P00001", "2", "4", "1", "m", "true positive", "", "Homo sapiens"],
+        ["ELMI000002", "MOD", "MOD_B", "PROT1", "P00001", "P00001", "6", "8", "2", "m", "true positive", "", "Homo sapiens"],
+        ["ELMI000003", "LIG", "LIG_A", "PROT2", "P00002", "P00002", "1", "3", "3", "m", "false positive", "", "Mus musculus"],
+    ]
+    intdomains = [
+        ["ELM identifier", "Interaction Domain Id", "Interaction Domain Description", "Interaction Domain Name"],
+        ["LIG_A", "PF00001", "domain 1", "Dom1"],
+        ["LIG_A", "PF00002", "domain 2", "Dom2"],
+    ]
+
+    files = []
+    for name, rows, comments in [
+        ("elms_classes.tsv", classes, header),
+        ("elm_instances.tsv", instances, header),
+        ("elm_interaction_domains.tsv", intdomains, ""),
+    ]:
+        path = os.path.join(folder, name)
+        with open(path, "w") as f:
+            f.write(comments)
+            for row in rows:
+                f.write("\t".join(f'"{x}"' for x in row) + "\n")
+        files.append(path)
+
+    return files
+
+
+class TestElmReference(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.files = write_elm_files(self.tmp_dir.name)
+
+    def tearDown(self):
+        gget_elm.clear_elm_reference()
+        self.tmp_dir.cleanup()
+
+    def test_elm_reference_instances(self):
+        reference = ElmReference(*self.files)
+
+        df = reference.get_instances("P00001")
+        # LIG_A has two interaction domains
+        self.assertListEqual(df["ELMIdentifier"].tolist(), ["LIG_A", "LIG_A", "MOD_B"])
+        self.assertListEqual(df["InteractionDomainId"].fillna("").tolist(), ["PF00001", "PF00002", ""])
+        self.assertListEqual(df["motif_start_in_subject"].tolist(), [2, 2, 6])
+        self.assertListEqual(df["class_accession"].tolist(), ["ELME000001", "ELME000001", "ELME000002"])
+        self.assertEqual(len(reference.get_instances("P99999")), 0)
+
+        df = reference.get_class_instances("LIG_A")
+        self.assertListEqual(df["Accession_y"].tolist(), ["ELMI000001", "ELMI000001", "ELMI000003", "ELMI000003"])
+
+    def test_elm_reference_cached(self):
+        classes_tsv, instances_tsv, intdomains_tsv = self.files
+        with mock.patch.multiple(
+            gget_elm,
+            ELM_CLASSES_TSV=classes_tsv,
+            ELM_INSTANCES_TSV=instances_tsv,
+            ELM_INTDOMAINS_TSV=intdomains_tsv,
+        ):
+            reference = gget_elm.get_elm_reference()
+            self.assertIs(gget_elm.get_elm_reference(), reference)
+
+            # The files are parsed again once they change
+            os.utime(instances_tsv, (0, 0))
+            self.assertIsNot(gget_elm.get_elm_reference(), reference)
+
+            reference = gget_elm.get_elm_reference()
+            gget_elm.clear_elm_reference()
+            self.assertIsNot(gget_elm.get_elm_reference(), reference)
+
+    def test_elm_reference_regex_match(self):
+        classes_tsv, instances_tsv, intdomains_tsv = self.files
+        with mock.patch.multiple(
+            gget_elm,
+            ELM_CLASSES_TSV=classes_tsv,
+            ELM_INSTANCES_TSV=instances_tsv,
+            ELM_INTDOMAINS_TSV=intdomains_tsv,
+        ):
+            df = gget_elm.regex_match("ARASPAPRGT")
+
+        # LIG_A matches twice and has two instances with two interaction domains each
+        self.assertEqual(len(df), 9)
+        self.assertListEqual(
+            df[["ELMIdentifier", "Instances (Matched Sequence)", "motif_start_in_query", "motif_end_in_query"]].drop_duplicates().values.tolist(),
+            [["LIG_A", "RAS", 2, 4], ["LIG_A", "RGT", 8, 10], ["MOD_B", "PAP", 5, 7]],
+        )
+        self.assertListEqual(df.columns[:5].tolist(), ["Instance_accession", "Instances (Matched Sequence)", "motif_start_in_query", "motif_end_in_query", "ELMIdentifier"])
+
+    def test_elm_reference_scan_sequences(self):
+        classes_tsv, instances_tsv, intdomains_tsv = self.files
+        records = [(f"q{i}", "ARASPAPRGT" * (i + 1)) for i in range(5)]
+        with mock.patch.multiple(
+            gget_elm,
+            ELM_CLASSES_TSV=classes_tsv,
+            ELM_INSTANCES_TSV=instances_tsv,
+            ELM_INTDOMAINS_TSV=intdomains_tsv,
+        ):
+            df_single = gget_elm.scan_sequences(records, threads=1)
+            df_parallel = gget_elm.scan_sequences(records, threads=2)
+
+        # Each repeat of the sequence contains three matches
+        self.assertListEqual(
+            df_single["query_id"].value_counts().sort_index().tolist(), [3, 6, 9, 12, 15]
+        )
+        self.assertListEqual(df_single.values.tolist(), df_parallel.values.tolist())
+
+
+class TestELMBatch(unittest.TestCase):
+    def test_elm_batch(self):
+        sequence = elm_dict["test3"]["args"]["sequence"]
+        results = elm_batch([sequence, sequence[10:]], verbose=False)
+
+        self.assertListEqual(list(results), ["Seq0", "Seq1"])
+        for (ortho, regex), query in zip(results.values(), [sequence, sequence[10:]]):
+            expected_ortho, expected_regex = elm(query, verbose=False)
+            self.assertListEqual(
+                ortho.fillna("").values.tolist(), expected_ortho.fillna("").values.tolist()
+            )
+            self.assertListEqual(
+                regex.fillna("").values.tolist(), expected_regex.fillna("").values.tolist()
+            )
@@ -1,6 +1,8 @@
 import unittest
+from unittest import mock
 import pandas as pd
 import json
+import gget.gget_info as gget_info
 from gget.gget_info import info
 
 # Load dictionary containing arguments and expected results
@@ -285,3 +287,57 @@ class TestInfo(unittest.TestCase):
         ]
 
         self.assertListEqual(result_to_test, expected_result)
+
+    def test_info_rejected_batch(self):
+        # Responses of the GET lookup/id endpoint
+        lookups = {
+            "lookup/id/ENSG00000000001?expand=1": {
+                "id": "ENSG00000000001",
+                "version": 2,
+                "object_type": "Gene",
+                "Transcript": [
+                    {
+                        "id": "ENST00000000001",
+                        "version": 1,
+                        "biotype": "protein_coding",
+                        "display_name": "GENE-201",
+                        "start": 1,
+                        "end": 5,
+                        "strand": 1,
+                        "Exon": [],
+                    }
+                ],
+            },
+            "lookup/id/ENSE00000000001?": {
+                "id": "ENSE00000000001",
+                "version": 1,
+                "object_type": "Exon",
+            },
+        }
+
+        def rest_query(server, query, content_type):
+            if query not in lookups:
+                raise RuntimeError("Not found")
+            return lookups[query]
+
+        # If the batch is rejected, IDs are looked up one by one (with expand if possible)
+        with mock.patch.object(
+            gget_info, "rest_query_batch", side_effect=RuntimeError("Bad request")
+        ), mock.patch.object(gget_info, "rest_query", side_effect=rest_query):
+            result_to_test = info(
+                ["ENSG00000000001", "ENSE00000000001", "ENSG00000000000"],
+                ensembl_only=True,
+                verbose=False,
+            )
+
+        self.assertListEqual(
+            list(result_to_test.index), ["ENSG00000000001", "ENSE00000000001"]
+        )
+        self.assertListEqual(
+            list(result_to_test["ensembl_id"]),
+            ["ENSG00000000001.2", "ENSE00000000001.1"],
+        )
+        self.assertListEqual(
+            result_to_test.loc["ENSG00000000001", "all_transcripts"],
+            ["ENST00000000001.1"],
+        )
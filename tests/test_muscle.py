@@ -168,5 +168,5 @@ class TestMusclePrints(unittest.TestCase):
             # print_mock.assert_called_with("\n")
             # print_mock.assert_called_with("test1\n", "\x1b[38;5;15m\x1b[48;5;9mA\x1b[0;0m")
             print_mock.assert_called_with(
-                "test2\n", "\t", "\x1b[38;5;15m\x1b[48;5;9mA\x1b[0;0m"
+                "test2", "\t", "\x1b[38;5;15m\x1b[48;5;9mA\x1b[0;0m"
             )
@@ -1,6 +1,16 @@
 import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
 
 from gget.gget_mutate import (
+    read_parquet_mutations,
+    parse_mutations,
+    create_mutant_kmers,
+    create_mutant_kmers_parallel,
+    mutate,
+    mutation_functions,
     create_mutant_sequence,
     substitution_mutation,
     deletion_mutation,
@@ -151,3 +161,268 @@ class TestMutate(unittest.TestCase):
     #     assert (
     #         result == "KLMNOPQRSTUVWXYZABCDEFGHIJKLMNPOQRSTUVWXYZABCDEFGHIJKLMNOPQRST"
     #     ), f"Expected KLMNOPQRSTUVWXYZABCDEFGHIJKLMNPOQRSTUVWXYZABCDEFGHIJKLMNOPQRST, got {result}"
+
+    def test_create_mutant_kmers(self):
+        mutations = [
+            "c.3C>X",
+            "c.35I>X",
+            "c.3_6del",
+            "c.35_37del",
+            "c.3del",
+            "c.3_6delinsXYZ",
+            "c.35_37delinsWXYZ",
+            "c.3delinsXYZ",
+            "c.3_4insXYZ",
+            "c.35_36insPPP",
+            "c.3_5dup",
+            "c.39_42dup",
+            "c.5dup",
+            "c.3_4inv",
+            "c.41_42inv",
+            "c.1_60inv",
+            "c.70_75dup",
+            "c.100del",
+            "c.8A>T",
+            "c.0_2del",
+            "c.5-2A>T",
+            "c.*5del",
+            "c.5_del",
+            "c.5?",
+            "c.(5_6)del",
+            "p.V600E",
+        ]
+        seq_dict = {
+            "seq1": self.alphabet_sequence,
+            "seq2": self.alphabet_sequence_long,
+        }
+        seq_ids = ["seq1", "seq2"] * (len(mutations) // 2)
+        sequences = [seq_dict[seq_id] for seq_id in seq_ids]
+
+        parsed_mutations = parse_mutations(pd.Series(mutations))
+        result = create_mutant_kmers(
+            parsed_mutations,
+            seq_dict,
+            seq_ids,
+            kmer_flanking_length=k,
+            mutations=mutations,
+        )
+
+        expected_result = [
+            create_mutant_sequence(
+                create_test_row(mutation, sequence),
+                mutation_functions[mutation_type],
+                kmer_flanking_length=k,
+            )
+            for mutation, sequence, mutation_type in zip(
+                mutations, sequences, parsed_mutations["mutation_type"]
+            )
+        ]
+
+        self.assertListEqual(result, expected_result)
+
+    def test_parse_mutations(self):
+        parsed_mutations = parse_mutations(
+            pd.Series(["c.2C>T", "c.9_13delinsAAT", "c.5-2A>T", "c.5?"])
+        )
+        result = parsed_mutations.values.tolist()
+        expected_result = [
+            ["substitution", "ok", 1, 1, "C", "T"],
+            ["delins", "ok", 8, 12, "", "AAT"],
+            ["substitution", "intronic", -1, -1, "", ""],
+            ["unknown", "uncertain", -1, -1, "", ""],
+        ]
+
+        self.assertListEqual(result, expected_result)
+
+    def test_create_mutant_kmers_parallel(self):
+        seq_dict = {
+            "seq1": self.alphabet_sequence,
+            "seq2": self.alphabet_sequence_long,
+            "seq3": self.alphabet_sequence_long[::-1],
+        }
+        mutations = np.array(
+            ["c.3C>X", "c.35_37del", "c.5dup", "c.3_4insXYZ", "c.41_42inv", "c.5-2A>T"]
+            * 10
+        )
+        seq_ids = np.array(["seq1", "seq2", "seq3"] * 20)
+
+        parsed_mutations = parse_mutations(pd.Series(mutations))
+        result = create_mutant_kmers_parallel(
+            parsed_mutations,
+            seq_dict,
+            seq_ids,
+            mutations,
+            kmer_flanking_length=k,
+            threads=2,
+        )
+        expected_result = create_mutant_kmers(
+            parsed_mutations,
+            seq_dict,
+            seq_ids,
+            kmer_flanking_length=k,
+            mutations=mutations,
+        )
+
+        self.assertListEqual(result, expected_result)
+
+    def test_mutate_chunksize(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fasta = os.path.join(tmp_dir, "seqs.fa")
+            with open(fasta, "w") as f:
+                f.write(f">seq1\n{self.alphabet_sequence}\n")
+                f.write(f">seq2.1 long\n{self.alphabet_sequence_long}\n")
+
+            mutations_csv = os.path.join(tmp_dir, "mutations.csv")
+            pd.DataFrame(
+                {
+                    "mutation": [
+                        "c.3_6del",
+                        "c.3C>X",
+                        "c.35_36insPPP",
+                        "c.5-2A>T",
+                        "c.35I>X",
+                        "c.39_42dup",
+                        "c.3_4insXYZ",
+                    ],
+                    "mut_ID": [f"mut{i+1}" for i in range(7)],
+                    "seq_ID": ["seq1", "seq1", "seq2", "seq2", "seq2", "seq2", "seq3"],
+                }
+            ).to_csv(mutations_csv, index=False)
+
+            out = os.path.join(tmp_dir, "out.fa")
+            out_chunks = os.path.join(tmp_dir, "out_chunks.fa")
+            mutate(fasta, mutations_csv, k=k, out=out, verbose=False)
+            mutate(
+                fasta, mutations_csv, k=k, out=out_chunks, chunksize=2, verbose=False
+            )
+            result_list = mutate(
+                fasta, mutations_csv, k=k, chunksize=3, verbose=False
+            )
+
+            with open(out) as f:
+                expected_result = f.read()
+            with open(out_chunks) as f:
+                result = f.read()
+
+        self.assertEqual(result, expected_result)
+        self.assertListEqual(result_list, expected_result.split("\n")[1::2])
+
+    def test_mutate_custom_id_columns(self):
+        sequences = [self.alphabet_sequence, self.alphabet_sequence_long]
+        mutations = pd.DataFrame(
+            {
+                "mutation": ["c.3C>X", "c.35_36insPPP", "c.39_42dup"],
+                "mut_ID": ["mut1", "mut2", "mut3"],
+                "seq_ID": ["seq1", "seq2", "seq2"],
+            }
+        )
+        custom_mutations = mutations.rename(
+            columns={"mut_ID": "variant_id", "seq_ID": "transcript_id"}
+        )
+        expected_result = mutate(sequences, mutations, k=k, verbose=False)
+
+        for kwargs in [{}, {"threads": 2}, {"chunksize": 2}]:
+            result_to_test = mutate(
+                sequences,
+                custom_mutations,
+                k=k,
+                mut_id_column="variant_id",
+                seq_id_column="transcript_id",
+                verbose=False,
+                **kwargs,
+            )
+            self.assertListEqual(result_to_test, expected_result)
+
+    def test_mutate_fasta_index(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fasta = os.path.join(tmp_dir, "seqs.fa")
+            with open(fasta, "w") as f:
+                f.write(">seq0 not referenced\nAAAA\nCC\n")
+                for title, seq in [
+                    ("seq1", self.alphabet_sequence),
+                    ("seq2.1 long", self.alphabet_sequence_long),
+                ]:
+                    # Wrap sequences at 10 characters per line
+                    lines = [seq[i : i + 10] for i in range(0, len(seq), 10)]
+                    f.write(f">{title}\n" + "\n".join(lines) + "\n")
+
+            mutations = pd.DataFrame(
+                {
+                    "mutation": ["c.3_6del", "c.35_36insPPP", "c.39_42dup", "c.4A>X"],
+                    "mut_ID": [f"mut{i+1}" for i in range(4)],
+                    "seq_ID": ["seq1", "seq2", "seq2", "seq3"],
+                }
+            )
+
+            expected_result = mutate(fasta, mutations, k=k, verbose=False)
+            result = mutate(fasta, mutations, k=k, fasta_index=True, verbose=False)
+            self.assertTrue(os.path.exists(fasta + ".fai"))
+
+            # Use cached index
+            result_cached = mutate(
+                fasta, mutations, k=k, fasta_index=True, chunksize=1, verbose=False
+            )
+
+            with open(fasta + ".fai") as f:
+                index = f.read()
+
+        self.assertListEqual(result, expected_result)
+        self.assertListEqual(result_cached, expected_result)
+        self.assertEqual(index.split("\n")[0], "seq0\t6\t21\t4\t5")
+
+    def test_mutate_parquet(self):
+        mutations = pd.DataFrame(
+            {
+                "mutation": ["c.3_6del", "c.35_36insPPP", "c.5-2A>T", "c.39_42dup"],
+                "mut_ID": [f"mut{i+1}" for i in range(4)],
+                "seq_ID": ["seq1", "seq2", "seq2", "seq2"],
+            }
+        )
+        sequences = [self.alphabet_sequence, self.alphabet_sequence_long]
+
+        # Store parsed mutations as done by gget cosmic
+        parsed_mutations = pd.concat(
+            [mutations, parse_mutations(mutations["mutation"])], axis=1
+        ).astype({"mutation_type": "category", "start": np.int32, "end": np.int32})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            parquet_file = os.path.join(tmp_dir, "mutations.parquet")
+            parsed_mutations.to_parquet(parquet_file, index=False)
+
+            result = mutate(sequences, parquet_file, k=k, verbose=False)
+            result_chunks = mutate(
+                sequences, parquet_file, k=k, chunksize=3, verbose=False
+            )
+            n_chunks = len(list(read_parquet_mutations(parquet_file, chunksize=3)))
+
+        expected_result = mutate(sequences, mutations, k=k, verbose=False)
+
+        self.assertListEqual(result, expected_result)
+        self.assertListEqual(result_chunks, expected_result)
+        self.assertEqual(n_chunks, 2)
+
+    def test_mutate_return_stats(self):
+        mutations = ["c.3A>X", "c.3_6del", "c.5-2A>T", "c.100del", "c.5?"]
+        expected_result = {
+            "total_mutations": 5,
+            "good_mutations": 1,
+            "intronic_mutations": 1,
+            "posttranslational_region_mutations": 0,
+            "unknown_mutations": 0,
+            "uncertain_mutations": 1,
+            "ambiguous_position_mutations": 0,
+            "cosmic_incorrect_wt_base": 1,
+            "mut_idx_outside_seq": 1,
+        }
+
+        # Statistics must not accumulate across calls
+        for _ in range(2):
+            mut_seqs, stats = mutate(
+                [self.alphabet_sequence] * 5,
+                mutations,
+                k=k,
+                return_stats=True,
+                verbose=False,
+            )
+            self.assertListEqual(mut_seqs, ["ABXDEFG", "ABG"])
+            self.assertDictEqual(stats, expected_result)
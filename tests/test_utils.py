@@ -1,18 +1,30 @@
 import unittest
+import os
+import tempfile
 import numpy as np
 from gget.utils import (
     n_colors,
     aa_colors,
     get_uniprot_seqs,
+    uniprot_idmapping_from_db,
     get_uniprot_info,
     rest_query,
+    get_session,
+    configure_session,
     find_latest_ens_rel,
     search_species_options,
     ref_species_options,
     read_fasta,
+    iter_fasta,
+    write_fasta,
 )
 
-from gget.constants import UNIPROT_REST_API, ENSEMBL_REST_API, ENSEMBL_FTP_URL_NV
+from gget.constants import (
+    UNIPROT_REST_API,
+    ENSEMBL_REST_API,
+    ENSEMBL_FTP_URL_NV,
+    POST_ENRICHR_URL,
+)
 
 from .fixtures import (
     LATEST_ENS_RELEASE,
@@ -42,6 +54,25 @@ class TestUtils(unittest.TestCase):
 
         self.assertEqual(result_to_test, expected_result)
 
+    def test_write_fasta(self):
+        records = [("seq1 description", "ACTGACTGACTG"), ("seq2", "ACT")]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fasta = os.path.join(tmp_dir, "seqs.fa")
+            write_fasta(fasta, records, line_width=5)
+            with open(fasta) as f:
+                result_to_test = f.read()
+
+            # Gzip-compressed files are written and read transparently
+            fasta_gz = os.path.join(tmp_dir, "seqs.fa.gz")
+            write_fasta(fasta_gz, records, line_width=5)
+            records_to_test = list(iter_fasta(fasta_gz))
+
+        expected_result = ">seq1 description\nACTGA\nCTGAC\nTG\n>seq2\nACT\n"
+
+        self.assertEqual(result_to_test, expected_result)
+        self.assertEqual(records_to_test, records)
+
     def test_n_colors(self):
         result_to_test = n_colors("A")
         expected_result = "\x1b[38;5;15m\x1b[48;5;9mA\x1b[0;0m"
@@ -80,6 +111,37 @@ class TestUtils(unittest.TestCase):
 
         self.assertListEqual(result_to_test, expected_result)
 
+    def test_get_uniprot_seqs_id_mapping(self):
+        # 'P35326' is not supported by the ID mapping API and is searched individually
+        ids = ["ENST00000392653.3", "P35326", "ENST00000392657.7"]
+        df_search = get_uniprot_seqs(UNIPROT_REST_API, ids)
+        df_mapping = get_uniprot_seqs(UNIPROT_REST_API, ids, id_mapping=True)
+
+        self.assertListEqual(df_mapping.values.tolist(), df_search.values.tolist())
+
+    def test_uniprot_idmapping_from_db(self):
+        result_to_test = [
+            uniprot_idmapping_from_db(id_)
+            for id_ in [
+                "ENSG00000034713",
+                "ENST00000392653.3",
+                "ENSMUSP00000020116",
+                "WBGene00043981",
+                "FBgn0003656",
+                "P35326",
+            ]
+        ]
+        expected_result = [
+            "Ensembl",
+            "Ensembl_Transcript",
+            "Ensembl_Protein",
+            "WormBase",
+            "FlyBase",
+            None,
+        ]
+
+        self.assertListEqual(result_to_test, expected_result)
+
     def test_get_uniprot_info_gene(self):
         df = get_uniprot_info(UNIPROT_REST_API, "ENSG00000187140")
         result_to_test = df.values.tolist()
@@ -151,6 +213,32 @@ class TestUtils(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             rest_query(server, query, content_type)
 
+    def test_get_session(self):
+        # The same session is shared between calls
+        self.assertIs(get_session(), get_session())
+
+    def test_configure_session(self):
+        session = configure_session(pool_size=3, max_retries=2)
+        adapter = session.get_adapter("https://rest.ensembl.org/")
+
+        self.assertIs(get_session(), session)
+        self.assertEqual(adapter._pool_maxsize, 3)
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+
+        # Restore default session
+        configure_session()
+
+    def test_session_post_retries(self):
+        session = get_session()
+        lookup_retries = session.get_adapter(ENSEMBL_REST_API + "lookup/id").max_retries
+        enrichr_retries = session.get_adapter(POST_ENRICHR_URL).max_retries
+
+        # Only read-only POST endpoints are retried
+        self.assertIn("POST", lookup_retries.allowed_methods)
+        self.assertNotIn("POST", enrichr_retries.allowed_methods)
+        self.assertIn("GET", enrichr_retries.allowed_methods)
+
     def test_find_latest_ens_rel(self):
         result_to_test = find_latest_ens_rel()
         expected_result = LATEST_ENS_RELEASE